@@ -0,0 +1,40 @@
+"""Add workout_tracks table
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "003"
+down_revision: Union[str, None] = "002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "workout_tracks",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("workout_id", sa.Integer(), nullable=False),
+        sa.Column("distance_m", sa.Integer(), nullable=False),
+        sa.Column("moving_time_sec", sa.Integer(), nullable=False),
+        sa.Column("avg_pace_sec_per_km", sa.Integer(), nullable=True),
+        sa.Column("elevation_gain_m", sa.Integer(), nullable=True),
+        sa.Column("avg_heart_rate", sa.Integer(), nullable=True),
+        sa.Column("points_count", sa.Integer(), nullable=False),
+        sa.Column("polyline", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["workout_id"], ["workouts.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("workout_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("workout_tracks")
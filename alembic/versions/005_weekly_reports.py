@@ -0,0 +1,41 @@
+"""Add weekly_reports table for pre-generated reports
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "005"
+down_revision: Union[str, None] = "004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "weekly_reports",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("report_date", sa.Date(), nullable=False),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.Column("chart_png", sa.LargeBinary(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("sent_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id", "report_date", name="uq_weekly_report_user_date"),
+    )
+    op.create_index(
+        op.f("ix_weekly_reports_report_date"), "weekly_reports", ["report_date"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_weekly_reports_report_date"), table_name="weekly_reports")
+    op.drop_table("weekly_reports")
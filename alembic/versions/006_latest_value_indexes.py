@@ -0,0 +1,75 @@
+"""Add partial and covering indexes for latest-value lookups
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19
+
+"""
+from contextlib import contextmanager
+from typing import Iterator, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "006"
+down_revision: Union[str, None] = "005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+WEIGHT_LOGGED = sa.text("weight_kg IS NOT NULL")
+
+
+@contextmanager
+def _outside_transaction() -> Iterator[None]:
+    """Postgres can't build indexes CONCURRENTLY inside a transaction."""
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            yield
+    else:
+        yield
+
+
+def upgrade() -> None:
+    with _outside_transaction():
+        # Last weigh-in / weigh-in a week ago: newest entry among days with a weight
+        op.create_index(
+            "idx_daily_logs_user_weight_date",
+            "daily_logs",
+            ["user_id", sa.text("log_date DESC")],
+            postgresql_where=WEIGHT_LOGGED,
+            sqlite_where=WEIGHT_LOGGED,
+            postgresql_concurrently=True,
+        )
+        # Daily calorie totals from the index alone; replaces idx_calorie_entries_user_date
+        op.create_index(
+            "idx_calorie_entries_user_date_calories",
+            "calorie_entries",
+            ["user_id", "entry_date", "calories"],
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "idx_calorie_entries_user_date",
+            table_name="calorie_entries",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with _outside_transaction():
+        op.create_index(
+            "idx_calorie_entries_user_date",
+            "calorie_entries",
+            ["user_id", "entry_date"],
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "idx_calorie_entries_user_date_calories",
+            table_name="calorie_entries",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "idx_daily_logs_user_weight_date",
+            table_name="daily_logs",
+            postgresql_concurrently=True,
+        )
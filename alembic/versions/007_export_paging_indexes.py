@@ -0,0 +1,51 @@
+"""Add (user_id, id) indexes for keyset-paged exports
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19
+
+"""
+from contextlib import contextmanager
+from typing import Iterator, Sequence, Union
+
+from alembic import op
+
+
+revision: str = "007"
+down_revision: Union[str, None] = "006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tables the export pages through with WHERE user_id = ? AND id > ? ORDER BY id
+EXPORTED_TABLES = ("daily_logs", "calorie_entries", "workouts", "strength_logs")
+
+
+@contextmanager
+def _outside_transaction() -> Iterator[None]:
+    """Postgres can't build indexes CONCURRENTLY inside a transaction."""
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            yield
+    else:
+        yield
+
+
+def upgrade() -> None:
+    with _outside_transaction():
+        for table in EXPORTED_TABLES:
+            op.create_index(
+                f"idx_{table}_user_id",
+                table,
+                ["user_id", "id"],
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with _outside_transaction():
+        for table in EXPORTED_TABLES:
+            op.drop_index(
+                f"idx_{table}_user_id",
+                table_name=table,
+                postgresql_concurrently=True,
+            )
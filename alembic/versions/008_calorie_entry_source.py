@@ -0,0 +1,29 @@
+"""Add calorie_entries.source to tell imported rows from logged meals
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "008"
+down_revision: Union[str, None] = "007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("calorie_entries", sa.Column("source", sa.String(length=20), nullable=True))
+    # Apple Health imports are recognizable by their description; earlier CSV imports are not
+    op.execute(
+        "UPDATE calorie_entries SET source = 'apple_health' WHERE description = 'Apple Health'"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("calorie_entries", "source")
@@ -0,0 +1,99 @@
+"""
+Compare chart upload size and encode time per output format.
+
+Usage:
+    python -m benchmarks.bench_chart_output [--repeat 10] [--width 1000] [--out DIR]
+
+Renders a 30-day weight chart once per backend and encodes the pixels as the
+previous full-colour 150-dpi PNG, palette-quantized PNG, WebP and JPEG (plus the
+sparkline renderer's own zlib PNG, which it uploads when that fits), reporting
+the median encode time and resulting size against CHART_MAX_BYTES.
+"""
+import argparse
+import io
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_chart_output.db')}",
+)
+
+import numpy as np  # noqa: E402
+from PIL import Image  # noqa: E402
+
+from bot.config import config  # noqa: E402
+from bot.utils import image_output, plotting, sparkline  # noqa: E402
+from benchmarks.bench_charts import make_trend  # noqa: E402
+
+
+def render_pixels(backend: str) -> np.ndarray:
+    """Rendered RGB pixels of a 30-point weight chart, before encoding."""
+    # Templates fix their DPI when built, so drop them to pick up the current width
+    plotting._templates.__dict__.clear()
+    captured = []
+    original = plotting.encode_chart
+    plotting.encode_chart = lambda pixels: captured.append(np.array(pixels[..., :3])) or b""
+    try:
+        if backend == "sparkline":
+            plotting.create_weight_sparkline(make_trend(30))
+        else:
+            plotting.create_weight_matplotlib(make_trend(30))
+    finally:
+        plotting.encode_chart = original
+    return captured[0]
+
+
+def encode_full_png(pixels: np.ndarray) -> bytes:
+    buf = io.BytesIO()
+    Image.fromarray(pixels).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def measure(encode, pixels: np.ndarray, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        data = encode(pixels)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--width", type=int, default=config.charts.width_px)
+    parser.add_argument("--out", help="directory to save encoded charts to")
+    args = parser.parse_args()
+
+    config.charts.width_px = args.width
+    print(f"width {args.width}px, budget {config.charts.max_bytes / 1024:.0f} KB")
+    print(f"{'backend':>10} {'format':>10} {'median ms':>10} {'KB':>8}")
+
+    # Baseline: what plotting.py used to upload, a full-colour PNG at 150 dpi
+    config.charts.width_px = 1500
+    baseline = render_pixels("matplotlib")
+    seconds, data = measure(encode_full_png, baseline, args.repeat)
+    print(f"{'matplotlib':>10} {'png-150dpi':>10} {seconds * 1000:>10.1f} {len(data) / 1024:>8.1f}")
+    config.charts.width_px = args.width
+
+    for backend in ("matplotlib", "sparkline"):
+        pixels = render_pixels(backend)
+        for fmt in image_output.FORMATS:
+            config.charts.format = fmt
+            seconds, data = measure(image_output.encode_chart, pixels, args.repeat)
+            print(f"{backend:>10} {fmt:>10} {seconds * 1000:>10.1f} {len(data) / 1024:>8.1f}")
+            if args.out:
+                os.makedirs(args.out, exist_ok=True)
+                path = os.path.join(args.out, f"{backend}{image_output.FORMATS[fmt]}")
+                with open(path, "wb") as f:
+                    f.write(data)
+        if backend == "sparkline":
+            seconds, data = measure(sparkline.encode_png, pixels, args.repeat)
+            print(f"{backend:>10} {'png-zlib':>10} {seconds * 1000:>10.1f} {len(data) / 1024:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Compare the matplotlib and sparkline chart backends.
+
+Usage:
+    python -m benchmarks.bench_charts [--repeat 20] [--out DIR]
+
+Renders weight trends of several lengths with both backends and reports the median
+render time and PNG size. With --out the rendered charts are saved for eyeballing.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_charts.db')}",
+)
+
+from bot.services.analytics import WeightTrend  # noqa: E402
+from bot.utils import plotting  # noqa: E402
+
+POINTS = (5, 14, 30)
+
+
+def make_trend(points: int) -> WeightTrend:
+    rng = random.Random(points)
+    start = date.today() - timedelta(days=points - 1)
+    dates = [start + timedelta(days=i) for i in range(points)]
+    weights = []
+    weight = 82.0
+    for _ in dates:
+        weight += rng.uniform(-0.4, 0.3)
+        weights.append(Decimal(str(round(weight, 1))))
+    moving_avg = []
+    for i in range(points):
+        window = weights[max(0, i - 6) : i + 1]
+        moving_avg.append(sum(window) / len(window))
+    return WeightTrend(dates=dates, weights=weights, moving_avg=moving_avg)
+
+
+def measure(render, trend: WeightTrend, repeat: int):
+    render(trend)  # warm-up: font cache, first figure
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        png = render(trend)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), png
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--out", help="directory to save rendered charts to")
+    args = parser.parse_args()
+
+    backends = {
+        "matplotlib": plotting.create_weight_matplotlib,
+        "sparkline": plotting.create_weight_sparkline,
+    }
+
+    print(f"{'points':>6} {'backend':>10} {'median ms':>10} {'PNG KB':>8}")
+    for points in POINTS:
+        trend = make_trend(points)
+        for name, render in backends.items():
+            seconds, png = measure(render, trend, args.repeat)
+            print(f"{points:>6} {name:>10} {seconds * 1000:>10.1f} {len(png) / 1024:>8.1f}")
+            if args.out:
+                os.makedirs(args.out, exist_ok=True)
+                with open(os.path.join(args.out, f"weight_{points}_{name}.png"), "wb") as f:
+                    f.write(png)
+
+
+if __name__ == "__main__":
+    main()
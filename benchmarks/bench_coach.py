@@ -0,0 +1,114 @@
+"""
+Exercise the AI coach client against the local stand-in server.
+
+Usage:
+    python -m benchmarks.bench_coach [--calls 50] [--delay 0.5] [--fail-rate 0.0]
+
+Reports latency, the peak number of requests the server saw at once (bounded by
+OPENAI_MAX_CONCURRENCY) and how many comments fell back to the template. A second
+pass with the same stats must be served from the comment cache.
+"""
+import argparse
+import asyncio
+import dataclasses
+import os
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_coach.db')}",
+)
+os.environ.setdefault("OPENAI_API_KEY", "stand-in")
+
+from aiohttp import web  # noqa: E402
+
+from bot.config import config  # noqa: E402
+from bot.db import Base, engine  # noqa: E402
+from bot.services import coach  # noqa: E402
+from bot.services.analytics import WeeklyStats  # noqa: E402
+from benchmarks.fake_openai import COMMENT, create_app  # noqa: E402
+
+STATS = WeeklyStats(
+    start_date=date.today() - timedelta(days=6),
+    end_date=date.today(),
+    start_weight=Decimal("82.0"),
+    end_weight=Decimal("81.4"),
+    weight_change=Decimal("-0.6"),
+    weight_change_pct=Decimal("-0.7"),
+    avg_calories=2300,
+    target_calories=2400,
+    calories_deficit=700,
+    avg_water_ml=2100,
+    avg_sleep_hours=Decimal("6.5"),
+    workout_count=2,
+    planned_workouts=3,
+    streak_weeks=4,
+)
+
+
+async def timed_call(stats: WeeklyStats) -> tuple:
+    started = time.perf_counter()
+    comment = await coach.get_coach_comment(stats)
+    return time.perf_counter() - started, comment == COMMENT
+
+
+async def run(calls: int, delay: float, fail_rate: float, port: int):
+    app = create_app(delay, fail_rate)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    # Distinct stats per call, otherwise they would all share one cached completion
+    all_stats = [dataclasses.replace(STATS, avg_calories=2000 + i) for i in range(calls)]
+
+    config.openai.base_url = f"http://127.0.0.1:{port}/v1"
+    try:
+        started = time.perf_counter()
+        results = await asyncio.gather(*(timed_call(stats) for stats in all_stats))
+        elapsed = time.perf_counter() - started
+
+        requests_before = app["requests"]
+        started = time.perf_counter()
+        await asyncio.gather(*(timed_call(stats) for stats in all_stats))
+        cached_elapsed = time.perf_counter() - started
+        repeat_requests = app["requests"] - requests_before
+    finally:
+        await coach.close_coach_client()
+        await runner.cleanup()
+
+    latencies = sorted(latency for latency, _ in results)
+    from_ai = sum(1 for _, ok in results if ok)
+    print(f"calls: {calls}, wall time: {elapsed:.2f}s")
+    print(
+        f"latency p50: {statistics.median(latencies) * 1000:.0f} ms, "
+        f"max: {latencies[-1] * 1000:.0f} ms (deadline {config.openai.timeout:.0f}s)"
+    )
+    print(
+        f"server requests: {app['requests']}, peak in flight: {app['max_in_flight']} "
+        f"(limit {config.openai.max_concurrency})"
+    )
+    print(f"AI comments: {from_ai}, template fallbacks: {calls - from_ai}")
+    print(f"breaker open: {coach._breaker.is_open}")
+    print(f"repeat pass: {cached_elapsed:.2f}s, API requests: {repeat_requests}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AI coach client benchmark")
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--delay", type=float, default=0.5)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=8099)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.calls, args.delay, args.fail_rate, args.port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Load-test the Dispatcher offline with synthetic users.
+
+Usage:
+    python -m benchmarks.bench_dispatcher [--users 1000] [--concurrency 50]
+        [--days 3] [--report-share 0.2] [--seed 1] [--keep-db]
+
+Builds the real Dispatcher (all routers from get_all_routers() plus the
+instrumentation middlewares) with a Bot whose session records API calls
+instead of sending them. Each synthetic user onboards, then logs a few days
+of weight, meals, water, sleep and workouts and opens reports with the given
+probability; users run concurrently, each user's updates in order. Reports
+p50/p99 latency and calls per handler and overall updates/s.
+
+Runs against a fresh SQLite file by default; set DATABASE_URL to a local
+Postgres to load-test that instead (its tables are dropped and recreated).
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import tempfile
+import time
+from typing import List
+
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_dispatcher.db')}",
+)
+
+from bot.metrics import Histogram, get_handler_latency, reset_metrics  # noqa: E402
+from benchmarks.offline import (  # noqa: E402
+    ONBOARDING,
+    build_bot,
+    build_dispatcher,
+    make_update,
+    reset_schema,
+)
+
+FOODS = ("гречка 200г", "овсянка 80г", "курица 150г", "рис 180г", "творог 200г")
+REPORTS = (
+    "📊 Итоги сегодня",
+    "📈 График веса",
+    "📊 Недельный отчёт",
+    "📅 Месячная сводка",
+    "🔥 Streak",
+    "🗓 Активность за год",
+)
+
+
+def user_day(rng: random.Random, report_share: float) -> List:
+    """One day of a typical user: weigh-in, meals, water, maybe sleep/workout/report."""
+    weight = f"{rng.uniform(60, 110):.1f}"
+    steps: List = ["📝 Записать", "⚖️ Вес", weight]
+    for _ in range(rng.randint(2, 4)):
+        if rng.random() < 0.5:
+            steps += ["🍽 Калории", str(rng.randint(150, 900))]
+        else:
+            steps.append(rng.choice(FOODS))  # quick entry from the main menu
+    steps += ["💧 Вода", str(rng.choice((250, 330, 500)))]
+    if rng.random() < 0.7:
+        steps += ["😴 Сон", f"{rng.uniform(5, 9):.1f}"]
+    steps.append("◀️ Назад")
+    if rng.random() < 0.4:
+        steps += ["🏋️ Тренировка", "🏋️ Зал", str(rng.randint(30, 90)), str(rng.randint(150, 600))]
+    if rng.random() < report_share:
+        steps += ["📈 Отчёты", rng.choice(REPORTS), "◀️ Назад"]
+    return steps
+
+
+def user_script(rng: random.Random, days: int, report_share: float) -> List:
+    steps = list(ONBOARDING)
+    for _ in range(days):
+        steps += user_day(rng, report_share)
+    return steps
+
+
+async def run(args) -> None:
+    await reset_schema()
+    dp = build_dispatcher()
+    bot = build_bot()
+    reset_metrics()
+
+    rng = random.Random(args.seed)
+    scripts = [user_script(rng, args.days, args.report_share) for _ in range(args.users)]
+    total_updates = sum(len(script) for script in scripts)
+    update_latency = Histogram()
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def drive(user_id: int, script: List) -> None:
+        async with semaphore:
+            for step in script:
+                started = time.perf_counter()
+                await dp.feed_update(bot, make_update(user_id, step))
+                update_latency.record(time.perf_counter() - started)
+
+    print(f"{args.users} users, {total_updates} updates, concurrency {args.concurrency}")
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        drive(user_id, script) for user_id, script in enumerate(scripts, start=1)
+    ))
+    elapsed = time.perf_counter() - started
+
+    print(f"\n{'handler':<45} {'calls':>7} {'p50 ms':>8} {'p99 ms':>8} {'total s':>8}")
+    ranked = sorted(get_handler_latency().items(), key=lambda item: -item[1].sum)
+    for (router, handler), histogram in ranked:
+        print(
+            f"{router + '.' + handler:<45} {histogram.count:>7} "
+            f"{histogram.quantile(0.5) * 1000:>8.1f} {histogram.quantile(0.99) * 1000:>8.1f} "
+            f"{histogram.sum:>8.2f}"
+        )
+
+    print(
+        f"\n{total_updates / elapsed:.0f} updates/s over {elapsed:.1f} s; "
+        f"update latency p50 {update_latency.quantile(0.5) * 1000:.1f} ms, "
+        f"p99 {update_latency.quantile(0.99) * 1000:.1f} ms; "
+        f"{len(bot.session.calls)} Bot API calls"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--days", type=int, default=3, help="days of logging per user")
+    parser.add_argument("--report-share", type=float, default=0.2,
+                        help="chance a user opens a report on a given day")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Compare latest-value lookups before and after migration 006's indexes.
+
+Usage:
+    python -m benchmarks.bench_indexes [--users 500] [--days 365] [--sample 200] [--repeat 5]
+
+Seeds a dataset, then times get_last_weight_log, get_weight_week_ago,
+get_total_calories_for_date, get_last_workout and get_user_exercises for a
+sample of users twice: with the 005 indexes (partial weight index dropped,
+plain user/date calorie index) and with the 006 ones, running ANALYZE after
+each switch. Prints p50 per query for both and the plan used.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import Dict, List
+
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_indexes.db')}",
+)
+
+from sqlalchemy import Index, text  # noqa: E402
+
+from bot.db import crud  # noqa: E402
+from bot.db.database import async_session, engine  # noqa: E402
+from bot.db.models import Base  # noqa: E402
+from benchmarks.check_query_plans import capture_statements, explain  # noqa: E402
+from benchmarks.seed import seed  # noqa: E402
+
+TODAY = date.today()
+QUERIES = {
+    "get_last_weight_log": lambda s, u: crud.get_last_weight_log(s, u),
+    "get_weight_week_ago": lambda s, u: crud.get_weight_week_ago(s, u, TODAY),
+    "get_total_calories_for_date": lambda s, u: crud.get_total_calories_for_date(s, u, TODAY - timedelta(days=1)),
+    "get_last_workout": lambda s, u: crud.get_last_workout(s, u),
+    "get_user_exercises": lambda s, u: crud.get_user_exercises(s, u),
+}
+
+NEW_INDEXES = ("idx_daily_logs_user_weight_date", "idx_calorie_entries_user_date_calories")
+OLD_CALORIE_INDEX = Index(
+    "idx_calorie_entries_user_date",
+    Base.metadata.tables["calorie_entries"].c.user_id,
+    Base.metadata.tables["calorie_entries"].c.entry_date,
+)
+
+
+def _model_index(name: str) -> Index:
+    for table in Base.metadata.tables.values():
+        for index in table.indexes:
+            if index.name == name:
+                return index
+    raise KeyError(name)
+
+
+async def use_indexes(new: bool) -> None:
+    """Switch between the 005 and 006 index sets and refresh planner statistics."""
+    async with engine.begin() as conn:
+        for name in NEW_INDEXES:
+            index = _model_index(name)
+            await conn.run_sync(index.drop if not new else index.create, checkfirst=True)
+        await conn.run_sync(OLD_CALORIE_INDEX.create if not new else OLD_CALORIE_INDEX.drop, checkfirst=True)
+        await conn.execute(text("ANALYZE"))
+
+
+async def measure(user_ids: List[int], repeat: int) -> Dict[str, float]:
+    results = {}
+    for name, query in QUERIES.items():
+        timings = []
+        async with async_session() as session:
+            for _ in range(repeat):
+                for user_id in user_ids:
+                    started = time.perf_counter()
+                    await query(session, user_id)
+                    timings.append(time.perf_counter() - started)
+        results[name] = statistics.median(timings) * 1000
+    return results
+
+
+async def plans() -> Dict[str, str]:
+    result = {}
+    for name, query in QUERIES.items():
+        statements = await capture_statements(lambda s, q=query: q(s, 1))
+        lines = []
+        for statement, parameters in statements:
+            lines += await explain(statement, parameters)
+        result[name] = "; ".join(lines)
+    return result
+
+
+async def run(args) -> None:
+    summary = await seed(args.users, args.days)
+    print(f"Seeded {args.users} users x {args.days} days in {summary.seconds:.1f} s "
+          f"({summary.rows['daily_logs']} daily logs, {summary.rows['calorie_entries']} calorie entries)")
+    user_ids = list(range(1, args.users + 1, max(1, args.users // args.sample)))[: args.sample]
+
+    await use_indexes(new=False)
+    before, before_plans = await measure(user_ids, args.repeat), await plans()
+    await use_indexes(new=True)
+    after, after_plans = await measure(user_ids, args.repeat), await plans()
+
+    print(f"\n{'query':<30} {'005 p50 ms':>11} {'006 p50 ms':>11} {'change':>8}")
+    for name in QUERIES:
+        print(f"{name:<30} {before[name]:>11.3f} {after[name]:>11.3f} "
+              f"{(after[name] / before[name] - 1) * 100:>+7.0f}%")
+    print()
+    for name in QUERIES:
+        print(f"{name}\n  005: {before_plans[name]}\n  006: {after_plans[name]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--sample", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Benchmark analytics, alerts and scheduler jobs on a seeded dataset.
+
+Usage:
+    python -m benchmarks.bench_services [--users 200] [--days 180] [--sample 50]
+        [--due-share 0.1] [--out results.json] [--compare previous.json]
+
+Seeds users × days of history (benchmarks/seed.py), then times each service
+call for a sample of users, each in its own session as the handlers do, and
+each scheduler job once with a recording Bot; for the jobs a share of users
+is made due at the current time so they actually send. Results (p50/p95/mean
+and SQL statements per call) are printed and optionally written as JSON;
+--compare prints the p50 change against an earlier JSON file.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+from typing import Awaitable, Callable, Dict, List
+
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_services.db')}",
+)
+
+from sqlalchemy import update  # noqa: E402
+
+from bot.db import crud  # noqa: E402
+from bot.db.database import async_session, engine  # noqa: E402
+from bot.db.models import Settings  # noqa: E402
+from bot.db.query_stats import track_queries  # noqa: E402
+from bot.scheduler import jobs  # noqa: E402
+from bot.services.alerts import check_alerts  # noqa: E402
+from bot.services.analytics import get_weekly_stats  # noqa: E402
+from bot.services.daily_summary import get_daily_summary  # noqa: E402
+from benchmarks.offline import build_bot  # noqa: E402
+from benchmarks.seed import seed  # noqa: E402
+
+SERVICES: Dict[str, Callable[..., Awaitable]] = {
+    "get_weekly_stats": lambda session, user_id: get_weekly_stats(session, user_id),
+    "get_daily_summary": lambda session, user_id: get_daily_summary(session, user_id, date.today()),
+    "check_alerts": lambda session, user_id: check_alerts(session, user_id),
+    "get_workout_streak": lambda session, user_id: crud.get_workout_streak(session, user_id),
+}
+
+JOBS = {
+    "job.weigh_reminder": jobs.send_weigh_reminder,
+    "job.daily_reminder": jobs.send_daily_reminder,
+    "job.weekly_report_pregenerate": jobs.pregenerate_weekly_reports,
+    "job.weekly_report": jobs.send_weekly_report,
+    "job.alerts_check": jobs.check_and_send_alerts,
+}
+
+
+def summarize(timings: List[float], statements: List[int]) -> Dict[str, float]:
+    timings_ms = sorted(t * 1000 for t in timings)
+    return {
+        "runs": len(timings_ms),
+        "p50_ms": round(statistics.median(timings_ms), 3),
+        "p95_ms": round(timings_ms[min(len(timings_ms) - 1, int(0.95 * len(timings_ms)))], 3),
+        "mean_ms": round(statistics.fmean(timings_ms), 3),
+        "statements": round(statistics.fmean(statements), 1),
+    }
+
+
+async def bench_service(call, user_ids: List[int]) -> Dict[str, float]:
+    timings, statements = [], []
+    for user_id in user_ids:
+        async with async_session() as session:
+            with track_queries() as stats:
+                started = time.perf_counter()
+                await call(session, user_id)
+                timings.append(time.perf_counter() - started)
+            statements.append(stats.statements)
+    return summarize(timings, statements)
+
+
+async def make_due(users: int, share: float) -> None:
+    """Move every 1/share-th user's reminders and weigh day to right now."""
+    now = datetime.now()
+    step = max(1, round(1 / share)) if share > 0 else users + 1
+    async with async_session() as session:
+        await session.execute(
+            update(Settings)
+            .where(Settings.user_id % step == 0)
+            .values(
+                weigh_day=now.strftime("%A").lower(),
+                weigh_time=now.time().replace(second=0, microsecond=0),
+                daily_reminder_time=now.time().replace(second=0, microsecond=0),
+                weekly_report_time=now.time().replace(second=0, microsecond=0),
+            )
+        )
+        await session.commit()
+
+
+async def bench_job(job) -> Dict[str, float]:
+    bot = build_bot()
+    with track_queries() as stats:
+        started = time.perf_counter()
+        await job(bot)
+        elapsed = time.perf_counter() - started
+    result = summarize([elapsed], [stats.statements])
+    result["messages"] = len(bot.session.calls)
+    return result
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def run(args) -> Dict:
+    summary = await seed(args.users, args.days, args.seed)
+    print(f"Seeded {args.users} users x {args.days} days in {summary.seconds:.1f} s")
+
+    user_ids = list(range(1, args.users + 1, max(1, args.users // args.sample)))[: args.sample]
+    results: Dict[str, Dict[str, float]] = {}
+    for name, call in SERVICES.items():
+        await bench_service(call, user_ids[:3])  # warm-up
+        results[name] = await bench_service(call, user_ids)
+
+    await make_due(args.users, args.due_share)
+    for name, job in JOBS.items():
+        results[name] = await bench_job(job)
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "database": engine.dialect.name,
+            "users": args.users,
+            "days": args.days,
+            "seed": args.seed,
+            "sample": len(user_ids),
+            "due_share": args.due_share,
+            "rows": summary.rows,
+        },
+        "results": results,
+    }
+
+
+def print_results(report: Dict, previous: Dict = None) -> None:
+    print(f"\n{'benchmark':<30} {'runs':>5} {'p50 ms':>9} {'p95 ms':>9} {'SQL':>6} {'vs prev':>9}")
+    for name, result in report["results"].items():
+        change = ""
+        before = (previous or {}).get("results", {}).get(name)
+        if before and before["p50_ms"]:
+            change = f"{(result['p50_ms'] / before['p50_ms'] - 1) * 100:+.0f}%"
+        print(
+            f"{name:<30} {result['runs']:>5} {result['p50_ms']:>9.2f} "
+            f"{result['p95_ms']:>9.2f} {result['statements']:>6.1f} {change:>9}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--sample", type=int, default=50, help="users timed per service")
+    parser.add_argument("--due-share", type=float, default=0.1,
+                        help="share of users the scheduler jobs find due")
+    parser.add_argument("--out", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="earlier JSON results to compare against")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    report = asyncio.run(run(args))
+
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+    print_results(report, previous)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\nWrote {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Measure bot cold-start import time with `python -X importtime`.
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 5] [--budget-ms 3000] [--top 15]
+
+Imports bot.main in fresh interpreters, reports the median cumulative import time
+and the slowest modules, and exits non-zero when the median exceeds the budget or
+when a module that should load lazily (matplotlib, openai, PIL) is imported at
+startup.
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY_MODULE = "bot.main"
+# Only imported on first chart render / first AI coach call
+LAZY_MODULES = ("matplotlib", "openai", "PIL")
+# -X importtime inflates timings; aiogram's pydantic models alone are most of this
+STARTUP_BUDGET_MS = 3000
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)$")
+
+
+def run_once(env: Dict[str, str]) -> Tuple[int, Dict[str, int], List[str]]:
+    """One cold import: (total µs, self µs per top-level package, lazy modules loaded)."""
+    code = (
+        f"import {ENTRY_MODULE}, sys; "
+        f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    total = 0
+    packages: Dict[str, int] = defaultdict(int)
+    for line in result.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, module = match.groups()
+        if module == ENTRY_MODULE:
+            total = int(cumulative_us)
+        packages[module.split(".")[0]] += int(self_us)
+
+    loaded = [m for m in result.stdout.strip().split(",") if m]
+    return total, packages, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault(
+        "DATABASE_URL",
+        f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_startup.db')}",
+    )
+
+    run_once(env)  # warm the bytecode and filesystem caches
+    totals = []
+    package_times: Dict[str, List[int]] = defaultdict(list)
+    loaded: List[str] = []
+    for _ in range(args.runs):
+        total, packages, loaded = run_once(env)
+        totals.append(total)
+        for name, us in packages.items():
+            package_times[name].append(us)
+
+    median_ms = statistics.median(totals) / 1000
+    print(f"{ENTRY_MODULE} import: median {median_ms:.0f} ms over {args.runs} runs "
+          f"(budget {args.budget_ms:.0f} ms)")
+    print("\nslowest top-level packages (self time, median ms):")
+    ranked = sorted(package_times.items(), key=lambda item: -statistics.median(item[1]))
+    for name, times in ranked[: args.top]:
+        print(f"  {statistics.median(times) / 1000:8.1f}  {name}")
+
+    failed = False
+    if loaded:
+        print(f"\nFAIL: imported at startup but should be lazy: {', '.join(loaded)}")
+        failed = True
+    if median_ms > args.budget_ms:
+        print(f"\nFAIL: startup {median_ms:.0f} ms is over the {args.budget_ms:.0f} ms budget")
+        failed = True
+    if not failed:
+        print("\nOK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Check how many SQL statements each handler runs against its query budget.
+
+Usage:
+    python -m benchmarks.check_query_budgets [--users 3]
+
+Feeds the main user flows (onboarding, logging, workouts, strength journal,
+reports, settings) through the Dispatcher offline against a fresh SQLite
+database, prints per-handler statement counts and DB time as recorded by
+QueryStatsMiddleware, and exits non-zero when any handler call ran more
+statements than its budget in bot/middlewares/query_stats.py.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'check_query_budgets.db')}",
+)
+
+from bot.metrics import get_handler_query_stats, reset_metrics  # noqa: E402
+from bot.middlewares.query_stats import query_budget_for  # noqa: E402
+from benchmarks.offline import (  # noqa: E402
+    ONBOARDING,
+    build_bot,
+    build_dispatcher,
+    feed,
+    reset_schema,
+)
+
+SCENARIOS = {
+    "onboarding": ONBOARDING,
+    "logging": (
+        "📝 Записать",
+        "⚖️ Вес", "84.5",
+        "🍽 Калории", "650",
+        "🍽 Калории", "гречка 200г",
+        "💧 Вода", "500",
+        "😴 Сон", "7.5",
+        "◀️ Назад",
+    ),
+    "quick_entry": ("овсянка 80г", "вес 84.2"),
+    "workout": ("🏋️ Тренировка", "🏋️ Зал", "60", "300"),
+    "strength": (
+        "💪 Силовой журнал",
+        "➕ Добавить запись", "Жим лёжа", "80", "5", "3",
+        "➕ Добавить запись", ("cb", "exercise_Жим лёжа"), "85", "5", "3",
+        "📈 Прогресс по упражнению",
+        "◀️ Назад",
+    ),
+    "reports": (
+        "📊 Итоги сегодня",
+        "📈 Отчёты",
+        "📈 График веса",
+        "📊 Недельный отчёт",
+        "📅 Месячная сводка",
+        "🔥 Streak",
+        "🗓 Активность за год",
+        "📋 Мой план",
+        "◀️ Назад",
+    ),
+    "settings": (
+        "⚙️ Настройки",
+        "🤖 AI-коуч: вкл/выкл",
+        "🤖 AI-коуч: вкл/выкл",
+        "◀️ Назад",
+    ),
+}
+
+
+async def run(users: int) -> bool:
+    await reset_schema()
+    dp = build_dispatcher()
+    bot = build_bot()
+    reset_metrics()
+
+    for user_id in range(1, users + 1):
+        for steps in SCENARIOS.values():
+            await feed(dp, bot, user_id, steps)
+
+    stats = get_handler_query_stats()
+    print(f"{'handler':<45} {'calls':>5} {'avg':>6} {'max':>4} {'budget':>6} {'db ms':>7}")
+    ok = True
+    for name, totals in sorted(stats.items()):
+        budget = query_budget_for(name)
+        flag = ""
+        if totals.max_statements > budget:
+            flag = "  OVER"
+            ok = False
+        print(
+            f"{name:<45} {totals.calls:>5} {totals.avg_statements:>6.1f} "
+            f"{totals.max_statements:>4} {budget:>6} {totals.db_time * 1000:>7.1f}{flag}"
+        )
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=3)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    ok = asyncio.run(run(args.users))
+    print("\nOK" if ok else "\nFAIL: handlers over their query budget")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""
+Check the query plans of the crud queries against snapshots.
+
+Usage:
+    python -m benchmarks.check_query_plans [--update] [--users 50] [--days 90]
+
+Seeds a dataset, runs every query-issuing function of bot/db/crud.py with
+representative arguments (the writing ones too, in the order listed, so they
+change the data later ones see) and EXPLAINs each SELECT/UPDATE/DELETE
+statement it sent; plain INSERTs have no plan worth checking. SQLite gets
+EXPLAIN QUERY PLAN, Postgres EXPLAIN (FORMAT JSON) with enable_seqscan off,
+so the check is whether an index *can* serve the query; the seeded tables
+are too small for the planner's own choice to mean much.
+
+Fails when a statement scans a whole table or walks an open primary-key
+range across every user's rows (unless listed in ALLOWED_SCANS), or when a
+plan differs from benchmarks/query_plans/<dialect>.json (taken with the
+default dataset size); --update rewrites the snapshot after an intended
+schema or query change.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import sys
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'check_query_plans.db')}",
+)
+
+from sqlalchemy import event, text  # noqa: E402
+
+from bot.db import crud  # noqa: E402
+from bot.db.database import async_session, engine  # noqa: E402
+from bot.db.models import Base, CalorieEntry  # noqa: E402
+from benchmarks.seed import TELEGRAM_ID_BASE, seed  # noqa: E402
+
+SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "query_plans")
+USER_ID = 7
+TODAY = date.today()
+EXERCISE = "Жим лёжа"
+
+# query -> tables it may scan in full, with the reason
+ALLOWED_SCANS: Dict[str, Dict[str, str]] = {
+    "get_all_users_with_settings": {
+        "users": "the scheduler reads every active user",
+        "settings": "joined to every active user",
+    },
+}
+
+NEW_TELEGRAM_ID = TELEGRAM_ID_BASE - 1
+IMPORT_DATES = [TODAY - timedelta(days=days) for days in (1, 2, 3)]
+
+
+async def _create_workout_track(session):
+    workout = await crud.create_workout(session, USER_ID, TODAY, "cardio", duration_min=41)
+    _captured.clear()  # only the track's own statements
+    return await crud.create_workout_track(session, workout.id, 7000, 2400, 800)
+
+
+QUERIES: Dict[str, Callable[[Any], Awaitable]] = {
+    "get_user_by_telegram_id": lambda s: crud.get_user_by_telegram_id(s, TELEGRAM_ID_BASE + USER_ID),
+    "create_user": lambda s: crud.create_user(s, NEW_TELEGRAM_ID, "plan_check"),
+    "get_or_create_user": lambda s: crud.get_or_create_user(s, NEW_TELEGRAM_ID),
+    "get_profile": lambda s: crud.get_profile(s, USER_ID),
+    "create_or_update_profile": lambda s: crud.create_or_update_profile(s, USER_ID, age=31),
+    "get_computed_targets": lambda s: crud.get_computed_targets(s, USER_ID),
+    "create_or_update_computed_targets": lambda s: crud.create_or_update_computed_targets(
+        s, USER_ID, 1800, 2500, 2000, 150, 70, 200, Decimal("20")
+    ),
+    "get_daily_log": lambda s: crud.get_daily_log(s, USER_ID, TODAY),
+    "create_or_update_daily_log": lambda s: crud.create_or_update_daily_log(s, USER_ID, TODAY, water_ml=2000),
+    "get_daily_logs_range": lambda s: crud.get_daily_logs_range(s, USER_ID, TODAY - timedelta(days=6), TODAY),
+    "get_last_weight_log": lambda s: crud.get_last_weight_log(s, USER_ID),
+    "get_weight_week_ago": lambda s: crud.get_weight_week_ago(s, USER_ID, TODAY),
+    "create_calorie_entry": lambda s: crud.create_calorie_entry(s, USER_ID, TODAY, 350, "Гречка"),
+    "get_total_calories_for_date": lambda s: crud.get_total_calories_for_date(s, USER_ID, TODAY),
+    "get_calorie_entries_for_date": lambda s: crud.get_calorie_entries_for_date(s, USER_ID, TODAY),
+    "get_calorie_entry": lambda s: crud.get_calorie_entry(s, USER_ID, 1),
+    "get_meal_history": lambda s: crud.get_meal_history(s, USER_ID, TODAY - timedelta(days=30)),
+    "create_workout": lambda s: crud.create_workout(s, USER_ID, TODAY, "strength", duration_min=60),
+    "get_workouts_range": lambda s: crud.get_workouts_range(s, USER_ID, TODAY - timedelta(days=6), TODAY),
+    "get_workouts_count_this_week": lambda s: crud.get_workouts_count_this_week(s, USER_ID, TODAY),
+    "get_last_workout": lambda s: crud.get_last_workout(s, USER_ID),
+    "get_workouts_for_date": lambda s: crud.get_workouts_for_date(s, USER_ID, TODAY),
+    "find_workout": lambda s: crud.find_workout(s, USER_ID, TODAY, "strength", 60),
+    "get_burned_calories_for_date": lambda s: crud.get_burned_calories_for_date(s, USER_ID, TODAY),
+    "create_workout_track": _create_workout_track,
+    "create_strength_log": lambda s: crud.create_strength_log(
+        s, USER_ID, TODAY, EXERCISE, Decimal("80"), 5, 3, Decimal("93.3")
+    ),
+    "get_strength_logs_by_exercise": lambda s: crud.get_strength_logs_by_exercise(s, USER_ID, EXERCISE),
+    "get_last_strength_log_for_exercise": lambda s: crud.get_last_strength_log_for_exercise(s, USER_ID, EXERCISE),
+    "get_user_exercises": lambda s: crud.get_user_exercises(s, USER_ID),
+    "get_settings": lambda s: crud.get_settings(s, USER_ID),
+    "create_or_update_settings": lambda s: crud.create_or_update_settings(s, USER_ID, use_ai_coach=False),
+    "get_cached_coach_comment": lambda s: crud.get_cached_coach_comment(s, "0" * 64, TODAY),
+    "save_coach_comment": lambda s: crud.save_coach_comment(s, "0" * 64, "plan-check", "…", TODAY),
+    "get_weekly_report": lambda s: crud.get_weekly_report(s, USER_ID, TODAY),
+    "get_weekly_report_user_ids": lambda s: crud.get_weekly_report_user_ids(s, TODAY),
+    "save_weekly_report": lambda s: crud.save_weekly_report(s, USER_ID, TODAY, "plan check"),
+    "mark_weekly_report_sent": lambda s: crud.mark_weekly_report_sent(s, 1),
+    "delete_weekly_reports_before": lambda s: crud.delete_weekly_reports_before(s, TODAY - timedelta(days=14)),
+    "bulk_upsert_daily_logs": lambda s: crud.bulk_upsert_daily_logs(s, USER_ID, [
+        {"log_date": day, "weight_kg": Decimal("80.5"), "water_ml": 2000, "sleep_hours": None}
+        for day in IMPORT_DATES
+    ]),
+    "bulk_insert_calorie_entries": lambda s: crud.bulk_insert_calorie_entries(s, USER_ID, [
+        {"entry_date": day, "calories": 500, "description": "Импорт"} for day in IMPORT_DATES
+    ]),
+    "bulk_insert_workouts": lambda s: crud.bulk_insert_workouts(s, USER_ID, [
+        {"workout_date": day, "workout_type": "cardio", "duration_min": 30,
+         "calories_burned": 250, "notes": None}
+        for day in IMPORT_DATES
+    ]),
+    "get_user_rows_page": lambda s: crud.get_user_rows_page(s, CalorieEntry, USER_ID, 0, 500),
+    "get_workout_streak": lambda s: crud.get_workout_streak(s, USER_ID),
+    "get_daily_metrics": lambda s: crud.get_daily_metrics(s, USER_ID, TODAY - timedelta(days=29), TODAY),
+    "get_all_users_with_settings": lambda s: crud.get_all_users_with_settings(s),
+}
+
+_EXPLAINED = ("SELECT", "UPDATE", "DELETE")
+_captured: List[Tuple[str, Any]] = []
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _capture(conn, cursor, statement, parameters, context, executemany):
+    if statement.lstrip().upper().startswith(_EXPLAINED) and not statement.startswith("EXPLAIN"):
+        _captured.append((statement, parameters))
+
+
+async def capture_statements(query: Callable[[Any], Awaitable]) -> List[Tuple[str, Any]]:
+    _captured.clear()
+    async with async_session() as session:
+        await query(session)
+    return list(_captured)
+
+
+def _postgres_lines(node: Dict, depth: int = 0) -> List[str]:
+    line = node["Node Type"]
+    if "Index Name" in node:
+        line += f" using {node['Index Name']}"
+    if "Relation Name" in node:
+        line += f" on {node['Relation Name']}"
+    if "Index Cond" in node:
+        line += f" {node['Index Cond']}"
+    lines = ["  " * depth + line]
+    for child in node.get("Plans", []):
+        lines += _postgres_lines(child, depth + 1)
+    return lines
+
+
+async def explain(statement: str, parameters: Any) -> List[str]:
+    async with engine.connect() as conn:
+        if engine.dialect.name == "postgresql":
+            await conn.exec_driver_sql("SET enable_seqscan = off")
+            result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+            plan = result.scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return _postgres_lines(plan[0]["Plan"])
+        result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return [row[3] for row in result.all()]
+
+
+def full_scans(lines: List[str]) -> List[str]:
+    """
+    Real tables a plan reads in full, directly or through a whole index.
+
+    An open primary-key range (id > ?) counts too: it walks every user's rows
+    from that id on rather than seeking to one user's.
+    """
+    tables = set(Base.metadata.tables)
+    scanned = []
+    for line in lines:
+        match = (
+            re.match(r"\s*SCAN (\w+)( USING .*)?$", line)
+            or re.match(r"\s*SEARCH (\w+) USING INTEGER PRIMARY KEY \(rowid[<>]", line)
+            or re.match(r"\s*Seq Scan on (\w+)", line)
+            or re.match(r"\s*Index (?:Only )?Scan(?: Backward)? using \w+_pkey on (\w+) \(\(?id [<>]", line)
+        )
+        if match and match.group(1) in tables:
+            scanned.append(match.group(1))
+    return scanned
+
+
+async def run(args) -> bool:
+    await seed(args.users, args.days)
+    async with engine.begin() as conn:
+        await conn.execute(text("ANALYZE"))
+
+    dialect = engine.dialect.name
+    plans: Dict[str, List[str]] = {}
+    ok = True
+    for name, query in QUERIES.items():
+        statements = await capture_statements(query)
+        lines: List[str] = []
+        for index, (statement, parameters) in enumerate(statements):
+            if len(statements) > 1:
+                lines.append(f"-- statement {index + 1}")
+            lines += await explain(statement, parameters)
+        plans[name] = lines
+
+        allowed = ALLOWED_SCANS.get(name, {})
+        unexpected = [table for table in full_scans(lines) if table not in allowed]
+        if unexpected:
+            ok = False
+            print(f"FAIL {name}: full scan of {', '.join(unexpected)}")
+            for line in lines:
+                print(f"       {line}")
+
+    # Plans depend on table statistics, so snapshots are only comparable for the same dataset
+    dataset = {"users": args.users, "days": args.days}
+    path = os.path.join(SNAPSHOT_DIR, f"{dialect}.json")
+    if args.update or not os.path.exists(path):
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"dataset": dataset, "plans": plans}, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"Wrote {path}")
+        return ok
+
+    with open(path, encoding="utf-8") as f:
+        saved = json.load(f)
+    if saved["dataset"] != dataset:
+        print(f"Snapshot was taken with {saved['dataset']}; only checked for full scans")
+        return ok
+    snapshot = saved["plans"]
+    for name in sorted(set(plans) | set(snapshot)):
+        if plans.get(name) != snapshot.get(name):
+            ok = False
+            print(f"FAIL {name}: plan changed")
+            print("  snapshot: " + "\n            ".join(snapshot.get(name) or ["(missing)"]))
+            print("  now:      " + "\n            ".join(plans.get(name) or ["(missing)"]))
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--update", action="store_true", help="rewrite the snapshot")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--days", type=int, default=90)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    ok = asyncio.run(run(args))
+    print("OK" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Local OpenAI-compatible stand-in for the AI coach.
+
+Usage:
+    python -m benchmarks.fake_openai [--port 8099] [--delay 0.5] [--fail-rate 0.0]
+
+Then run the bot with OPENAI_BASE_URL=http://127.0.0.1:8099/v1 and any OPENAI_API_KEY.
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from aiohttp import web
+
+COMMENT = "Хорошая неделя! Добавь одну тренировку и следи за сном."
+
+
+def create_app(delay: float = 0.5, fail_rate: float = 0.0) -> web.Application:
+    """App answering /v1/chat/completions after `delay` seconds, failing with 500 at `fail_rate`."""
+    app = web.Application()
+    app["delay"] = delay
+    app["fail_rate"] = fail_rate
+    app["in_flight"] = 0
+    app["max_in_flight"] = 0
+    app["requests"] = 0
+
+    async def chat_completions(request: web.Request) -> web.Response:
+        app["requests"] += 1
+        app["in_flight"] += 1
+        app["max_in_flight"] = max(app["max_in_flight"], app["in_flight"])
+        try:
+            body = await request.json()
+            await asyncio.sleep(app["delay"])
+            if random.random() < app["fail_rate"]:
+                return web.json_response(
+                    {"error": {"message": "stand-in failure", "type": "server_error"}},
+                    status=500,
+                )
+            return web.json_response(
+                {
+                    "id": f"chatcmpl-{app['requests']}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body.get("model", "stand-in"),
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": COMMENT},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+                }
+            )
+        finally:
+            app["in_flight"] -= 1
+
+    app.router.add_post("/v1/chat/completions", chat_completions)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI-compatible stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--delay", type=float, default=0.5, help="seconds per response")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of 500 answers")
+    args = parser.parse_args()
+
+    web.run_app(create_app(args.delay, args.fail_rate), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
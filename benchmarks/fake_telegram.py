@@ -0,0 +1,210 @@
+"""
+Local stand-in for the Telegram Bot API.
+
+Usage:
+    python -m benchmarks.fake_telegram [--port 8081] [--latency 0.05]
+        [--global-rate 30] [--chat-rate 1] [--chat-burst 3] [--throttle-rate 0.0]
+
+Then run the bot with BOT_API_URL=http://127.0.0.1:8081 and any BOT_TOKEN.
+
+Answers the methods the bot uses (getMe, getUpdates, deleteWebhook,
+sendMessage, sendPhoto, sendDocument, editMessageText, editMessageCaption,
+answerCallbackQuery) after a jittered delay. Like Telegram it rejects sends
+over a global and a per-chat rate with 429 and retry_after, and can inject
+extra 429s at random. GET /stats returns call, 429 and concurrency counters.
+"""
+import argparse
+import asyncio
+import itertools
+import math
+import random
+import time
+from collections import defaultdict
+from typing import List, Optional
+
+from aiohttp import web
+
+SEND_METHODS = {"sendmessage", "sendphoto", "senddocument"}
+BOT_USER = {"id": 42, "is_bot": True, "first_name": "Stand-in", "username": "standin_bot"}
+
+
+class TokenBucket:
+    """`rate` tokens per second, holding at most `burst`."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Take a token; returns 0, or the seconds until one is available."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+def _message(chat_id: int, message_id: int, **content) -> dict:
+    return {
+        "message_id": message_id,
+        "date": int(time.time()),
+        "chat": {"id": chat_id, "type": "private"},
+        "from": BOT_USER,
+        **content,
+    }
+
+
+def _too_many_requests(retry_after: float) -> web.Response:
+    seconds = max(1, math.ceil(retry_after))
+    return web.json_response(
+        {
+            "ok": False,
+            "error_code": 429,
+            "description": f"Too Many Requests: retry after {seconds}",
+            "parameters": {"retry_after": seconds},
+        },
+        status=429,
+    )
+
+
+def create_app(
+    latency: float = 0.05,
+    global_rate: float = 30.0,
+    chat_rate: float = 1.0,
+    chat_burst: float = 3.0,
+    throttle_rate: float = 0.0,
+) -> web.Application:
+    """
+    App serving /bot<token>/<method>.
+
+    Sends over `global_rate`/s overall or `chat_rate`/s per chat (after a burst of
+    `chat_burst`) get 429, as do `throttle_rate` of all sends at random.
+    """
+    app = web.Application()
+    app["latency"] = latency
+    app["throttle_rate"] = throttle_rate
+    app["global_bucket"] = TokenBucket(global_rate, global_rate)
+    app["chat_buckets"] = defaultdict(lambda: TokenBucket(chat_rate, chat_burst))
+    app["updates"] = []
+    app["new_update"] = asyncio.Event()
+    app["message_ids"] = itertools.count(1)
+    app["stats"] = {"calls": defaultdict(int), "throttled": 0, "in_flight": 0, "max_in_flight": 0}
+    app["chats"] = set()
+
+    def check_limits(chat_id: int) -> Optional[float]:
+        if random.random() < app["throttle_rate"]:
+            return random.uniform(1, 5)
+        wait = app["chat_buckets"][chat_id].take()
+        if wait:
+            return wait
+        return app["global_bucket"].take() or None
+
+    async def get_updates(params) -> List[dict]:
+        offset = int(params.get("offset", 0) or 0)
+        timeout = float(params.get("timeout", 0) or 0)
+        pending = [u for u in app["updates"] if u["update_id"] >= offset]
+        if not pending and timeout:
+            app["new_update"].clear()
+            try:
+                await asyncio.wait_for(app["new_update"].wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            pending = [u for u in app["updates"] if u["update_id"] >= offset]
+        return pending
+
+    async def bot_method(request: web.Request) -> web.Response:
+        method = request.match_info["method"].lower()
+        stats = app["stats"]
+        stats["calls"][method] += 1
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        try:
+            params = await request.post() if request.can_read_body else {}
+            if method == "getupdates":
+                return web.json_response({"ok": True, "result": await get_updates(params)})
+
+            await asyncio.sleep(app["latency"] * random.uniform(0.5, 1.5))
+            chat_id = int(params.get("chat_id", 0) or 0)
+
+            if method in SEND_METHODS:
+                retry_after = check_limits(chat_id)
+                if retry_after:
+                    stats["throttled"] += 1
+                    return _too_many_requests(retry_after)
+                app["chats"].add(chat_id)
+
+            message_id = next(app["message_ids"])
+            if method == "getme":
+                result = BOT_USER
+            elif method == "sendmessage":
+                result = _message(chat_id, message_id, text=params.get("text", ""))
+            elif method == "sendphoto":
+                photo = {"file_id": f"photo{message_id}", "file_unique_id": f"p{message_id}",
+                         "width": 1000, "height": 900}
+                result = _message(chat_id, message_id, photo=[photo], caption=params.get("caption"))
+            elif method == "senddocument":
+                document = {"file_id": f"doc{message_id}", "file_unique_id": f"d{message_id}"}
+                result = _message(chat_id, message_id, document=document)
+            elif method in ("editmessagetext", "editmessagecaption"):
+                result = _message(
+                    chat_id,
+                    int(params.get("message_id", message_id)),
+                    text=params.get("text"),
+                    caption=params.get("caption"),
+                )
+            elif method in ("answercallbackquery", "deletewebhook"):
+                result = True
+            else:
+                return web.json_response(
+                    {"ok": False, "error_code": 404, "description": "Not Found: method not found"},
+                    status=404,
+                )
+            return web.json_response({"ok": True, "result": result})
+        finally:
+            stats["in_flight"] -= 1
+
+    async def get_stats(request: web.Request) -> web.Response:
+        stats = app["stats"]
+        return web.json_response({
+            "calls": dict(stats["calls"]),
+            "throttled": stats["throttled"],
+            "max_in_flight": stats["max_in_flight"],
+            "chats": len(app["chats"]),
+        })
+
+    app.router.add_route("*", "/bot{token}/{method}", bot_method)
+    app.router.add_get("/stats", get_stats)
+    return app
+
+
+def push_update(app: web.Application, update: dict) -> None:
+    """Queue an update for getUpdates; update_id is assigned if missing."""
+    update.setdefault("update_id", len(app["updates"]) + 1)
+    app["updates"].append(update)
+    app["new_update"].set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Telegram Bot API stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.05, help="mean seconds per call")
+    parser.add_argument("--global-rate", type=float, default=30.0, help="sends per second overall")
+    parser.add_argument("--chat-rate", type=float, default=1.0, help="sends per second per chat")
+    parser.add_argument("--chat-burst", type=float, default=3.0, help="sends a chat may burst")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of random 429s")
+    args = parser.parse_args()
+
+    web.run_app(
+        create_app(args.latency, args.global_rate, args.chat_rate, args.chat_burst, args.throttle_rate),
+        host=args.host,
+        port=args.port,
+    )
+
+
+if __name__ == "__main__":
+    main()
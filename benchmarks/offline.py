@@ -0,0 +1,134 @@
+"""
+Drive the bot's Dispatcher offline: no Telegram, updates are built locally and
+every Bot API call is answered by a recording session.
+
+Shared by the benchmark and check scripts; not runnable on its own.
+"""
+import itertools
+from datetime import datetime
+from typing import Any, List, Optional
+
+from aiogram import Bot, Dispatcher
+from aiogram.client.session.base import BaseSession
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.methods import TelegramMethod
+from aiogram.types import CallbackQuery, Chat, Message, Update, User
+
+from bot.db.database import engine
+from bot.db.models import Base
+from bot.handlers import get_all_routers
+from bot.middlewares import setup_middlewares
+
+# Onboarding of a new user, as a list of updates fed in order (see handlers/start.py)
+ONBOARDING = (
+    "/start",
+    ("cb", "start_onboarding"),
+    ("cb", "gender_male"),
+    "30",
+    "180",
+    "85",
+    ("cb", "activity_moderate"),
+    ("cb", "goal_recomp"),
+    ("cb", "speed_standard"),
+)
+
+_ids = itertools.count(1)
+_dispatcher: Optional[Dispatcher] = None
+
+
+class RecordingSession(BaseSession):
+    """Bot API session that answers every call locally and keeps a log of them."""
+
+    def __init__(self):
+        super().__init__()
+        self.calls: List[TelegramMethod] = []
+
+    async def close(self) -> None:
+        pass
+
+    async def make_request(self, bot: Bot, method: TelegramMethod, timeout: Optional[int] = None) -> Any:
+        self.calls.append(method)
+        returning = method.__returning__
+        if returning is bool:
+            return True
+        if "Message" in str(returning):
+            chat_id = getattr(method, "chat_id", None) or 1
+            return Message(
+                message_id=next(_ids),
+                date=datetime.now(),
+                chat=Chat(id=chat_id, type="private"),
+                text=getattr(method, "text", None),
+            ).as_(bot)
+        return True
+
+    async def stream_content(self, url, headers=None, timeout=30, chunk_size=65536, raise_for_status=True):
+        raise NotImplementedError("file downloads are not available offline")
+        yield b""  # pragma: no cover
+
+
+def message_update(user_id: int, text: str) -> Update:
+    user = User(id=user_id, is_bot=False, first_name=f"user{user_id}")
+    return Update(
+        update_id=next(_ids),
+        message=Message(
+            message_id=next(_ids),
+            date=datetime.now(),
+            chat=Chat(id=user_id, type="private"),
+            from_user=user,
+            text=text,
+        ),
+    )
+
+
+def callback_update(user_id: int, data: str) -> Update:
+    user = User(id=user_id, is_bot=False, first_name=f"user{user_id}")
+    message = Message(
+        message_id=next(_ids),
+        date=datetime.now(),
+        chat=Chat(id=user_id, type="private"),
+        text="…",
+    )
+    return Update(
+        update_id=next(_ids),
+        callback_query=CallbackQuery(
+            id=str(next(_ids)),
+            from_user=user,
+            chat_instance=str(user_id),
+            data=data,
+            message=message,
+        ),
+    )
+
+
+def make_update(user_id: int, step) -> Update:
+    """A step is message text, or ("cb", data) for an inline button press."""
+    if isinstance(step, tuple):
+        return callback_update(user_id, step[1])
+    return message_update(user_id, step)
+
+
+def build_dispatcher() -> Dispatcher:
+    """Dispatcher wired like bot.main; routers can only be attached once per process."""
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = Dispatcher(storage=MemoryStorage())
+        for router in get_all_routers():
+            _dispatcher.include_router(router)
+        setup_middlewares(_dispatcher)
+    return _dispatcher
+
+
+def build_bot() -> Bot:
+    return Bot("42:OFFLINE", session=RecordingSession())
+
+
+async def reset_schema() -> None:
+    """Recreate all tables in the database DATABASE_URL points at."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def feed(dp: Dispatcher, bot: Bot, user_id: int, steps) -> None:
+    for step in steps:
+        await dp.feed_update(bot, make_update(user_id, step))
@@ -0,0 +1,230 @@
+"""
+Seed the database with realistic synthetic users.
+
+Usage:
+    python -m benchmarks.seed [--users 500] [--days 180] [--seed 1] [--keep]
+
+Recreates the tables (unless --keep) and generates N users with profiles,
+settings and targets, and M days of history each. Users differ in how
+consistently they log, how often they train and which way their weight
+moves; days are skipped, weigh-ins are noisy, meals vary in count and size,
+and strength lifts progress over time. Rows are bulk-inserted per table.
+
+Uses DATABASE_URL (a temporary SQLite file by default). The benchmark
+scripts import seed() to build their datasets.
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time as clock
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'seed.db')}",
+)
+
+from sqlalchemy import func, insert, select  # noqa: E402
+
+from bot.db.database import async_session  # noqa: E402
+from bot.db.models import (  # noqa: E402
+    CalorieEntry,
+    ComputedTargets,
+    DailyLog,
+    Profile,
+    Settings,
+    StrengthLog,
+    User,
+    Workout,
+)
+from bot.services.calculator import calculate_targets  # noqa: E402
+from benchmarks.offline import reset_schema  # noqa: E402
+
+TELEGRAM_ID_BASE = 100_000_000
+# Rows per INSERT statement; stays under SQLite's bound-parameter limit
+CHUNK_ROWS = 500
+
+FOODS = ("Гречка", "Овсянка", "Курица", "Рис", "Творог", "Яйца", "Банан", "Салат", None)
+EXERCISES = ("Жим лёжа", "Присед", "Становая тяга", "Жим стоя", "Подтягивания", "Тяга штанги")
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+# workout type: (share, kcal per minute)
+WORKOUT_KINDS = {"gym": (0.55, 6.5), "cardio": (0.25, 10.0), "walking": (0.15, 4.5), "other": (0.05, 6.0)}
+# goal: weight drift in kg/day
+GOALS = {"cut": -0.07, "recomp": -0.01, "bulk": 0.03}
+
+
+@dataclass
+class SeedSummary:
+    users: int
+    days: int
+    rows: Dict[str, int]
+    seconds: float
+
+
+def _user_rows(rng: random.Random, user_id: int, days: int, end_date: date) -> Dict[str, List[dict]]:
+    """All rows of one synthetic user."""
+    gender = rng.choice(("male", "female"))
+    age = rng.randint(18, 60)
+    height = int(rng.gauss(178 if gender == "male" else 165, 7))
+    weight = max(45.0, rng.gauss(85 if gender == "male" else 68, 12))
+    activity = rng.choice(("sedentary", "light", "moderate", "active"))
+    goal = rng.choices(tuple(GOALS), weights=(5, 3, 2))[0]
+    targets = calculate_targets(gender, Decimal(f"{weight:.1f}"), height, age, activity, goal)
+
+    # Per-user habits: how often they log, weigh in and train
+    adherence = rng.betavariate(5, 2)
+    weigh_rate = rng.uniform(0.3, 0.9)
+    workouts_per_week = rng.choice((0, 1, 2, 3, 3, 4, 5))
+    exercises = rng.sample(EXERCISES, rng.randint(2, 5))
+    lifts = {name: rng.uniform(30, 100) for name in exercises}
+
+    rows: Dict[str, List[dict]] = {
+        "users": [{
+            "id": user_id,
+            "telegram_id": TELEGRAM_ID_BASE + user_id,
+            "username": f"seed{user_id}",
+            "created_at": datetime.combine(end_date - timedelta(days=days), time(9)),
+            "is_active": True,
+        }],
+        "profiles": [{
+            "user_id": user_id, "gender": gender, "age": age, "height_cm": height,
+            "current_weight_kg": Decimal(f"{weight:.2f}"), "activity_level": activity,
+            "goal": goal, "goal_speed": "standard",
+        }],
+        "computed_targets": [{
+            "user_id": user_id, "bmr": targets.bmr, "tdee": targets.tdee,
+            "target_calories": targets.target_calories, "protein_g": targets.protein_g,
+            "fat_g": targets.fat_g, "carbs_g": targets.carbs_g,
+            "deficit_percent": targets.deficit_percent,
+        }],
+        "settings": [{
+            "user_id": user_id,
+            "timezone": "Asia/Yerevan",
+            "weigh_day": rng.choice(WEEKDAYS),
+            "weigh_time": time(rng.choice((7, 8, 9, 10)), rng.choice((0, 30))),
+            "daily_reminder_time": time(rng.randint(19, 23), rng.choice((0, 30))),
+            "weekly_report_time": time(rng.randint(17, 21), rng.choice((0, 30))),
+            "use_ai_coach": rng.random() < 0.7,
+        }],
+        "daily_logs": [],
+        "calorie_entries": [],
+        "workouts": [],
+        "strength_logs": [],
+    }
+
+    for offset in range(days, 0, -1):
+        day = end_date - timedelta(days=offset - 1)
+        weight += GOALS[goal] + rng.gauss(0, 0.15)
+        if rng.random() > adherence:
+            continue
+
+        calories = 0
+        for _ in range(rng.randint(2, 5)):
+            meal = int(rng.lognormvariate(6.0, 0.45))
+            calories += meal
+            rows["calorie_entries"].append({
+                "user_id": user_id, "entry_date": day, "calories": meal,
+                "description": rng.choice(FOODS),
+            })
+
+        rows["daily_logs"].append({
+            "user_id": user_id,
+            "log_date": day,
+            "weight_kg": Decimal(f"{weight + rng.gauss(0, 0.4):.2f}") if rng.random() < weigh_rate else None,
+            "calories_consumed": calories,
+            "water_ml": rng.choice((1000, 1500, 2000, 2500, 3000)) if rng.random() < 0.6 else None,
+            "sleep_hours": Decimal(f"{min(12.0, max(3.0, rng.gauss(7.2, 1.0))):.1f}") if rng.random() < 0.5 else None,
+        })
+
+        if rng.random() < workouts_per_week / 7:
+            kind = rng.choices(tuple(WORKOUT_KINDS), weights=[w for w, _ in WORKOUT_KINDS.values()])[0]
+            duration = rng.randint(20, 100)
+            rows["workouts"].append({
+                "user_id": user_id, "workout_date": day, "workout_type": kind,
+                "duration_min": duration,
+                "calories_burned": int(duration * WORKOUT_KINDS[kind][1] * rng.uniform(0.8, 1.2)),
+            })
+            if kind == "gym":
+                for name in rng.sample(exercises, min(3, len(exercises))):
+                    lifts[name] *= rng.uniform(0.995, 1.02)
+                    lift = round(lifts[name] / 2.5) * 2.5
+                    reps = rng.randint(3, 12)
+                    rows["strength_logs"].append({
+                        "user_id": user_id, "log_date": day, "exercise_name": name,
+                        "weight_kg": Decimal(f"{lift:.2f}"), "reps": reps, "sets": rng.randint(3, 5),
+                        "e1rm": Decimal(f"{lift * (1 + reps / 30):.2f}"),
+                    })
+    return rows
+
+
+TABLES = (
+    ("users", User),
+    ("profiles", Profile),
+    ("computed_targets", ComputedTargets),
+    ("settings", Settings),
+    ("daily_logs", DailyLog),
+    ("calorie_entries", CalorieEntry),
+    ("workouts", Workout),
+    ("strength_logs", StrengthLog),
+)
+
+
+async def seed(
+    users: int,
+    days: int,
+    seed: int = 1,
+    end_date: Optional[date] = None,
+    reset: bool = True,
+) -> SeedSummary:
+    """Generate users × days of history ending on end_date (today by default)."""
+    started = clock.perf_counter()
+    first_id = 1
+    if reset:
+        await reset_schema()
+    else:
+        async with async_session() as session:
+            first_id += await session.scalar(select(func.max(User.id))) or 0
+    end_date = end_date or date.today()
+    rng = random.Random(seed)
+
+    counts = {name: 0 for name, _ in TABLES}
+    last_id = first_id + users - 1
+    # Insert users in batches so memory stays flat for large N
+    for first in range(first_id, last_id + 1, 100):
+        batch: Dict[str, List[dict]] = {name: [] for name, _ in TABLES}
+        for user_id in range(first, min(first + 100, last_id + 1)):
+            for name, rows in _user_rows(rng, user_id, days, end_date).items():
+                batch[name].extend(rows)
+
+        async with async_session() as session:
+            for name, model in TABLES:
+                rows = batch[name]
+                for start in range(0, len(rows), CHUNK_ROWS):
+                    await session.execute(insert(model), rows[start:start + CHUNK_ROWS])
+                counts[name] += len(rows)
+            await session.commit()
+
+    return SeedSummary(users=users, days=days, rows=counts, seconds=clock.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--keep", action="store_true", help="append instead of recreating tables")
+    args = parser.parse_args()
+
+    summary = asyncio.run(seed(args.users, args.days, args.seed, reset=not args.keep))
+    print(f"Seeded {summary.users} users x {summary.days} days in {summary.seconds:.1f} s")
+    for name, count in summary.rows.items():
+        print(f"  {name:<18} {count:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 import os
 from dataclasses import dataclass
-from typing import Optional
+from typing import Dict, List, Optional
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -9,6 +9,10 @@ load_dotenv()
 @dataclass
 class BotConfig:
     token: str
+    # Telegram ids allowed to use admin commands (/profile)
+    admin_ids: List[int]
+    # Bot API server, e.g. a local Bot API server or benchmarks/fake_telegram.py
+    api_url: Optional[str]
 
 
 @dataclass
@@ -20,6 +24,41 @@ class DatabaseConfig:
 class OpenAIConfig:
     api_key: Optional[str]
     model: str
+    base_url: Optional[str]
+    timeout: float
+    max_concurrency: int
+
+
+@dataclass
+class FoodDBConfig:
+    path: str
+
+
+@dataclass
+class ChartConfig:
+    # chart type -> "matplotlib" or "sparkline"
+    backends: Dict[str, str]
+    # "png" (palette-quantized), "webp" or "jpeg"
+    format: str
+    width_px: int
+    max_bytes: int
+
+
+@dataclass
+class MetricsConfig:
+    host: str
+    port: int  # 0 disables the /metrics endpoint
+
+
+@dataclass
+class ProfilingConfig:
+    # Share of handler calls and job runs to profile, 0..1 (0 = off)
+    sample_rate: float
+    output_dir: str
+    # Also record tracemalloc allocation diffs (slows the sampled call down a lot)
+    trace_memory: bool
+    # Samples faster than this are discarded instead of written
+    min_duration_ms: int
 
 
 @dataclass
@@ -27,13 +66,27 @@ class Config:
     bot: BotConfig
     db: DatabaseConfig
     openai: OpenAIConfig
+    food_db: FoodDBConfig
+    charts: ChartConfig
+    metrics: MetricsConfig
+    profiling: ProfilingConfig
     timezone: str
 
 
+def _parse_mapping(value: str) -> Dict[str, str]:
+    """Parse "key=value,key=value" into a dict."""
+    pairs = (item.split("=", 1) for item in value.split(",") if "=" in item)
+    return {key.strip(): val.strip() for key, val in pairs}
+
+
 def load_config() -> Config:
     return Config(
         bot=BotConfig(
             token=os.getenv("BOT_TOKEN", ""),
+            admin_ids=[
+                int(item) for item in os.getenv("ADMIN_IDS", "").split(",") if item.strip()
+            ],
+            api_url=os.getenv("BOT_API_URL") or None,
         ),
         db=DatabaseConfig(
             url=os.getenv("DATABASE_URL", ""),
@@ -41,6 +94,28 @@ def load_config() -> Config:
         openai=OpenAIConfig(
             api_key=os.getenv("OPENAI_API_KEY"),
             model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
+            base_url=os.getenv("OPENAI_BASE_URL") or None,
+            timeout=float(os.getenv("OPENAI_TIMEOUT", "15")),
+            max_concurrency=int(os.getenv("OPENAI_MAX_CONCURRENCY", "4")),
+        ),
+        food_db=FoodDBConfig(
+            path=os.getenv("FOOD_DB_PATH", "data/food.db"),
+        ),
+        charts=ChartConfig(
+            backends=_parse_mapping(os.getenv("CHART_BACKENDS", "")),
+            format=os.getenv("CHART_FORMAT", "png").lower(),
+            width_px=int(os.getenv("CHART_WIDTH_PX", "1000")),
+            max_bytes=int(os.getenv("CHART_MAX_BYTES", "120000")),
+        ),
+        metrics=MetricsConfig(
+            host=os.getenv("METRICS_HOST", "127.0.0.1"),
+            port=int(os.getenv("METRICS_PORT", "0")),
+        ),
+        profiling=ProfilingConfig(
+            sample_rate=float(os.getenv("PROFILE_SAMPLE_RATE", "0")),
+            output_dir=os.getenv("PROFILE_DIR", "profiles"),
+            trace_memory=os.getenv("PROFILE_TRACEMALLOC", "").lower() in ("1", "true", "yes"),
+            min_duration_ms=int(os.getenv("PROFILE_MIN_MS", "0")),
         ),
         timezone=os.getenv("TIMEZONE", "Asia/Yerevan"),
     )
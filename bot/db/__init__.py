@@ -6,8 +6,12 @@ from bot.db.models import (
     ComputedTargets,
     DailyLog,
     Workout,
+    WorkoutTrack,
     StrengthLog,
     Settings,
+    CalorieEntry,
+    CoachComment,
+    WeeklyReport,
 )
 
 __all__ = [
@@ -20,6 +24,10 @@ __all__ = [
     "ComputedTargets",
     "DailyLog",
     "Workout",
+    "WorkoutTrack",
     "StrengthLog",
     "Settings",
+    "CalorieEntry",
+    "CoachComment",
+    "WeeklyReport",
 ]
@@ -1,7 +1,9 @@
+from collections import Counter
 from datetime import date, datetime, timedelta
 from decimal import Decimal
-from typing import Optional, List, Tuple
-from sqlalchemy import select, func, and_
+from typing import Optional, List, Tuple, Dict, Any
+from sqlalchemy import select, func, and_, insert, delete, update, literal, null, union_all
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 from bot.db.models import (
     User,
@@ -9,9 +11,12 @@ from bot.db.models import (
     ComputedTargets,
     DailyLog,
     Workout,
+    WorkoutTrack,
     StrengthLog,
     Settings,
     CalorieEntry,
+    CoachComment,
+    WeeklyReport,
 )
 
 
@@ -259,6 +264,46 @@ async def get_calorie_entries_for_date(
     return list(result.scalars().all())
 
 
+async def get_calorie_entry(
+    session: AsyncSession, user_id: int, entry_id: int
+) -> Optional[CalorieEntry]:
+    """Get a user's calorie entry by id."""
+    result = await session.execute(
+        select(CalorieEntry).where(
+            and_(CalorieEntry.id == entry_id, CalorieEntry.user_id == user_id)
+        )
+    )
+    return result.scalar_one_or_none()
+
+
+async def get_meal_history(
+    session: AsyncSession, user_id: int, since: date
+) -> List[Tuple[int, str, int, date]]:
+    """
+    Get (id, description, calories, date) of described entries since a date, oldest first.
+
+    Imported rows are left out: they are often per-day or per-meal totals, not meals.
+    """
+    result = await session.execute(
+        select(
+            CalorieEntry.id,
+            CalorieEntry.description,
+            CalorieEntry.calories,
+            CalorieEntry.entry_date,
+        )
+        .where(
+            and_(
+                CalorieEntry.user_id == user_id,
+                CalorieEntry.entry_date >= since,
+                CalorieEntry.description.is_not(None),
+                CalorieEntry.source.is_(None),
+            )
+        )
+        .order_by(CalorieEntry.entry_date, CalorieEntry.id)
+    )
+    return [tuple(row) for row in result.all()]
+
+
 # ========== Workout ==========
 async def create_workout(
     session: AsyncSession,
@@ -340,6 +385,29 @@ async def get_workouts_for_date(
     return list(result.scalars().all())
 
 
+async def find_workout(
+    session: AsyncSession,
+    user_id: int,
+    workout_date: date,
+    workout_type: str,
+    duration_min: Optional[int],
+) -> Optional[Workout]:
+    """Find a stored workout by the same date/type/duration rule the bulk import dedupes on."""
+    result = await session.execute(
+        select(Workout)
+        .where(
+            and_(
+                Workout.user_id == user_id,
+                Workout.workout_date == workout_date,
+                Workout.workout_type == workout_type,
+                Workout.duration_min == duration_min,
+            )
+        )
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
 async def get_burned_calories_for_date(
     session: AsyncSession, user_id: int, workout_date: date
 ) -> int:
@@ -352,6 +420,33 @@ async def get_burned_calories_for_date(
     return result.scalar() or 0
 
 
+async def create_workout_track(
+    session: AsyncSession,
+    workout_id: int,
+    distance_m: int,
+    moving_time_sec: int,
+    points_count: int,
+    avg_pace_sec_per_km: Optional[int] = None,
+    elevation_gain_m: Optional[int] = None,
+    avg_heart_rate: Optional[int] = None,
+    polyline: Optional[str] = None,
+) -> WorkoutTrack:
+    track = WorkoutTrack(
+        workout_id=workout_id,
+        distance_m=distance_m,
+        moving_time_sec=moving_time_sec,
+        points_count=points_count,
+        avg_pace_sec_per_km=avg_pace_sec_per_km,
+        elevation_gain_m=elevation_gain_m,
+        avg_heart_rate=avg_heart_rate,
+        polyline=polyline,
+    )
+    session.add(track)
+    await session.commit()
+    await session.refresh(track)
+    return track
+
+
 # ========== Strength Log ==========
 async def create_strength_log(
     session: AsyncSession,
@@ -450,6 +545,250 @@ async def create_or_update_settings(
     return settings
 
 
+# ========== Coach comment cache ==========
+async def get_cached_coach_comment(
+    session: AsyncSession, fingerprint: str, today: date
+) -> Optional[str]:
+    """Get a cached coach comment that has not expired yet."""
+    result = await session.execute(
+        select(CoachComment.comment).where(
+            and_(CoachComment.fingerprint == fingerprint, CoachComment.expires_on >= today)
+        )
+    )
+    return result.scalar_one_or_none()
+
+
+async def save_coach_comment(
+    session: AsyncSession,
+    fingerprint: str,
+    model: str,
+    comment: str,
+    expires_on: date,
+) -> None:
+    """Cache a coach comment, replacing an expired one with the same fingerprint."""
+    await session.execute(
+        delete(CoachComment).where(CoachComment.expires_on < date.today())
+    )
+    stmt = _upsert_insert(session, CoachComment).values(
+        fingerprint=fingerprint,
+        model=model,
+        comment=comment,
+        expires_on=expires_on,
+        created_at=datetime.utcnow(),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CoachComment.fingerprint],
+        set_={"comment": stmt.excluded.comment, "expires_on": stmt.excluded.expires_on},
+    )
+    await session.execute(stmt)
+    await session.commit()
+
+
+# ========== Weekly reports ==========
+async def get_weekly_report(
+    session: AsyncSession, user_id: int, report_date: date
+) -> Optional[WeeklyReport]:
+    """Get the pre-generated weekly report for a send date."""
+    result = await session.execute(
+        select(WeeklyReport).where(
+            and_(WeeklyReport.user_id == user_id, WeeklyReport.report_date == report_date)
+        )
+    )
+    return result.scalar_one_or_none()
+
+
+async def get_weekly_report_user_ids(session: AsyncSession, report_date: date) -> List[int]:
+    """Get ids of users that already have a report for a send date."""
+    result = await session.execute(
+        select(WeeklyReport.user_id).where(WeeklyReport.report_date == report_date)
+    )
+    return list(result.scalars().all())
+
+
+async def save_weekly_report(
+    session: AsyncSession,
+    user_id: int,
+    report_date: date,
+    text: str,
+    chart_png: Optional[bytes] = None,
+) -> WeeklyReport:
+    """Store a pre-generated weekly report, replacing an unsent one for the same date."""
+    report = await get_weekly_report(session, user_id, report_date)
+    if report is None:
+        report = WeeklyReport(user_id=user_id, report_date=report_date, text=text)
+        session.add(report)
+    report.text = text
+    report.chart_png = chart_png
+    report.created_at = datetime.utcnow()
+    await session.commit()
+    await session.refresh(report)
+    return report
+
+
+async def mark_weekly_report_sent(session: AsyncSession, report_id: int) -> None:
+    await session.execute(
+        update(WeeklyReport)
+        .where(WeeklyReport.id == report_id)
+        .values(sent_at=datetime.utcnow())
+    )
+    await session.commit()
+
+
+async def delete_weekly_reports_before(session: AsyncSession, report_date: date) -> None:
+    """Drop stored reports (and their charts) older than a date."""
+    await session.execute(delete(WeeklyReport).where(WeeklyReport.report_date < report_date))
+    await session.commit()
+
+
+# ========== Bulk import ==========
+def _upsert_insert(session: AsyncSession, model):
+    """Dialect-specific INSERT that supports ON CONFLICT."""
+    if session.bind.dialect.name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+
+async def bulk_upsert_daily_logs(
+    session: AsyncSession, user_id: int, rows: List[Dict[str, Any]]
+) -> int:
+    """
+    Upsert daily logs in one executemany, filling only empty fields on existing dates.
+
+    Each row must have log_date, weight_kg, water_ml and sleep_hours keys,
+    and log_date must be unique within rows.
+    """
+    if not rows:
+        return 0
+
+    stmt = _upsert_insert(session, DailyLog)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailyLog.user_id, DailyLog.log_date],
+        set_={
+            column: func.coalesce(getattr(DailyLog, column), stmt.excluded[column])
+            for column in ("weight_kg", "water_ml", "sleep_hours")
+        },
+    )
+    await session.execute(stmt, [{**row, "user_id": user_id} for row in rows])
+    await session.commit()
+    return len(rows)
+
+
+async def bulk_insert_calorie_entries(
+    session: AsyncSession,
+    user_id: int,
+    rows: List[Dict[str, Any]],
+    match_calories: bool = True,
+    stored: Optional[Dict[date, Counter]] = None,
+) -> int:
+    """
+    Insert calorie entries skipping ones already stored. Returns inserted count.
+
+    With match_calories=False an entry is a duplicate if its date and description
+    match, which suits per-day totals from sources that may be re-exported.
+
+    Pass the same `stored` dict for every batch of one import: it keeps the rows
+    stored before the import per date, so repeats within the file (two coffees on
+    the same day) count even when they land in different batches.
+    """
+    if not rows:
+        return 0
+    if stored is None:
+        stored = {}
+
+    new_dates = {row["entry_date"] for row in rows} - stored.keys()
+    if new_dates:
+        result = await session.execute(
+            select(CalorieEntry.entry_date, CalorieEntry.calories, CalorieEntry.description)
+            .where(
+                and_(
+                    CalorieEntry.user_id == user_id,
+                    CalorieEntry.entry_date.in_(new_dates),
+                )
+            )
+        )
+        for entry_date in new_dates:
+            stored[entry_date] = Counter()
+        for entry_date, calories, description in result.all():
+            stored[entry_date][(calories if match_calories else None, description)] += 1
+
+    # Each stored row matches one incoming row
+    new_rows = []
+    for row in rows:
+        counts = stored[row["entry_date"]]
+        key = (row["calories"] if match_calories else None, row["description"])
+        if counts[key]:
+            counts[key] -= 1
+            continue
+        new_rows.append({**row, "user_id": user_id})
+
+    if new_rows:
+        await session.execute(insert(CalorieEntry.__table__), new_rows)
+        await session.commit()
+    return len(new_rows)
+
+
+async def bulk_insert_workouts(
+    session: AsyncSession,
+    user_id: int,
+    rows: List[Dict[str, Any]],
+    stored: Optional[Dict[date, Counter]] = None,
+) -> int:
+    """
+    Insert workouts skipping ones already stored. Returns inserted count.
+
+    `stored` works as in bulk_insert_calorie_entries.
+    """
+    if not rows:
+        return 0
+    if stored is None:
+        stored = {}
+
+    new_dates = {row["workout_date"] for row in rows} - stored.keys()
+    if new_dates:
+        result = await session.execute(
+            select(Workout.workout_date, Workout.workout_type, Workout.duration_min)
+            .where(
+                and_(
+                    Workout.user_id == user_id,
+                    Workout.workout_date.in_(new_dates),
+                )
+            )
+        )
+        for workout_date in new_dates:
+            stored[workout_date] = Counter()
+        for workout_date, workout_type, duration_min in result.all():
+            stored[workout_date][(workout_type, duration_min)] += 1
+
+    new_rows = []
+    for row in rows:
+        counts = stored[row["workout_date"]]
+        key = (row["workout_type"], row["duration_min"])
+        if counts[key]:
+            counts[key] -= 1
+            continue
+        new_rows.append({**row, "user_id": user_id})
+
+    if new_rows:
+        await session.execute(insert(Workout.__table__), new_rows)
+        await session.commit()
+    return len(new_rows)
+
+
+# ========== Export ==========
+async def get_user_rows_page(
+    session: AsyncSession, model, user_id: int, after_id: int, limit: int
+) -> List[Any]:
+    """Keyset page of a user's raw table rows ordered by id."""
+    table = model.__table__
+    result = await session.execute(
+        select(table)
+        .where(and_(table.c.user_id == user_id, table.c.id > after_id))
+        .order_by(table.c.id)
+        .limit(limit)
+    )
+    return list(result.all())
+
+
 # ========== Analytics helpers ==========
 async def get_workout_streak(session: AsyncSession, user_id: int) -> int:
     """Count consecutive weeks with at least one workout."""
@@ -479,6 +818,77 @@ async def get_workout_streak(session: AsyncSession, user_id: int) -> int:
     return streak
 
 
+async def get_daily_metrics(
+    session: AsyncSession, user_id: int, start_date: date, end_date: date
+) -> List[Any]:
+    """
+    Per-day weight, calories, water, sleep, workout count and burned calories.
+
+    Daily logs, per-day calorie entry sums and workouts are unioned and grouped by
+    day, so a whole dashboard comes from one statement. Only days with any data
+    are returned; calories is None on days without calorie entries.
+    """
+    logs = select(
+        DailyLog.log_date.label("day"),
+        DailyLog.weight_kg.label("weight_kg"),
+        null().label("calories"),
+        DailyLog.water_ml.label("water_ml"),
+        DailyLog.sleep_hours.label("sleep_hours"),
+        literal(0).label("workouts"),
+        literal(0).label("burned"),
+    ).where(
+        DailyLog.user_id == user_id,
+        DailyLog.log_date >= start_date,
+        DailyLog.log_date <= end_date,
+    )
+    meals = (
+        select(
+            CalorieEntry.entry_date,
+            null(),
+            func.sum(CalorieEntry.calories),
+            null(),
+            null(),
+            literal(0),
+            literal(0),
+        )
+        .where(
+            CalorieEntry.user_id == user_id,
+            CalorieEntry.entry_date >= start_date,
+            CalorieEntry.entry_date <= end_date,
+        )
+        .group_by(CalorieEntry.entry_date)
+    )
+    workouts = select(
+        Workout.workout_date,
+        null(),
+        null(),
+        null(),
+        null(),
+        literal(1),
+        func.coalesce(Workout.calories_burned, 0),
+    ).where(
+        Workout.user_id == user_id,
+        Workout.workout_date >= start_date,
+        Workout.workout_date <= end_date,
+    )
+    rows = union_all(logs, meals, workouts).subquery()
+
+    result = await session.execute(
+        select(
+            rows.c.day,
+            func.max(rows.c.weight_kg).label("weight_kg"),
+            func.max(rows.c.calories).label("calories"),
+            func.max(rows.c.water_ml).label("water_ml"),
+            func.max(rows.c.sleep_hours).label("sleep_hours"),
+            func.sum(rows.c.workouts).label("workouts"),
+            func.sum(rows.c.burned).label("burned"),
+        )
+        .group_by(rows.c.day)
+        .order_by(rows.c.day)
+    )
+    return list(result.all())
+
+
 async def get_all_users_with_settings(session: AsyncSession) -> List[Tuple[User, Settings]]:
     """Get all active users with their settings for scheduler."""
     result = await session.execute(
@@ -1,7 +1,9 @@
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from bot.config import config
+from bot.db.query_stats import install_query_hooks
 
 engine = create_async_engine(config.db.url, echo=False)
+install_query_hooks(engine)
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
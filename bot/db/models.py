@@ -9,11 +9,13 @@ from sqlalchemy import (
     ForeignKey,
     Index,
     Integer,
+    LargeBinary,
     Numeric,
     String,
     Text,
     Time,
     UniqueConstraint,
+    text,
 )
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
@@ -83,6 +85,16 @@ class DailyLog(Base):
     __table_args__ = (
         UniqueConstraint("user_id", "log_date", name="uq_daily_logs_user_date"),
         Index("idx_daily_logs_user_date", "user_id", "log_date"),
+        # Latest weigh-in lookups skip days logged without a weight
+        Index(
+            "idx_daily_logs_user_weight_date",
+            "user_id",
+            text("log_date DESC"),
+            postgresql_where=text("weight_kg IS NOT NULL"),
+            sqlite_where=text("weight_kg IS NOT NULL"),
+        ),
+        # Keyset pages of the export (WHERE user_id = ? AND id > ? ORDER BY id)
+        Index("idx_daily_logs_user_id", "user_id", "id"),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
@@ -100,7 +112,10 @@ class DailyLog(Base):
 
 class Workout(Base):
     __tablename__ = "workouts"
-    __table_args__ = (Index("idx_workouts_user_date", "user_id", "workout_date"),)
+    __table_args__ = (
+        Index("idx_workouts_user_date", "user_id", "workout_date"),
+        Index("idx_workouts_user_id", "user_id", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
@@ -112,12 +127,33 @@ class Workout(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
     user: Mapped["User"] = relationship(back_populates="workouts")
+    track: Mapped[Optional["WorkoutTrack"]] = relationship(
+        back_populates="workout", uselist=False
+    )
+
+
+class WorkoutTrack(Base):
+    __tablename__ = "workout_tracks"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    workout_id: Mapped[int] = mapped_column(ForeignKey("workouts.id"), unique=True)
+    distance_m: Mapped[int] = mapped_column(Integer, nullable=False)
+    moving_time_sec: Mapped[int] = mapped_column(Integer, nullable=False)
+    avg_pace_sec_per_km: Mapped[Optional[int]] = mapped_column(Integer)
+    elevation_gain_m: Mapped[Optional[int]] = mapped_column(Integer)
+    avg_heart_rate: Mapped[Optional[int]] = mapped_column(Integer)
+    points_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    polyline: Mapped[Optional[str]] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    workout: Mapped["Workout"] = relationship(back_populates="track")
 
 
 class StrengthLog(Base):
     __tablename__ = "strength_logs"
     __table_args__ = (
         Index("idx_strength_logs_user_exercise", "user_id", "exercise_name", "log_date"),
+        Index("idx_strength_logs_user_id", "user_id", "id"),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
@@ -136,13 +172,19 @@ class StrengthLog(Base):
 
 class CalorieEntry(Base):
     __tablename__ = "calorie_entries"
-    __table_args__ = (Index("idx_calorie_entries_user_date", "user_id", "entry_date"),)
+    __table_args__ = (
+        # calories is part of the key so daily totals are read from the index alone
+        Index("idx_calorie_entries_user_date_calories", "user_id", "entry_date", "calories"),
+        Index("idx_calorie_entries_user_id", "user_id", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
     entry_date: Mapped[date] = mapped_column(Date, nullable=False)
     calories: Mapped[int] = mapped_column(Integer, nullable=False)
     description: Mapped[Optional[str]] = mapped_column(String(255))
+    # Importer that created the row ("csv", "apple_health"); None if logged in the bot
+    source: Mapped[Optional[str]] = mapped_column(String(20))
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
     user: Mapped["User"] = relationship(back_populates="calorie_entries")
@@ -167,3 +209,28 @@ class Settings(Base):
     use_ai_coach: Mapped[bool] = mapped_column(Boolean, default=True)
 
     user: Mapped["User"] = relationship(back_populates="settings")
+
+
+class CoachComment(Base):
+    __tablename__ = "coach_comments"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    fingerprint: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+    model: Mapped[str] = mapped_column(String(100), nullable=False)
+    comment: Mapped[str] = mapped_column(Text, nullable=False)
+    expires_on: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class WeeklyReport(Base):
+    __tablename__ = "weekly_reports"
+    __table_args__ = (UniqueConstraint("user_id", "report_date", name="uq_weekly_report_user_date"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    # The pre-generation job and the cleanup look reports up by date alone
+    report_date: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+    text: Mapped[str] = mapped_column(Text, nullable=False)
+    chart_png: Mapped[Optional[bytes]] = mapped_column(LargeBinary)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    sent_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
@@ -0,0 +1,68 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+@dataclass
+class QueryStats:
+    statements: int = 0
+    db_time: float = 0.0  # seconds spent in cursor.execute
+    parent: Optional["QueryStats"] = None
+
+
+class QueryBudgetExceeded(Exception):
+    """More SQL statements were executed than a query budget allows."""
+
+
+# Stats of the update or job running in the current task; None when not tracked
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def install_query_hooks(engine: AsyncEngine) -> None:
+    """Count statements and time cursor execution for whatever is being tracked."""
+
+    # The start time lives on the statement's execution context, not the pooled
+    # connection, so a statement that raises leaves nothing behind
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _current.get() is not None:
+            context._query_started = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = _current.get()
+        started = getattr(context, "_query_started", None)
+        if stats is None or started is None:
+            return
+        elapsed = time.perf_counter() - started
+        while stats is not None:
+            stats.statements += 1
+            stats.db_time += elapsed
+            stats = stats.parent
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Collect statement count and DB time for the enclosed code (nesting is fine)."""
+    stats = QueryStats(parent=_current.get())
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def query_budget(max_statements: int) -> Iterator[QueryStats]:
+    """Like track_queries, but raise QueryBudgetExceeded if the code ran too many statements."""
+    with track_queries() as stats:
+        yield stats
+    if stats.statements > max_statements:
+        raise QueryBudgetExceeded(
+            f"{stats.statements} SQL statements, budget is {max_statements}"
+        )
@@ -8,6 +8,10 @@ from bot.handlers.workout import router as workout_router
 from bot.handlers.strength import router as strength_router
 from bot.handlers.reports import router as reports_router
 from bot.handlers.settings import router as settings_router
+from bot.handlers.data_import import router as data_import_router
+from bot.handlers.data_export import router as data_export_router
+from bot.handlers.admin import router as admin_router
+from bot.handlers.quick_entry import router as quick_entry_router
 
 
 def get_all_routers() -> List[Router]:
@@ -20,4 +24,9 @@ def get_all_routers() -> List[Router]:
         strength_router,
         reports_router,
         settings_router,
+        data_import_router,
+        data_export_router,
+        admin_router,
+        # Free-text fallback: must stay after routers with exact-text buttons
+        quick_entry_router,
     ]
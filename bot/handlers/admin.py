@@ -0,0 +1,45 @@
+from aiogram import Router, F
+from aiogram.filters import Command, CommandObject
+from aiogram.types import Message
+
+from bot.config import config
+from bot.profiling import profiler
+
+router = Router()
+router.message.filter(F.from_user.id.in_(config.bot.admin_ids))
+
+
+def _profiler_status() -> str:
+    if profiler.sample_rate <= 0:
+        return "🔬 Профилировщик выключен."
+    return (
+        f"🔬 Профилируется {profiler.sample_rate * 100:g}% обработчиков и задач.\n"
+        f"Папка: <code>{profiler.output_dir}</code>\n"
+        f"tracemalloc: {'вкл' if profiler.trace_memory else 'выкл'}, "
+        f"порог: {profiler.min_duration_ms} мс"
+    )
+
+
+@router.message(Command("profile"))
+async def toggle_profiler(message: Message, command: CommandObject):
+    """/profile [percent|off] [mem] — show or change the sampling profiler."""
+    args = (command.args or "").split()
+    if not args:
+        await message.answer(_profiler_status())
+        return
+
+    if args[0] == "off":
+        profiler.sample_rate = 0.0
+    else:
+        try:
+            percent = float(args[0].rstrip("%").replace(",", "."))
+        except ValueError:
+            await message.answer("Формат: /profile 5 [mem] или /profile off")
+            return
+        if not 0 <= percent <= 100:
+            await message.answer("Процент должен быть от 0 до 100.")
+            return
+        profiler.sample_rate = percent / 100
+        profiler.trace_memory = "mem" in args[1:]
+
+    await message.answer(_profiler_status())
@@ -0,0 +1,57 @@
+import logging
+import os
+import tempfile
+from datetime import date
+from aiogram import Router, F
+from aiogram.types import Message, FSInputFile
+from aiogram.fsm.context import FSMContext
+
+from bot.db.database import async_session
+from bot.db import crud
+from bot.services.data_export import export_user_data
+from bot.keyboards.reply import get_settings_keyboard
+
+logger = logging.getLogger(__name__)
+
+router = Router()
+
+
+@router.message(F.text == "📤 Экспорт")
+async def export_data(message: Message, state: FSMContext):
+    """Send the user's full history as a gzip JSONL file."""
+    async with async_session() as session:
+        user = await crud.get_user_by_telegram_id(session, message.from_user.id)
+        if not user:
+            await message.answer("Ошибка. Попробуй /start")
+            return
+
+    status = await message.answer("📤 Собираю твои данные…")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_name = f"fitness_export_{date.today().isoformat()}.jsonl.gz"
+        path = os.path.join(tmp_dir, file_name)
+
+        try:
+            result = await export_user_data(user.id, path)
+        except Exception as e:
+            logger.error(f"Export failed for {message.from_user.id}: {e}")
+            await status.edit_text("Не получилось собрать экспорт 😔")
+            return
+
+        if result.total == 0:
+            await status.edit_text("Пока нечего экспортировать — записей нет.")
+            return
+
+        await message.answer_document(
+            FSInputFile(path, filename=file_name),
+            caption=(
+                "📤 Вся твоя история: одна запись на строку (JSON Lines, gzip).\n"
+                f"Дней: {result.counts['daily_logs']}, "
+                f"приёмов пищи: {result.counts['calorie_entries']}, "
+                f"тренировок: {result.counts['workouts']}, "
+                f"силовых подходов: {result.counts['strength_logs']}"
+            ),
+            reply_markup=get_settings_keyboard(),
+        )
+
+    await status.delete()
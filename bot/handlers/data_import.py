@@ -0,0 +1,139 @@
+import logging
+import os
+import tempfile
+import time
+from aiogram import Bot, Router, F
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import Message
+from aiogram.fsm.context import FSMContext
+
+from bot.db.database import async_session
+from bot.db import crud
+from bot.services.data_import import ImportFormatError, ImportResult, import_csv
+from bot.services.apple_health import import_apple_health
+from bot.services.track_import import DuplicateTrackError, TrackFormatError, import_track
+from bot.services.meal_index import forget_meals
+from bot.keyboards.reply import get_settings_keyboard
+from bot.utils.formatters import (
+    format_import_progress,
+    format_import_result,
+    format_track_workout_response,
+)
+
+logger = logging.getLogger(__name__)
+
+router = Router()
+
+# Bot API refuses to serve files larger than this via getFile
+MAX_IMPORT_SIZE = 20 * 1024 * 1024
+PROGRESS_INTERVAL_SEC = 2.0
+
+IMPORTERS = {
+    ".csv": import_csv,
+    ".xml": import_apple_health,
+    ".zip": import_apple_health,
+}
+
+TRACK_EXTENSIONS = (".gpx", ".tcx")
+
+
+@router.message(F.text == "📥 Импорт данных")
+async def show_import_help(message: Message, state: FSMContext):
+    """Explain how to import history from other apps."""
+    await message.answer(
+        "📥 Импорт истории\n\n"
+        "Пришли файл документом:\n"
+        "• CSV из MyFitnessPal, FatSecret и т.п. — колонки "
+        "«Дата», «Калории», «Приём пищи», «Вес», «Вода», «Сон», «Тренировка»\n"
+        "• Apple Health: export.zip или export.xml (Здоровье → профиль → "
+        "Экспорт медданных) — вес, калории, сон и тренировки\n"
+        "• Трек тренировки: GPX или TCX (Strava, Garmin, часы) — "
+        "дистанция, время и темп\n\n"
+        "Уже записанные данные не задваиваются.",
+        reply_markup=get_settings_keyboard(),
+    )
+
+
+@router.message(F.document)
+async def process_document(message: Message, state: FSMContext, bot: Bot):
+    """Import an uploaded history file."""
+    document = message.document
+    extension = os.path.splitext((document.file_name or "").lower())[1]
+    importer = IMPORTERS.get(extension)
+
+    if importer is None and extension not in TRACK_EXTENSIONS:
+        await message.answer(
+            "Не знаю такой формат. Пришли CSV, экспорт Apple Health (zip/xml) "
+            "или трек GPX/TCX."
+        )
+        return
+
+    if document.file_size and document.file_size > MAX_IMPORT_SIZE:
+        await message.answer("Файл слишком большой (максимум 20 МБ).")
+        return
+
+    async with async_session() as session:
+        user = await crud.get_user_by_telegram_id(session, message.from_user.id)
+        if not user:
+            await message.answer("Ошибка. Попробуй /start")
+            return
+
+    if extension in TRACK_EXTENSIONS:
+        await _import_track_file(message, bot, user.id, extension)
+        return
+
+    status = await message.answer("📥 Загружаю файл…")
+    last_update = time.monotonic()
+
+    async def report_progress(result: ImportResult):
+        nonlocal last_update
+        if time.monotonic() - last_update < PROGRESS_INTERVAL_SEC:
+            return
+        last_update = time.monotonic()
+        try:
+            await status.edit_text(format_import_progress(result))
+        except TelegramBadRequest:
+            pass
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, f"import{extension}")
+        await bot.download(document, destination=path)
+        await status.edit_text("⏳ Разбираю файл…")
+
+        try:
+            result = await importer(path, user.id, progress=report_progress)
+        except ImportFormatError:
+            await status.edit_text(
+                "Не нашёл в файле колонок с датой и данными. "
+                "Нужны хотя бы «Дата» и «Калории» или «Вес»."
+            )
+            return
+        except Exception as e:
+            logger.error(f"Import of {extension} failed for {message.from_user.id}: {e}")
+            await status.edit_text("Не получилось импортировать файл 😔")
+            return
+
+    forget_meals(user.id)
+    await status.edit_text(format_import_result(result))
+
+
+async def _import_track_file(message: Message, bot: Bot, user_id: int, extension: str):
+    """Store an uploaded GPX/TCX track as a workout."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, f"track{extension}")
+        await bot.download(message.document, destination=path)
+
+        try:
+            _, metrics = await import_track(path, user_id)
+        except TrackFormatError:
+            await message.answer("В файле нет точек трека со временем 🤷")
+            return
+        except DuplicateTrackError:
+            await message.answer("Эта тренировка уже записана 👌")
+            return
+        except Exception as e:
+            logger.error(f"Track import failed for {message.from_user.id}: {e}")
+            await message.answer("Не получилось разобрать трек 😔")
+            return
+
+    await message.answer(format_track_workout_response(metrics))
@@ -1,14 +1,26 @@
+import html
 from datetime import date
 from decimal import Decimal
+from typing import Optional
 from aiogram import Router, F
-from aiogram.types import Message, CallbackQuery
+from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup
 from aiogram.fsm.context import FSMContext
 
 from bot.db.database import async_session
 from bot.db import crud
 from bot.states import LoggingStates
 from bot.keyboards.reply import get_logging_keyboard, get_main_menu_keyboard
-from bot.utils.formatters import format_calorie_entry_response
+from bot.keyboards.inline import get_recent_meals_keyboard
+from bot.services.food_db import find_food
+from bot.services.meal_index import get_meal_index, remember_meal
+from bot.services.quick_entry import parse_quick_entry
+from bot.utils.formatters import (
+    format_food_match,
+    format_calorie_entry_response,
+    format_weight_response,
+    format_water_response,
+    format_sleep_response,
+)
 
 router = Router()
 
@@ -48,43 +60,73 @@ async def process_weight(message: Message, state: FSMContext):
 
         week_ago_log = await crud.get_weight_week_ago(session, user.id, today)
 
-    response = f"Записал! {weight:.1f} кг"
-
-    if week_ago_log and week_ago_log.weight_kg:
-        diff = weight_decimal - week_ago_log.weight_kg
-        response += f" ({diff:+.1f} кг за неделю)."
-
-        if Decimal("-1") <= diff <= Decimal("-0.3"):
-            response += "\nХороший темп, не торопись — мышцы скажут спасибо 💪"
-        elif diff < Decimal("-1"):
-            response += "\n⚠️ Быстро уходит. Не переусердствуй с дефицитом."
-        elif diff > Decimal("0"):
-            response += "\nНе страшно, это может быть вода. Смотрим тренд."
-    else:
-        response += "."
+    response = format_weight_response(
+        weight_decimal, week_ago_log.weight_kg if week_ago_log else None
+    )
 
     await message.answer(response, reply_markup=get_logging_keyboard())
     await state.clear()
 
 
+CALORIES_PROMPT = (
+    "Сколько калорий съел сегодня?\n"
+    "Можно числом или продуктом с весом: «гречка 200г»"
+)
+
+
+async def _recent_meals_keyboard(
+    telegram_id: int, query: Optional[str] = None
+) -> Optional[InlineKeyboardMarkup]:
+    """Keyboard with the user's usual meals, optionally filtered by a prefix."""
+    async with async_session() as session:
+        user = await crud.get_user_by_telegram_id(session, telegram_id)
+    if not user:
+        return None
+
+    index = await get_meal_index(user.id)
+    meals = index.search(query) if query else index.top()
+    return get_recent_meals_keyboard(meals) if meals else None
+
+
 @router.message(F.text == "🍽 Калории")
 async def start_calories_logging(message: Message, state: FSMContext):
     """Start calories logging."""
-    await message.answer("Сколько калорий съел сегодня?")
+    keyboard = await _recent_meals_keyboard(message.from_user.id)
+    await message.answer(CALORIES_PROMPT, reply_markup=keyboard)
     await state.set_state(LoggingStates.waiting_for_calories)
 
 
 @router.message(LoggingStates.waiting_for_calories)
 async def process_calories(message: Message, state: FSMContext):
     """Process calories input. Accumulates instead of overwriting."""
+    description = None
+    food_line = None
+
     try:
         calories = int(message.text.strip())
         if not 0 <= calories <= 10000:
             await message.answer("Введи калории от 0 до 10000:")
             return
     except ValueError:
-        await message.answer("Введи число:")
-        return
+        entry = parse_quick_entry(message.text)
+        if entry is None or entry.kind != "food":
+            keyboard = await _recent_meals_keyboard(message.from_user.id, message.text)
+            if keyboard:
+                await message.answer("Из прошлых записей:", reply_markup=keyboard)
+            else:
+                await message.answer("Введи число или продукт с весом (гречка 200г):")
+            return
+
+        food = await find_food(entry.description)
+        if food is None:
+            await message.answer(
+                f"Не нашёл «{html.escape(entry.description)}» в базе продуктов. Введи калории числом:"
+            )
+            return
+
+        calories = food.calories_for(float(entry.value))
+        description = f"{food.name}, {entry.value:g} г"[:255]
+        food_line = format_food_match(food, entry.value, calories)
 
     today = date.today()
 
@@ -95,18 +137,59 @@ async def process_calories(message: Message, state: FSMContext):
             await state.clear()
             return
 
-        await crud.create_calorie_entry(session, user.id, today, calories)
+        calorie_entry = await crud.create_calorie_entry(
+            session, user.id, today, calories, description=description
+        )
         total_today = await crud.get_total_calories_for_date(session, user.id, today)
         burned_today = await crud.get_burned_calories_for_date(session, user.id, today)
         targets = await crud.get_computed_targets(session, user.id)
 
+    remember_meal(calorie_entry)
+
     target = targets.target_calories if targets else None
     response = format_calorie_entry_response(calories, total_today, target, burned_today)
+    if food_line:
+        response = f"{food_line}\n\n{response}"
 
     await message.answer(response, reply_markup=get_logging_keyboard())
     await state.clear()
 
 
+@router.callback_query(F.data.startswith("meal_"))
+async def relog_meal(callback: CallbackQuery, state: FSMContext):
+    """Log a past meal again with the same calories."""
+    entry_id = int(callback.data.replace("meal_", ""))
+    today = date.today()
+
+    async with async_session() as session:
+        user = await crud.get_user_by_telegram_id(session, callback.from_user.id)
+        past = await crud.get_calorie_entry(session, user.id, entry_id) if user else None
+        # Only described meals logged in the bot are offered; anything else is a stale button
+        if not past or not past.description or past.source:
+            await callback.answer("Запись не найдена")
+            return
+
+        entry = await crud.create_calorie_entry(
+            session, user.id, today, past.calories, description=past.description
+        )
+        total_today = await crud.get_total_calories_for_date(session, user.id, today)
+        burned_today = await crud.get_burned_calories_for_date(session, user.id, today)
+        targets = await crud.get_computed_targets(session, user.id)
+
+    remember_meal(entry)
+
+    target = targets.target_calories if targets else None
+    response = format_calorie_entry_response(
+        entry.calories, total_today, target, burned_today
+    )
+
+    await callback.message.answer(
+        f"🍽 {html.escape(entry.description)}\n\n{response}", reply_markup=get_logging_keyboard()
+    )
+    await state.clear()
+    await callback.answer()
+
+
 @router.message(F.text == "💧 Вода")
 async def start_water_logging(message: Message, state: FSMContext):
     """Start water logging."""
@@ -146,15 +229,7 @@ async def process_water(message: Message, state: FSMContext):
             session, user.id, today, water_ml=water_ml
         )
 
-    liters_display = water_ml / 1000
-    response = f"Записал! {liters_display:.1f}л воды"
-
-    if water_ml >= 2000:
-        response += " — отлично! 💧"
-    elif water_ml >= 1500:
-        response += " — неплохо, но можно больше."
-    else:
-        response += " — маловато, старайся пить больше."
+    response = format_water_response(water_ml)
 
     await message.answer(response, reply_markup=get_logging_keyboard())
     await state.clear()
@@ -193,14 +268,7 @@ async def process_sleep(message: Message, state: FSMContext):
             session, user.id, today, sleep_hours=sleep_decimal
         )
 
-    response = f"Записал! {hours:.1f}ч сна"
-
-    if hours >= 7:
-        response += " — хорошо! 😴"
-    elif hours >= 6:
-        response += " — сойдёт, но лучше 7-8 часов."
-    else:
-        response += " — маловато. Сон важен для восстановления!"
+    response = format_sleep_response(hours)
 
     await message.answer(response, reply_markup=get_logging_keyboard())
     await state.clear()
@@ -217,7 +285,8 @@ async def callback_log_weight(callback: CallbackQuery, state: FSMContext):
 @router.callback_query(F.data == "log_calories")
 async def callback_log_calories(callback: CallbackQuery, state: FSMContext):
     """Handle calories logging callback from reminder."""
-    await callback.message.answer("Сколько калорий съел сегодня?")
+    keyboard = await _recent_meals_keyboard(callback.from_user.id)
+    await callback.message.answer(CALORIES_PROMPT, reply_markup=keyboard)
     await state.set_state(LoggingStates.waiting_for_calories)
     await callback.answer()
 
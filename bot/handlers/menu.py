@@ -44,7 +44,9 @@ async def open_logging_menu(message: Message, state: FSMContext):
     """Open logging submenu."""
     await state.clear()
     await message.answer(
-        "Что записываем?",
+        "Что записываем?\n\n"
+        "💡 Можно одной строкой: «вес 81.4», «2000 ккал обед», "
+        "«вода 2л», «сон 7.5», «жим 100x5x3», «гречка 200г»",
         reply_markup=get_logging_keyboard(),
     )
 
@@ -0,0 +1,113 @@
+import html
+from datetime import date
+from aiogram import Router, F
+from aiogram.filters import StateFilter
+from aiogram.types import Message
+
+from bot.db.database import async_session
+from bot.db import crud
+from bot.services.calculator import calculate_e1rm
+from bot.services.food_db import find_food
+from bot.services.meal_index import remember_meal
+from bot.services.quick_entry import QuickEntry, parse_quick_entry
+from bot.utils.formatters import (
+    format_food_match,
+    format_calorie_entry_response,
+    format_weight_response,
+    format_water_response,
+    format_sleep_response,
+    format_strength_response,
+)
+
+router = Router()
+
+
+@router.message(StateFilter(None), F.text.func(parse_quick_entry).as_("entry"))
+async def process_quick_entry(message: Message, entry: QuickEntry):
+    """Log a single-message entry like "вес 81.4" without going through FSM."""
+    today = date.today()
+
+    food = None
+    if entry.kind == "food":
+        food = await find_food(entry.description)
+        if food is None:
+            await message.answer(
+                f"Не нашёл «{html.escape(entry.description)}» в базе продуктов 🤷\n"
+                "Запиши калории сам: «350 ккал гречка»"
+            )
+            return
+
+    async with async_session() as session:
+        user = await crud.get_user_by_telegram_id(session, message.from_user.id)
+        if not user:
+            await message.answer("Ошибка. Попробуй /start")
+            return
+
+        if entry.kind == "weight":
+            await crud.create_or_update_daily_log(
+                session, user.id, today, weight_kg=entry.value
+            )
+            week_ago_log = await crud.get_weight_week_ago(session, user.id, today)
+            response = format_weight_response(
+                entry.value, week_ago_log.weight_kg if week_ago_log else None
+            )
+
+        elif entry.kind in ("calories", "food"):
+            if food:
+                calories = food.calories_for(float(entry.value))
+                description = f"{food.name}, {entry.value:g} г"[:255]
+            else:
+                calories = int(entry.value)
+                description = entry.description
+            calorie_entry = await crud.create_calorie_entry(
+                session, user.id, today, calories, description=description
+            )
+            remember_meal(calorie_entry)
+            total_today = await crud.get_total_calories_for_date(session, user.id, today)
+            burned_today = await crud.get_burned_calories_for_date(session, user.id, today)
+            targets = await crud.get_computed_targets(session, user.id)
+            target = targets.target_calories if targets else None
+            response = format_calorie_entry_response(
+                calories, total_today, target, burned_today
+            )
+            if food:
+                response = f"{format_food_match(food, entry.value, calories)}\n\n{response}"
+
+        elif entry.kind == "water":
+            water_ml = int(entry.value)
+            await crud.create_or_update_daily_log(
+                session, user.id, today, water_ml=water_ml
+            )
+            response = format_water_response(water_ml)
+
+        elif entry.kind == "sleep":
+            await crud.create_or_update_daily_log(
+                session, user.id, today, sleep_hours=entry.value
+            )
+            response = format_sleep_response(float(entry.value))
+
+        else:
+            e1rm = calculate_e1rm(entry.value, entry.reps)
+            last_log = await crud.get_last_strength_log_for_exercise(
+                session, user.id, entry.description
+            )
+            await crud.create_strength_log(
+                session,
+                user.id,
+                today,
+                exercise_name=entry.description,
+                weight_kg=entry.value,
+                reps=entry.reps,
+                sets=entry.sets,
+                e1rm=e1rm,
+            )
+            response = format_strength_response(
+                html.escape(entry.description),
+                entry.value,
+                entry.reps,
+                entry.sets,
+                e1rm,
+                last_log.e1rm if last_log else None,
+            )
+
+    await message.answer(response)
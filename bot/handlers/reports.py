@@ -1,4 +1,7 @@
+import asyncio
+import logging
 from aiogram import Router, F
+from aiogram.exceptions import TelegramBadRequest
 from aiogram.types import Message, BufferedInputFile
 from aiogram.fsm.context import FSMContext
 
@@ -6,15 +9,33 @@ from datetime import date
 
 from bot.db.database import async_session
 from bot.db import crud
-from bot.services.analytics import get_weekly_stats, get_monthly_stats, get_weight_trend
+from bot.services.analytics import (
+    get_activity_heatmap,
+    get_dashboard_data,
+    get_weekly_stats,
+    get_monthly_stats,
+    get_weight_trend,
+)
 from bot.services.daily_summary import get_daily_summary
 from bot.services.coach import get_coach_comment
-from bot.utils.plotting import create_weight_chart
-from bot.utils.formatters import format_weekly_report, format_monthly_report, format_daily_summary
+from bot.utils.image_output import chart_filename
+from bot.utils.plotting import create_activity_heatmap, create_dashboard_chart, create_weight_chart
+from bot.utils.formatters import (
+    format_activity_heatmap,
+    format_weekly_report,
+    format_monthly_report,
+    format_daily_summary,
+)
+from bot.utils.messages import send_report
 from bot.keyboards.reply import get_reports_keyboard, get_main_menu_keyboard
 
+logger = logging.getLogger(__name__)
+
 router = Router()
 
+# The report is already on screen; a later comment is skipped rather than awaited
+COACH_COMMENT_DEADLINE_SEC = 10.0
+
 
 @router.message(F.text == "📊 Итоги сегодня")
 async def show_today_summary(message: Message, state: FSMContext):
@@ -49,8 +70,8 @@ async def show_weight_chart(message: Message, state: FSMContext):
         )
         return
 
-    chart = create_weight_chart(trend)
-    photo = BufferedInputFile(chart, filename="weight_chart.png")
+    chart = await asyncio.to_thread(create_weight_chart, trend)
+    photo = BufferedInputFile(chart, filename=chart_filename("weight_chart"))
 
     await message.answer_photo(
         photo,
@@ -72,19 +93,35 @@ async def show_weekly_report(message: Message, state: FSMContext):
             return
 
         stats = await get_weekly_stats(session, user.id)
+        dashboard = await get_dashboard_data(session, user.id, days=7)
         settings = await crud.get_settings(session, user.id)
-        trend = await get_weight_trend(session, user.id, days=14)
 
     use_ai = settings.use_ai_coach if settings else True
-    coach_comment = await get_coach_comment(stats, use_ai=use_ai)
+    comment_task = asyncio.create_task(get_coach_comment(stats, use_ai=use_ai))
+
+    # Stats go out right away as text; without a reply keyboard the message can be
+    # edited once the coach comment arrives. The dashboard follows as a reply when
+    # its render is done, while the comment is still being generated.
+    report_message = await message.answer(format_weekly_report(stats))
+
+    if dashboard.has_data:
+        chart = await asyncio.to_thread(create_dashboard_chart, dashboard)
+        await message.answer_photo(
+            BufferedInputFile(chart, filename=chart_filename("weekly_dashboard")),
+            reply_to_message_id=report_message.message_id,
+        )
 
-    if len(trend.dates) >= 2:
-        chart = create_weight_chart(trend)
-        photo = BufferedInputFile(chart, filename="weekly_weight.png")
-        await message.answer_photo(photo)
+    try:
+        coach_comment = await asyncio.wait_for(comment_task, timeout=COACH_COMMENT_DEADLINE_SEC)
+    except asyncio.TimeoutError:
+        logger.info(f"Coach comment for {message.from_user.id} missed the deadline")
+        return
 
-    report = format_weekly_report(stats, coach_comment)
-    await message.answer(report, reply_markup=get_reports_keyboard())
+    if coach_comment:
+        try:
+            await report_message.edit_text(format_weekly_report(stats, coach_comment))
+        except TelegramBadRequest:
+            pass
 
 
 @router.message(F.text == "📅 Месячная сводка")
@@ -97,15 +134,19 @@ async def show_monthly_report(message: Message, state: FSMContext):
             return
 
         stats = await get_monthly_stats(session, user.id)
-        trend = await get_weight_trend(session, user.id, days=30)
-
-    if len(trend.dates) >= 2:
-        chart = create_weight_chart(trend)
-        photo = BufferedInputFile(chart, filename="monthly_weight.png")
-        await message.answer_photo(photo)
-
-    report = format_monthly_report(stats)
-    await message.answer(report, reply_markup=get_reports_keyboard())
+        dashboard = await get_dashboard_data(session, user.id, days=30)
+
+    chart = None
+    if dashboard.has_data:
+        chart = await asyncio.to_thread(create_dashboard_chart, dashboard)
+    await send_report(
+        message.bot,
+        message.chat.id,
+        format_monthly_report(stats),
+        chart,
+        chart_filename("monthly_dashboard"),
+        reply_markup=get_reports_keyboard(),
+    )
 
 
 @router.message(F.text == "🔥 Streak")
@@ -134,3 +175,33 @@ async def show_streak(message: Message, state: FSMContext):
             response += "Хороший старт! Держи темп."
 
     await message.answer(response, reply_markup=get_reports_keyboard())
+
+
+@router.message(F.text == "🗓 Активность за год")
+async def show_activity_heatmap(message: Message, state: FSMContext):
+    """Show the yearly logging heatmap."""
+    async with async_session() as session:
+        user = await crud.get_user_by_telegram_id(session, message.from_user.id)
+        if not user:
+            await message.answer("Ошибка. Попробуй /start")
+            return
+
+        heatmap = await get_activity_heatmap(session, user.id)
+
+    if heatmap.days_logged == 0:
+        await message.answer(
+            "Пока нет записей за год. Записывай калории, тренировки и вес — "
+            "здесь появится календарь активности.",
+            reply_markup=get_reports_keyboard(),
+        )
+        return
+
+    chart = await asyncio.to_thread(create_activity_heatmap, heatmap)
+    await send_report(
+        message.bot,
+        message.chat.id,
+        format_activity_heatmap(heatmap),
+        chart,
+        chart_filename("activity_year"),
+        reply_markup=get_reports_keyboard(),
+    )
@@ -53,7 +53,9 @@ HOWTO_TEXT = (
     "*2. Записывай данные*\n"
     "• 🍽 Калории — можно несколько раз в день\n"
     "• ⚖️ Вес — лучше раз в неделю утром\n"
-    "• 💧 Вода и 😴 сон — по желанию\n\n"
+    "• 💧 Вода и 😴 сон — по желанию\n"
+    "• Или одной строкой: «вес 81.4», «2000 ккал обед», «сон 7.5»\n"
+    "• Продукт с весом — «гречка 200г» — бот сам найдёт калорийность\n\n"
     "*3. Отмечай тренировки*\n"
     "Тип, длительность, сожжённые калории.\n\n"
     "*4. Смотри итоги*\n"
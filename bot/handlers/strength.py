@@ -1,3 +1,4 @@
+import asyncio
 from datetime import date
 from decimal import Decimal
 from aiogram import Router, F
@@ -9,7 +10,9 @@ from bot.db import crud
 from bot.states import StrengthStates
 from bot.services.calculator import calculate_e1rm
 from bot.services.analytics import get_exercise_progress
+from bot.utils.image_output import chart_filename
 from bot.utils.plotting import create_exercise_progress_chart
+from bot.utils.formatters import format_strength_response
 from bot.keyboards.reply import get_strength_keyboard, get_main_menu_keyboard
 from bot.keyboards.inline import get_exercises_keyboard
 
@@ -141,18 +144,15 @@ async def process_sets(message: Message, state: FSMContext):
             e1rm=e1rm,
         )
 
-    response = (
-        f"Записал! {data['exercise_name']}: {weight_kg}кг × {reps} × {sets}\n"
-        f"e1RM: ~{e1rm:.0f} кг"
+    response = format_strength_response(
+        data["exercise_name"],
+        weight_kg,
+        reps,
+        sets,
+        e1rm,
+        last_log.e1rm if last_log else None,
     )
 
-    if last_log and last_log.e1rm:
-        diff = e1rm - last_log.e1rm
-        if diff > 0:
-            response += f" (+{diff:.0f} кг к прошлому разу) 📈"
-        elif diff < 0:
-            response += f" ({diff:.0f} кг)"
-
     await message.answer(response, reply_markup=get_strength_keyboard())
     await state.clear()
 
@@ -214,8 +214,8 @@ async def show_exercise_progress(callback: CallbackQuery, state: FSMContext):
         await callback.answer()
         return
 
-    chart = create_exercise_progress_chart(progress)
-    photo = BufferedInputFile(chart, filename="progress.png")
+    chart = await asyncio.to_thread(create_exercise_progress_chart, progress)
+    photo = BufferedInputFile(chart, filename=chart_filename("progress"))
 
     await callback.message.answer_photo(photo)
 
@@ -1,6 +1,8 @@
 from typing import List
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
+from bot.services.meal_index import MealSuggestion
+
 
 def get_start_keyboard() -> InlineKeyboardMarkup:
     """Start onboarding keyboard with info buttons."""
@@ -127,6 +129,22 @@ def get_exercises_keyboard(exercises: List[str]) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
 
+def get_recent_meals_keyboard(meals: List[MealSuggestion]) -> InlineKeyboardMarkup:
+    """One-tap re-logging of the user's usual meals."""
+    buttons = []
+    for meal in meals:
+        name = meal.description if len(meal.description) <= 30 else meal.description[:29] + "…"
+        buttons.append(
+            [
+                InlineKeyboardButton(
+                    text=f"{name} · {meal.calories} ккал",
+                    callback_data=f"meal_{meal.entry_id}",
+                )
+            ]
+        )
+    return InlineKeyboardMarkup(inline_keyboard=buttons)
+
+
 def get_alert_keyboard(alert_type: str) -> InlineKeyboardMarkup:
     """Alert response keyboard."""
     if alert_type == "rapid_weight_loss":
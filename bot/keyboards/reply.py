@@ -96,6 +96,7 @@ def get_reports_keyboard() -> ReplyKeyboardMarkup:
                 KeyboardButton(text="🔥 Streak"),
             ],
             [
+                KeyboardButton(text="🗓 Активность за год"),
                 KeyboardButton(text="◀️ Назад"),
             ],
         ],
@@ -116,6 +117,10 @@ def get_settings_keyboard() -> ReplyKeyboardMarkup:
             [
                 KeyboardButton(text="🤖 AI-коуч: вкл/выкл"),
             ],
+            [
+                KeyboardButton(text="📥 Импорт данных"),
+                KeyboardButton(text="📤 Экспорт"),
+            ],
             [
                 KeyboardButton(text="◀️ Назад"),
             ],
@@ -4,11 +4,16 @@ import logging
 from aiogram import Bot, Dispatcher
 from aiogram.fsm.storage.memory import MemoryStorage
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
 from aiogram.enums import ParseMode
 
 from bot.config import config
 from bot.handlers import get_all_routers
+from bot.metrics import start_metrics_server
+from bot.middlewares import setup_middlewares
 from bot.scheduler import setup_scheduler
+from bot.services.coach import close_coach_client
 
 
 logging.basicConfig(
@@ -28,8 +33,13 @@ async def main():
         logger.error("DATABASE_URL is not set!")
         return
 
+    session = None
+    if config.bot.api_url:
+        session = AiohttpSession(api=TelegramAPIServer.from_base(config.bot.api_url))
+
     bot = Bot(
         token=config.bot.token,
+        session=session,
         default=DefaultBotProperties(parse_mode=ParseMode.HTML),
     )
 
@@ -38,14 +48,22 @@ async def main():
 
     for router in get_all_routers():
         dp.include_router(router)
+    setup_middlewares(dp)
 
     setup_scheduler(bot)
 
+    metrics_runner = None
+    if config.metrics.port:
+        metrics_runner = await start_metrics_server(config.metrics.host, config.metrics.port)
+
     logger.info("Starting bot...")
 
     try:
         await dp.start_polling(bot, allowed_updates=dp.resolve_used_update_types())
     finally:
+        if metrics_runner is not None:
+            await metrics_runner.cleanup()
+        await close_coach_client()
         await bot.session.close()
 
 
@@ -0,0 +1,278 @@
+import functools
+import logging
+import math
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+from bot.db.query_stats import QueryStats
+from bot.profiling import profiler
+
+logger = logging.getLogger(__name__)
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class Histogram:
+    """
+    HDR-style latency histogram: log-linear buckets with a fixed relative error.
+
+    Every power of two above `lowest` is split into SUB_BUCKETS equal buckets, so a
+    recorded value is known within ~1/SUB_BUCKETS of itself whatever its magnitude,
+    and memory grows with the range of values seen, not with the number of samples.
+    """
+
+    SUB_BUCKETS = 32
+
+    def __init__(self, lowest: float = 1e-5):
+        self.lowest = lowest
+        self.counts: Dict[int, int] = defaultdict(int)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th value (0 when empty)."""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self._upper_bound(index), self.max)
+        return self.max
+
+    def _index(self, value: float) -> int:
+        if value <= self.lowest:
+            return 0
+        mantissa, exponent = math.frexp(value / self.lowest)  # mantissa in [0.5, 1)
+        return exponent * self.SUB_BUCKETS + int((mantissa - 0.5) * 2 * self.SUB_BUCKETS)
+
+    def _upper_bound(self, index: int) -> float:
+        if index == 0:
+            return self.lowest
+        exponent, sub = divmod(index, self.SUB_BUCKETS)
+        return self.lowest * math.ldexp(0.5 + (sub + 1) / (2 * self.SUB_BUCKETS), exponent)
+
+
+@dataclass
+class HandlerQueryStats:
+    calls: int = 0
+    statements: int = 0
+    max_statements: int = 0
+    db_time: float = 0.0  # seconds
+    over_budget: int = 0
+
+    @property
+    def avg_statements(self) -> float:
+        return self.statements / self.calls if self.calls else 0.0
+
+
+@dataclass
+class JobUsers:
+    scanned: int = 0
+    processed: int = 0  # messages sent or reports built
+
+
+_handler_queries: Dict[str, HandlerQueryStats] = {}
+_handler_latency: Dict[Tuple[str, str], Histogram] = {}
+_handler_errors: Dict[Tuple[str, str, str], int] = defaultdict(int)
+_fsm_transitions: Dict[Tuple[str, str], int] = defaultdict(int)
+_job_duration: Dict[str, Histogram] = {}
+_job_errors: Dict[str, int] = defaultdict(int)
+_job_users: Dict[str, JobUsers] = {}
+_in_flight = 0
+
+
+def _split_handler(handler: str) -> Tuple[str, str]:
+    """"reports.show_weekly_report" -> ("reports", "show_weekly_report")."""
+    router, _, name = handler.rpartition(".")
+    return router, name
+
+
+# ========== Recording ==========
+
+def record_handler_queries(handler: str, stats: QueryStats, over_budget: bool) -> None:
+    """Add one handler call's SQL statement count and DB time."""
+    totals = _handler_queries.setdefault(handler, HandlerQueryStats())
+    totals.calls += 1
+    totals.statements += stats.statements
+    totals.max_statements = max(totals.max_statements, stats.statements)
+    totals.db_time += stats.db_time
+    totals.over_budget += over_budget
+
+
+def record_handler_call(handler: str, seconds: float, error: Optional[BaseException] = None) -> None:
+    key = _split_handler(handler)
+    _handler_latency.setdefault(key, Histogram()).record(seconds)
+    if error is not None:
+        _handler_errors[key + (type(error).__name__,)] += 1
+
+
+def record_fsm_transition(from_state: Optional[str], to_state: Optional[str]) -> None:
+    _fsm_transitions[(from_state or "none", to_state or "none")] += 1
+
+
+def update_started() -> None:
+    global _in_flight
+    _in_flight += 1
+
+
+def update_finished() -> None:
+    global _in_flight
+    _in_flight -= 1
+
+
+def record_job_run(job: str, seconds: float, failed: bool) -> None:
+    _job_duration.setdefault(job, Histogram()).record(seconds)
+    if failed:
+        _job_errors[job] += 1
+
+
+def record_job_users(job: str, scanned: int, processed: int) -> None:
+    """Users a job run looked at and how many it sent to (or built reports for)."""
+    users = _job_users.setdefault(job, JobUsers())
+    users.scanned += scanned
+    users.processed += processed
+
+
+def timed_job(job: str):
+    """Decorator recording duration and failures of a scheduler job; sampled runs are profiled."""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            failed = False
+            try:
+                if profiler.should_sample():
+                    async with profiler.profile(f"job.{job}"):
+                        return await func(*args, **kwargs)
+                return await func(*args, **kwargs)
+            except Exception:
+                failed = True
+                raise
+            finally:
+                record_job_run(job, time.perf_counter() - started, failed)
+        return wrapper
+    return decorator
+
+
+def get_handler_query_stats() -> Dict[str, HandlerQueryStats]:
+    return dict(_handler_queries)
+
+
+def get_handler_latency() -> Dict[Tuple[str, str], Histogram]:
+    return dict(_handler_latency)
+
+
+def reset_metrics() -> None:
+    global _in_flight
+    for registry in (
+        _handler_queries, _handler_latency, _handler_errors, _fsm_transitions,
+        _job_duration, _job_errors, _job_users,
+    ):
+        registry.clear()
+    _in_flight = 0
+
+
+# ========== Prometheus exposition ==========
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+def _summary(
+    lines: List[str],
+    name: str,
+    help_text: str,
+    series: List[Tuple[Dict[str, str], Histogram]],
+) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} summary")
+    for labels, histogram in series:
+        for q in QUANTILES:
+            lines.append(f"{name}{_labels(**labels, quantile=str(q))} {histogram.quantile(q):.6f}")
+        lines.append(f"{name}_sum{_labels(**labels)} {histogram.sum:.6f}")
+        lines.append(f"{name}_count{_labels(**labels)} {histogram.count}")
+
+
+def _counter(lines: List[str], name: str, help_text: str, series, kind: str = "counter") -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+    for labels, value in series:
+        lines.append(f"{name}{_labels(**labels)} {value}")
+
+
+def render_prometheus() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    lines: List[str] = []
+    _summary(
+        lines, "bot_handler_latency_seconds", "Handler latency.",
+        [({"router": r, "handler": h}, hist) for (r, h), hist in sorted(_handler_latency.items())],
+    )
+    _counter(
+        lines, "bot_handler_errors_total", "Handler calls that raised.",
+        [({"router": r, "handler": h, "error": e}, n) for (r, h, e), n in sorted(_handler_errors.items())],
+    )
+    _counter(lines, "bot_updates_in_flight", "Updates being handled.", [({}, _in_flight)], kind="gauge")
+    _counter(
+        lines, "bot_fsm_transitions_total", "FSM state changes made by handlers.",
+        [({"from_state": f, "to_state": t}, n) for (f, t), n in sorted(_fsm_transitions.items())],
+    )
+    queries = sorted(_handler_queries.items())
+    _counter(
+        lines, "bot_handler_sql_statements_total", "SQL statements run by handlers.",
+        [(dict(zip(("router", "handler"), _split_handler(h))), s.statements) for h, s in queries],
+    )
+    _counter(
+        lines, "bot_handler_db_seconds_total", "Time handlers spent in the database.",
+        [(dict(zip(("router", "handler"), _split_handler(h))), f"{s.db_time:.6f}") for h, s in queries],
+    )
+    _summary(
+        lines, "bot_job_duration_seconds", "Scheduler job run duration.",
+        [({"job": job}, hist) for job, hist in sorted(_job_duration.items())],
+    )
+    _counter(
+        lines, "bot_job_errors_total", "Scheduler job runs that raised.",
+        [({"job": job}, n) for job, n in sorted(_job_errors.items())],
+    )
+    _counter(
+        lines, "bot_job_users_scanned_total", "Users scheduler jobs looked at.",
+        [({"job": job}, users.scanned) for job, users in sorted(_job_users.items())],
+    )
+    _counter(
+        lines, "bot_job_users_processed_total", "Users scheduler jobs sent to or built reports for.",
+        [({"job": job}, users.processed) for job, users in sorted(_job_users.items())],
+    )
+    return "\n".join(lines) + "\n"
+
+
+async def _handle_metrics(request: web.Request) -> web.Response:
+    return web.Response(text=render_prometheus(), content_type="text/plain", charset="utf-8")
+
+
+async def start_metrics_server(host: str, port: int) -> web.AppRunner:
+    """Serve /metrics on host:port; call .cleanup() on the result to stop."""
+    app = web.Application()
+    app.router.add_get("/metrics", _handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info(f"Metrics endpoint on http://{host}:{port}/metrics")
+    return runner
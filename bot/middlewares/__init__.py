@@ -0,0 +1,27 @@
+from aiogram import Dispatcher
+
+from bot.middlewares.metrics import HandlerMetricsMiddleware, InFlightMiddleware
+from bot.middlewares.profiling import ProfilingMiddleware
+from bot.middlewares.query_stats import QueryStatsMiddleware
+
+
+def setup_middlewares(dp: Dispatcher) -> None:
+    """Register instrumentation middlewares for every update type the bot handles."""
+    dp.update.outer_middleware(InFlightMiddleware())
+
+    handler_metrics = HandlerMetricsMiddleware()
+    query_stats = QueryStatsMiddleware()
+    profiling = ProfilingMiddleware()
+    for observer in (dp.message, dp.callback_query):
+        observer.middleware(handler_metrics)
+        observer.middleware(query_stats)
+        observer.middleware(profiling)
+
+
+__all__ = [
+    "HandlerMetricsMiddleware",
+    "InFlightMiddleware",
+    "ProfilingMiddleware",
+    "QueryStatsMiddleware",
+    "setup_middlewares",
+]
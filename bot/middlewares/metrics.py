@@ -0,0 +1,52 @@
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from bot.metrics import record_fsm_transition, record_handler_call, update_finished, update_started
+from bot.middlewares.query_stats import handler_name
+
+
+class InFlightMiddleware(BaseMiddleware):
+    """Outer update middleware keeping the in-flight updates gauge."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        update_started()
+        try:
+            return await handler(event, data)
+        finally:
+            update_finished()
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """Record latency, errors and FSM state changes of every handler call."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        handler_object = data.get("handler")
+        name = handler_name(handler_object) if handler_object else "unknown"
+
+        started = time.perf_counter()
+        error = None
+        try:
+            return await handler(event, data)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            record_handler_call(name, time.perf_counter() - started, error)
+            state = data.get("state")
+            if state is not None:
+                new_state = await state.get_state()
+                if new_state != data.get("raw_state"):
+                    record_fsm_transition(data.get("raw_state"), new_state)
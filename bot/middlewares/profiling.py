@@ -0,0 +1,25 @@
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from bot.middlewares.query_stats import handler_name
+from bot.profiling import profiler
+
+
+class ProfilingMiddleware(BaseMiddleware):
+    """Profile a sampled share of handler calls (see bot.profiling)."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        if not profiler.should_sample():
+            return await handler(event, data)
+
+        handler_object = data.get("handler")
+        name = handler_name(handler_object) if handler_object else "unknown"
+        async with profiler.profile(name):
+            return await handler(event, data)
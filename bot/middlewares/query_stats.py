@@ -0,0 +1,55 @@
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.types import TelegramObject
+
+from bot.db.query_stats import track_queries
+from bot.metrics import record_handler_queries
+
+logger = logging.getLogger(__name__)
+
+# SQL statements one handler call may run before it is logged as over budget
+DEFAULT_QUERY_BUDGET = 10
+QUERY_BUDGETS: Dict[str, int] = {
+    # Creates the user, profile, settings and computed targets in one go
+    "start.process_speed": 12,
+}
+
+
+def handler_name(handler: HandlerObject) -> str:
+    """Short "module.function" name of a handler, e.g. "reports.show_weekly_report"."""
+    callback = handler.callback
+    module = getattr(callback, "__module__", "") or ""
+    return f"{module.rsplit('.', 1)[-1]}.{getattr(callback, '__name__', type(callback).__name__)}"
+
+
+def query_budget_for(name: str) -> int:
+    return QUERY_BUDGETS.get(name, DEFAULT_QUERY_BUDGET)
+
+
+class QueryStatsMiddleware(BaseMiddleware):
+    """Count SQL statements and DB time of every handler call."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        handler_object = data.get("handler")
+        name = handler_name(handler_object) if handler_object else "unknown"
+
+        with track_queries() as stats:
+            try:
+                return await handler(event, data)
+            finally:
+                budget = query_budget_for(name)
+                over_budget = stats.statements > budget
+                record_handler_queries(name, stats, over_budget)
+                if over_budget:
+                    logger.warning(
+                        f"Handler {name} ran {stats.statements} SQL statements "
+                        f"(budget {budget}), {stats.db_time * 1000:.0f} ms in the database"
+                    )
@@ -0,0 +1,105 @@
+import asyncio
+import cProfile
+import logging
+import os
+import random
+import time
+import tracemalloc
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import AsyncIterator, Optional
+
+from bot.config import config
+
+logger = logging.getLogger(__name__)
+
+# Lines of the allocation diff written next to each profile
+TRACEMALLOC_TOP = 25
+TRACEMALLOC_FRAMES = 10
+
+
+class SamplingProfiler:
+    """
+    Profile a random share of handler calls and job runs with cProfile.
+
+    Only one sample runs at a time (the interpreter allows a single active profiler),
+    and since it profiles the event loop thread, other updates handled during the
+    sample show up in it too, while work moved to asyncio.to_thread (chart rendering)
+    appears as time spent in select(). With sample_rate 0 the cost is one comparison.
+    """
+
+    def __init__(self, sample_rate: float, output_dir: str, trace_memory: bool, min_duration_ms: int):
+        self.sample_rate = sample_rate
+        self.output_dir = output_dir
+        self.trace_memory = trace_memory
+        self.min_duration_ms = min_duration_ms
+        self._active = False
+
+    def should_sample(self) -> bool:
+        return self.sample_rate > 0 and not self._active and random.random() < self.sample_rate
+
+    @asynccontextmanager
+    async def profile(self, name: str) -> AsyncIterator[None]:
+        """Profile the enclosed code; callers check should_sample() first."""
+        if self._active:
+            yield
+            return
+
+        self._active = True
+        memory_before = None
+        if self.trace_memory:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            memory_before = tracemalloc.take_snapshot()
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            memory_after = None
+            if memory_before is not None:
+                memory_after = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+            self._active = False
+
+            if elapsed_ms >= self.min_duration_ms:
+                try:
+                    await asyncio.to_thread(
+                        self._write, name, elapsed_ms, profile, memory_before, memory_after
+                    )
+                except OSError as e:
+                    logger.error(f"Failed to write profile for {name}: {e}")
+
+    def _write(
+        self,
+        name: str,
+        elapsed_ms: float,
+        profile: cProfile.Profile,
+        memory_before: Optional[tracemalloc.Snapshot],
+        memory_after: Optional[tracemalloc.Snapshot],
+    ) -> None:
+        os.makedirs(self.output_dir, exist_ok=True)
+        stem = os.path.join(
+            self.output_dir,
+            f"{datetime.now():%Y%m%d-%H%M%S}-{name}-{elapsed_ms:.0f}ms",
+        )
+        profile.dump_stats(f"{stem}.prof")
+
+        if memory_before is not None and memory_after is not None:
+            diff = memory_after.compare_to(memory_before, "lineno")
+            with open(f"{stem}.mem.txt", "w", encoding="utf-8") as f:
+                f.write(f"{name}: {elapsed_ms:.1f} ms, top {TRACEMALLOC_TOP} allocation changes\n")
+                for stat in diff[:TRACEMALLOC_TOP]:
+                    f.write(f"{stat}\n")
+
+        logger.info(f"Wrote profile {stem}.prof ({elapsed_ms:.0f} ms)")
+
+
+profiler = SamplingProfiler(
+    sample_rate=config.profiling.sample_rate,
+    output_dir=config.profiling.output_dir,
+    trace_memory=config.profiling.trace_memory,
+    min_duration_ms=config.profiling.min_duration_ms,
+)
@@ -6,19 +6,22 @@ from aiogram import Bot
 
 from bot.db.database import async_session
 from bot.db import crud
-from bot.services.analytics import get_weekly_stats
 from bot.services.daily_summary import get_daily_summary
 from bot.services.alerts import check_alerts
-from bot.services.coach import get_coach_comment
-from bot.utils.formatters import format_weekly_report, format_alert, format_daily_summary
+from bot.services.weekly_report import build_weekly_report, pregenerate_due_reports
+from bot.utils.formatters import format_alert, format_daily_summary
+from bot.utils.image_output import chart_filename
+from bot.utils.messages import send_report
 from bot.keyboards.inline import get_reminder_keyboard, get_alert_keyboard
 from bot.config import config
+from bot.metrics import record_job_users, timed_job
 
 logger = logging.getLogger(__name__)
 
 scheduler = AsyncIOScheduler(timezone=config.timezone)
 
 
+@timed_job("weigh_reminder")
 async def send_weigh_reminder(bot: Bot):
     """Send weight reminder to users who have it scheduled now."""
     logger.info("Running weigh reminder job")
@@ -28,6 +31,7 @@ async def send_weigh_reminder(bot: Bot):
 
     current_time = datetime.now().time()
     current_weekday = datetime.now().strftime("%A").lower()
+    sent = 0
 
     for user, settings in users_with_settings:
         if settings.weigh_day != current_weekday:
@@ -46,11 +50,15 @@ async def send_weigh_reminder(bot: Bot):
                 "Напиши вес или нажми кнопку",
                 reply_markup=get_reminder_keyboard("weigh"),
             )
+            sent += 1
             logger.info(f"Sent weigh reminder to user {user.telegram_id}")
         except Exception as e:
             logger.error(f"Failed to send weigh reminder to {user.telegram_id}: {e}")
 
+    record_job_users("weigh_reminder", len(users_with_settings), sent)
 
+
+@timed_job("daily_reminder")
 async def send_daily_reminder(bot: Bot):
     """Send smart daily summary to users who have it scheduled now."""
     logger.info("Running daily reminder job")
@@ -60,6 +68,7 @@ async def send_daily_reminder(bot: Bot):
 
     current_time = datetime.now().time()
     today = date.today()
+    sent = 0
 
     for user, settings in users_with_settings:
         if abs(
@@ -82,11 +91,15 @@ async def send_daily_reminder(bot: Bot):
                     reply_markup=get_reminder_keyboard("daily"),
                 )
 
+            sent += 1
             logger.info(f"Sent daily reminder to user {user.telegram_id}")
         except Exception as e:
             logger.error(f"Failed to send daily reminder to {user.telegram_id}: {e}")
 
+    record_job_users("daily_reminder", len(users_with_settings), sent)
+
 
+@timed_job("weekly_report")
 async def send_weekly_report(bot: Bot):
     """Send weekly report to users who have it scheduled now."""
     logger.info("Running weekly report job")
@@ -96,6 +109,7 @@ async def send_weekly_report(bot: Bot):
 
     current_time = datetime.now().time()
     current_weekday = datetime.now().strftime("%A").lower()
+    sent = 0
 
     for user, settings in users_with_settings:
         if settings.weigh_day != current_weekday:
@@ -109,17 +123,50 @@ async def send_weekly_report(bot: Bot):
 
         try:
             async with async_session() as report_session:
-                stats = await get_weekly_stats(report_session, user.id)
+                report = await crud.get_weekly_report(report_session, user.id, date.today())
+
+            if report is not None and report.sent_at is not None:
+                continue
+
+            if report is not None:
+                text, chart = report.text, report.chart_png
+            else:
+                # Not pre-generated, e.g. the send time was changed inside the lead window
+                artifacts = await build_weekly_report(user.id, settings.use_ai_coach)
+                text, chart = artifacts.text, artifacts.chart_png
 
-            coach_comment = await get_coach_comment(stats, use_ai=settings.use_ai_coach)
-            report = format_weekly_report(stats, coach_comment)
+            await send_report(
+                bot, user.telegram_id, text, chart, chart_filename("weekly_dashboard")
+            )
+
+            if report is not None:
+                async with async_session() as report_session:
+                    await crud.mark_weekly_report_sent(report_session, report.id)
 
-            await bot.send_message(user.telegram_id, report)
-            logger.info(f"Sent weekly report to user {user.telegram_id}")
+            sent += 1
+            logger.info(
+                f"Sent weekly report to user {user.telegram_id} "
+                f"({'pre-generated' if report else 'built on send'})"
+            )
         except Exception as e:
             logger.error(f"Failed to send weekly report to {user.telegram_id}: {e}")
 
+    record_job_users("weekly_report", len(users_with_settings), sent)
+
+
+@timed_job("weekly_report_pregenerate")
+async def pregenerate_weekly_reports(bot: Bot):
+    """Build weekly reports ahead of their send time so the send job only delivers."""
+    async with async_session() as session:
+        users_with_settings = await crud.get_all_users_with_settings(session)
+
+    built = await pregenerate_due_reports(users_with_settings, datetime.now())
+    record_job_users("weekly_report_pregenerate", len(users_with_settings), built)
+    if built:
+        logger.info(f"Pre-generated {built} weekly reports")
 
+
+@timed_job("alerts_check")
 async def check_and_send_alerts(bot: Bot):
     """Check for alerts and send them to users."""
     logger.info("Running alerts check job")
@@ -127,6 +174,7 @@ async def check_and_send_alerts(bot: Bot):
     async with async_session() as session:
         users_with_settings = await crud.get_all_users_with_settings(session)
 
+    alerted = 0
     for user, settings in users_with_settings:
         try:
             async with async_session() as alert_session:
@@ -141,9 +189,12 @@ async def check_and_send_alerts(bot: Bot):
                 logger.info(
                     f"Sent alert {alert.alert_type} to user {user.telegram_id}"
                 )
+            alerted += bool(alerts)
         except Exception as e:
             logger.error(f"Failed to check/send alerts to {user.telegram_id}: {e}")
 
+    record_job_users("alerts_check", len(users_with_settings), alerted)
+
 
 def setup_scheduler(bot: Bot):
     """Setup all scheduled jobs."""
@@ -171,6 +222,14 @@ def setup_scheduler(bot: Bot):
         replace_existing=True,
     )
 
+    scheduler.add_job(
+        pregenerate_weekly_reports,
+        CronTrigger(minute="*/10"),
+        args=[bot],
+        id="weekly_report_pregenerate",
+        replace_existing=True,
+    )
+
     scheduler.add_job(
         check_and_send_alerts,
         CronTrigger(hour="12"),
@@ -2,9 +2,15 @@ from dataclasses import dataclass
 from datetime import date, timedelta
 from decimal import Decimal
 from typing import Optional, List
+import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
 from bot.db import crud
 
+# Weigh-ins in the dashboard's weight moving average
+TREND_WINDOW = 7
+# Columns of the yearly activity heatmap, one per week
+HEATMAP_WEEKS = 53
+
 
 @dataclass
 class WeeklyStats:
@@ -58,6 +64,39 @@ class ExerciseProgress:
     e1rm_change_pct: Decimal
 
 
+@dataclass
+class DashboardData:
+    # One entry per day of the period, None where nothing was logged
+    dates: List[date]
+    weights: List[Optional[Decimal]]
+    weight_trend: List[Optional[Decimal]]
+    calories: List[Optional[int]]
+    burned: List[int]
+    workouts: List[int]
+    water_ml: List[Optional[int]]
+    sleep_hours: List[Optional[Decimal]]
+    target_calories: Optional[int]
+
+    @property
+    def has_data(self) -> bool:
+        return any(
+            any(value for value in values)
+            for values in (self.weights, self.calories, self.burned, self.water_ml, self.sleep_hours)
+        )
+
+
+@dataclass
+class ActivityHeatmap:
+    start_date: date  # Monday of the first column
+    end_date: date
+    # 7 x HEATMAP_WEEKS, weekday rows and week columns: how many of calories, workout
+    # and weight were logged that day (0-3), -1 for days after end_date
+    levels: np.ndarray
+    days_logged: int
+    longest_streak: int
+    current_streak: int
+
+
 async def get_weekly_stats(
     session: AsyncSession,
     user_id: int,
@@ -189,6 +228,100 @@ async def get_weight_trend(
     return WeightTrend(dates=dates, weights=weights, moving_avg=moving_avg)
 
 
+async def get_dashboard_data(
+    session: AsyncSession,
+    user_id: int,
+    days: int,
+    end_date: Optional[date] = None,
+) -> DashboardData:
+    """Daily metrics for the report dashboard of the `days` ending on end_date."""
+    if end_date is None:
+        end_date = date.today()
+
+    start_date = end_date - timedelta(days=days - 1)
+    # Extra days so the weight moving average is already warmed up on the first day
+    lookback_start = start_date - timedelta(days=TREND_WINDOW - 1)
+
+    rows = await crud.get_daily_metrics(session, user_id, lookback_start, end_date)
+    targets = await crud.get_computed_targets(session, user_id)
+    by_day = {row.day: row for row in rows}
+
+    trend_by_day = {}
+    recent_weights: List[Decimal] = []
+    for row in rows:
+        if row.weight_kg is None:
+            continue
+        recent_weights = (recent_weights + [Decimal(row.weight_kg)])[-TREND_WINDOW:]
+        trend_by_day[row.day] = sum(recent_weights, Decimal(0)) / len(recent_weights)
+
+    dates = [start_date + timedelta(days=i) for i in range(days)]
+    rows = [by_day.get(day) for day in dates]
+
+    return DashboardData(
+        dates=dates,
+        weights=[Decimal(row.weight_kg) if row and row.weight_kg is not None else None for row in rows],
+        weight_trend=[trend_by_day.get(day) for day in dates],
+        calories=[row.calories if row else None for row in rows],
+        burned=[int(row.burned or 0) if row else 0 for row in rows],
+        workouts=[int(row.workouts or 0) if row else 0 for row in rows],
+        water_ml=[row.water_ml if row else None for row in rows],
+        sleep_hours=[
+            Decimal(row.sleep_hours) if row and row.sleep_hours is not None else None
+            for row in rows
+        ],
+        target_calories=targets.target_calories if targets else None,
+    )
+
+
+async def get_activity_heatmap(
+    session: AsyncSession,
+    user_id: int,
+    end_date: Optional[date] = None,
+) -> ActivityHeatmap:
+    """Logging consistency over the last year, from one grouped query."""
+    if end_date is None:
+        end_date = date.today()
+
+    start_date = end_date - timedelta(days=end_date.weekday() + 7 * (HEATMAP_WEEKS - 1))
+    total_days = (end_date - start_date).days + 1
+
+    rows = await crud.get_daily_metrics(session, user_id, start_date, end_date)
+    offsets = np.fromiter(
+        ((row.day - start_date).days for row in rows), dtype=np.int64, count=len(rows)
+    )
+    # One point each for logged meals (the day's calorie_entries sum), a workout
+    # and a weigh-in
+    scores = np.fromiter(
+        (
+            bool(row.calories) + bool(row.workouts) + (row.weight_kg is not None)
+            for row in rows
+        ),
+        dtype=np.int8,
+        count=len(rows),
+    )
+
+    levels = np.full(7 * HEATMAP_WEEKS, -1, dtype=np.int8)
+    levels[:total_days] = 0
+    levels[offsets] = scores
+
+    logged = levels[:total_days] > 0
+    # Run lengths of logged days: split at the gaps
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], logged.view(np.int8), [0]))))
+    runs = edges[1::2] - edges[::2]
+    # Today may simply not be logged yet
+    tail = logged[:-1] if not logged[-1] else logged
+    current_streak = int(np.argmin(tail[::-1])) if not tail.all() else len(tail)
+
+    return ActivityHeatmap(
+        start_date=start_date,
+        end_date=end_date,
+        levels=levels.reshape(HEATMAP_WEEKS, 7).T,
+        days_logged=int(logged.sum()),
+        longest_streak=int(runs.max()) if len(runs) else 0,
+        current_streak=current_streak,
+    )
+
+
 async def get_exercise_progress(
     session: AsyncSession,
     user_id: int,
@@ -0,0 +1,331 @@
+import asyncio
+import logging
+import zipfile
+import xml.etree.ElementTree as ET
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, BinaryIO, Dict, List, Optional
+
+from bot.db.database import async_session
+from bot.db import crud
+from bot.services.data_import import ImportResult, ProgressCallback
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+BODY_MASS = "HKQuantityTypeIdentifierBodyMass"
+DIETARY_ENERGY = "HKQuantityTypeIdentifierDietaryEnergyConsumed"
+ACTIVE_ENERGY = "HKQuantityTypeIdentifierActiveEnergyBurned"
+SLEEP_ANALYSIS = "HKCategoryTypeIdentifierSleepAnalysis"
+
+SLEEP_IN_BED = "HKCategoryValueSleepAnalysisInBed"
+SLEEP_ASLEEP_PREFIX = "HKCategoryValueSleepAnalysisAsleep"
+
+SOURCE_DESCRIPTION = "Apple Health"
+# calorie_entries.source of imported rows
+IMPORT_SOURCE = "apple_health"
+
+WORKOUT_TYPES = {
+    "TraditionalStrengthTraining": "gym",
+    "FunctionalStrengthTraining": "gym",
+    "CrossTraining": "gym",
+    "CoreTraining": "gym",
+    "Running": "cardio",
+    "Cycling": "cardio",
+    "Swimming": "cardio",
+    "Rowing": "cardio",
+    "Elliptical": "cardio",
+    "HighIntensityIntervalTraining": "cardio",
+    "StairClimbing": "cardio",
+    "JumpRope": "cardio",
+    "Walking": "walking",
+    "Hiking": "walking",
+}
+
+_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S %z"
+
+
+@dataclass
+class HealthExport:
+    """Per-day aggregates extracted from an Apple Health export."""
+
+    records_read: int = 0
+    weights: Dict[date, Decimal] = field(default_factory=dict)
+    dietary_kcal: Dict[date, float] = field(default_factory=lambda: defaultdict(float))
+    active_kcal: Dict[date, float] = field(default_factory=lambda: defaultdict(float))
+    sleep_hours: Dict[date, float] = field(default_factory=dict)
+    workouts: List[Dict[str, Any]] = field(default_factory=list)
+
+
+async def import_apple_health(
+    path: str,
+    user_id: int,
+    progress: Optional[ProgressCallback] = None,
+) -> ImportResult:
+    """
+    Import an Apple Health export.xml (or the export.zip containing it).
+
+    Parsing runs in a worker thread with constant memory; only per-day aggregates
+    are kept and then written in batches.
+    """
+    export = await asyncio.to_thread(parse_health_export, path)
+
+    result = ImportResult(rows_read=export.records_read)
+    daily_rows = _build_daily_rows(export)
+    calorie_rows = [
+        {
+            "entry_date": day,
+            "calories": int(kcal),
+            "description": SOURCE_DESCRIPTION,
+            "source": IMPORT_SOURCE,
+        }
+        for day, kcal in sorted(export.dietary_kcal.items())
+        if 0 < kcal <= 10000
+    ]
+    workout_rows = _attach_active_energy(export)
+
+    # Rows stored before the import, per date, shared by all batches
+    stored_calories: Dict[date, Counter] = {}
+    stored_workouts: Dict[date, Counter] = {}
+    for start in range(0, max(len(daily_rows), len(calorie_rows), len(workout_rows)), BATCH_SIZE):
+        async with async_session() as session:
+            result.daily_logs += await crud.bulk_upsert_daily_logs(
+                session, user_id, daily_rows[start : start + BATCH_SIZE]
+            )
+            result.calorie_entries += await crud.bulk_insert_calorie_entries(
+                session,
+                user_id,
+                calorie_rows[start : start + BATCH_SIZE],
+                match_calories=False,
+                stored=stored_calories,
+            )
+            result.workouts += await crud.bulk_insert_workouts(
+                session, user_id, workout_rows[start : start + BATCH_SIZE], stored=stored_workouts
+            )
+
+        if progress:
+            await progress(result)
+
+    logger.info(f"Apple Health import for user {user_id} finished: {result}")
+    return result
+
+
+def parse_health_export(path: str) -> HealthExport:
+    """Stream-parse export.xml, clearing every processed element."""
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            member = next(
+                (
+                    name for name in archive.namelist()
+                    if name.endswith("/export.xml") or name == "export.xml"
+                ),
+                None,
+            )
+            if member is None:
+                raise ValueError("export.xml not found in archive")
+            with archive.open(member) as source:
+                return _parse_stream(source)
+
+    with open(path, "rb") as source:
+        return _parse_stream(source)
+
+
+def _parse_stream(source: BinaryIO) -> HealthExport:
+    export = HealthExport()
+    first_weight_at: Dict[date, str] = {}
+    sleep_by_source: Dict[date, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    in_bed_by_source: Dict[date, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+
+    depth = 0
+    root = None
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = elem
+            depth += 1
+            continue
+
+        depth -= 1
+        if depth != 1:
+            continue
+
+        if elem.tag == "Record":
+            export.records_read += 1
+            _handle_record(elem, export, first_weight_at, sleep_by_source, in_bed_by_source)
+        elif elem.tag == "Workout":
+            export.records_read += 1
+            workout = _parse_workout(elem)
+            if workout:
+                export.workouts.append(workout)
+
+        # Top-level children are fully processed, drop them to keep memory flat
+        root.clear()
+
+    for day in set(sleep_by_source) | set(in_bed_by_source):
+        # Several devices may track the same night: take the best single source
+        asleep = max(sleep_by_source[day].values(), default=0.0)
+        hours = asleep or max(in_bed_by_source[day].values(), default=0.0)
+        if 0 < hours <= 24:
+            export.sleep_hours[day] = hours
+
+    return export
+
+
+def _handle_record(
+    elem: ET.Element,
+    export: HealthExport,
+    first_weight_at: Dict[date, str],
+    sleep_by_source: Dict[date, Dict[str, float]],
+    in_bed_by_source: Dict[date, Dict[str, float]],
+) -> None:
+    record_type = elem.get("type")
+    if record_type not in (BODY_MASS, DIETARY_ENERGY, ACTIVE_ENERGY, SLEEP_ANALYSIS):
+        return
+
+    start = elem.get("startDate") or ""
+    try:
+        day = date.fromisoformat(start[:10])
+    except ValueError:
+        return
+
+    if record_type == SLEEP_ANALYSIS:
+        value = elem.get("value") or ""
+        end = elem.get("endDate") or ""
+        hours = _duration_hours(start, end)
+        if hours is None:
+            return
+        # A night belongs to the day the user woke up
+        wake_day = date.fromisoformat(end[:10])
+        source = elem.get("sourceName") or ""
+        if value.startswith(SLEEP_ASLEEP_PREFIX):
+            sleep_by_source[wake_day][source] += hours
+        elif value == SLEEP_IN_BED:
+            in_bed_by_source[wake_day][source] += hours
+        return
+
+    amount = _to_float(elem.get("value"))
+    if amount is None:
+        return
+    unit = elem.get("unit") or ""
+
+    if record_type == BODY_MASS:
+        weight = _to_kg(amount, unit)
+        if weight is None or not 30 <= weight <= 300:
+            return
+        # Keep the earliest (morning) weighing of the day
+        if day not in first_weight_at or start < first_weight_at[day]:
+            first_weight_at[day] = start
+            export.weights[day] = Decimal(str(round(weight, 2)))
+    elif record_type == DIETARY_ENERGY:
+        export.dietary_kcal[day] += _to_kcal(amount, unit)
+    else:
+        export.active_kcal[day] += _to_kcal(amount, unit)
+
+
+def _parse_workout(elem: ET.Element) -> Optional[Dict[str, Any]]:
+    start = elem.get("startDate") or ""
+    try:
+        day = date.fromisoformat(start[:10])
+    except ValueError:
+        return None
+
+    activity = (elem.get("workoutActivityType") or "").replace("HKWorkoutActivityType", "")
+    duration = _to_float(elem.get("duration"))
+    if duration is not None and elem.get("durationUnit") == "hr":
+        duration *= 60
+    elif duration is not None and elem.get("durationUnit") == "s":
+        duration /= 60
+
+    energy = _to_float(elem.get("totalEnergyBurned"))
+    if energy is not None:
+        energy = _to_kcal(energy, elem.get("totalEnergyBurnedUnit") or "kcal")
+    else:
+        # Newer exports keep energy in WorkoutStatistics children
+        for stats in elem.iter("WorkoutStatistics"):
+            if stats.get("type") == ACTIVE_ENERGY:
+                total = _to_float(stats.get("sum"))
+                if total is not None:
+                    energy = _to_kcal(total, stats.get("unit") or "kcal")
+                break
+
+    return {
+        "workout_date": day,
+        "workout_type": WORKOUT_TYPES.get(activity, "other"),
+        "duration_min": int(round(duration)) if duration and 0 < duration <= 480 else None,
+        "calories_burned": int(energy) if energy and 0 < energy <= 5000 else None,
+        "notes": f"{SOURCE_DESCRIPTION}: {activity}" if activity else SOURCE_DESCRIPTION,
+    }
+
+
+def _build_daily_rows(export: HealthExport) -> List[Dict[str, Any]]:
+    days = sorted(set(export.weights) | set(export.sleep_hours))
+    return [
+        {
+            "log_date": day,
+            "weight_kg": export.weights.get(day),
+            "water_ml": None,
+            "sleep_hours": (
+                Decimal(str(round(export.sleep_hours[day], 1)))
+                if day in export.sleep_hours else None
+            ),
+        }
+        for day in days
+    ]
+
+
+def _attach_active_energy(export: HealthExport) -> List[Dict[str, Any]]:
+    """
+    Use daily active energy for workouts exported without their own energy.
+
+    The bot stores burned calories only on workouts, so a day's active energy is
+    attached to its first workout when none of that day's workouts has energy.
+    """
+    by_day: Dict[date, List[Dict[str, Any]]] = defaultdict(list)
+    for workout in export.workouts:
+        by_day[workout["workout_date"]].append(workout)
+
+    for day, workouts in by_day.items():
+        active = export.active_kcal.get(day)
+        if active and all(w["calories_burned"] is None for w in workouts):
+            workouts[0]["calories_burned"] = int(min(active, 5000))
+
+    return export.workouts
+
+
+def _duration_hours(start: str, end: str) -> Optional[float]:
+    try:
+        delta = datetime.strptime(end, _DATETIME_FORMAT) - datetime.strptime(
+            start, _DATETIME_FORMAT
+        )
+    except ValueError:
+        return None
+    hours = delta.total_seconds() / 3600
+    return hours if hours > 0 else None
+
+
+def _to_float(value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _to_kg(amount: float, unit: str) -> Optional[float]:
+    if unit == "kg":
+        return amount
+    if unit == "lb":
+        return amount * 0.45359237
+    if unit == "g":
+        return amount / 1000
+    return None
+
+
+def _to_kcal(amount: float, unit: str) -> float:
+    if unit == "kJ":
+        return amount / 4.184
+    return amount
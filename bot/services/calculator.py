@@ -117,3 +117,12 @@ def calculate_e1rm(weight_kg: Decimal, reps: int) -> Decimal:
     if reps == 1:
         return weight_kg
     return weight_kg * (Decimal("1") + Decimal(reps) / Decimal("30"))
+
+
+def estimate_calories_burned(met: Decimal, weight_kg: Decimal, duration_min: int) -> int:
+    """
+    Estimate workout energy expenditure from its MET value.
+
+    kcal = MET × weight(kg) × hours
+    """
+    return int(met * weight_kg * Decimal(duration_min) / Decimal("60"))
@@ -1,57 +1,259 @@
+import asyncio
+import hashlib
+import importlib.util
+import json
 import logging
-from typing import Optional
+import time
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, Dict, Optional
 
-try:
+# The openai package takes most of a second to import, so it is only checked for
+# here and imported when the first client is created
+OPENAI_AVAILABLE = importlib.util.find_spec("openai") is not None
+
+if TYPE_CHECKING:
     from openai import AsyncOpenAI
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
-    AsyncOpenAI = None
 
 from bot.config import config
+from bot.db.database import async_session
+from bot.db import crud
 from bot.services.analytics import WeeklyStats
 
 logger = logging.getLogger(__name__)
 
+SYSTEM_PROMPT = (
+    "Ты — фитнес-коуч бот. Твоя задача — дать короткий, "
+    "мотивирующий комментарий к недельному отчёту пользователя. "
+    "Пиши на русском языке, дружелюбно но без лишних эмоций. "
+    "Будь конкретен — давай actionable советы. "
+    "Ответ должен быть 2-4 предложения, не больше."
+)
+
+MAX_TOKENS = 200
+TEMPERATURE = 0.7
+# A cached comment stays valid for a week after the reported week ends
+CACHE_TTL_DAYS = 7
+
+# Consecutive failures that open the breaker, and how long it stays open
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_RESET_SEC = 60.0
+
+
+class CircuitOpenError(Exception):
+    """Raised for queued calls when the breaker opened while they waited."""
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing service for a while.
+
+    After `failure_threshold` consecutive failures the breaker opens and rejects
+    calls for `reset_timeout` seconds; then one trial call is let through and its
+    outcome closes or re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+        if self._trial_in_flight or time.monotonic() - self.opened_at < self.reset_timeout:
+            return False
+        self._trial_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                logger.warning(f"AI coach circuit opened after {self.failures} failures")
+            self.opened_at = time.monotonic()
+
+
+_client: Optional["AsyncOpenAI"] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+_breaker = CircuitBreaker(BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_SEC)
+_in_flight: Dict[str, "asyncio.Future[Optional[str]]"] = {}
+
+
+def _get_client() -> "AsyncOpenAI":
+    """Process-wide client, so HTTP keep-alive connections and TLS sessions are reused."""
+    global _client
+    if _client is None:
+        from openai import AsyncOpenAI
+
+        _client = AsyncOpenAI(
+            api_key=config.openai.api_key,
+            base_url=config.openai.base_url,
+            timeout=config.openai.timeout,
+            # A retry would blow the deadline; the breaker deals with outages
+            max_retries=0,
+        )
+    return _client
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(config.openai.max_concurrency)
+    return _semaphore
+
+
+async def close_coach_client() -> None:
+    """Close pooled connections on shutdown."""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
 
 async def get_coach_comment(stats: WeeklyStats, use_ai: bool = True) -> Optional[str]:
     """
     Generate AI coach comment for weekly report.
 
-    Returns None if AI is disabled or unavailable.
+    Returns None if AI is disabled or not configured, and a template comment if
+    the API is slow, failing or the circuit breaker is open. Comments are cached
+    by prompt fingerprint, so identical weekly stats are only sent to the API once.
     """
     if not OPENAI_AVAILABLE or not use_ai or not config.openai.api_key:
         return None
 
+    fingerprint = _fingerprint(stats)
+    async with async_session() as session:
+        cached = await crud.get_cached_coach_comment(session, fingerprint, date.today())
+    if cached:
+        return cached
+
+    # A tap and the scheduled report arriving together share one completion
+    future = _in_flight.get(fingerprint)
+    if future is None:
+        future = asyncio.ensure_future(_generate_comment(stats, fingerprint))
+        _in_flight[fingerprint] = future
+        future.add_done_callback(lambda _: _in_flight.pop(fingerprint, None))
+
+    comment = await asyncio.shield(future)
+    return comment or _template_comment(stats)
+
+
+async def _generate_comment(stats: WeeklyStats, fingerprint: str) -> Optional[str]:
+    """Ask the API for a comment and cache it. Returns None on failure."""
+    if not _breaker.allow():
+        return None
+    is_trial = _breaker.is_open
+
+    try:
+        comment = await asyncio.wait_for(
+            _request_comment(stats, is_trial), timeout=config.openai.timeout
+        )
+    except CircuitOpenError:
+        return None
+    except asyncio.CancelledError:
+        # Free the half-open trial slot, otherwise the breaker never closes again
+        _breaker.record_failure()
+        raise
+    except Exception as e:
+        _breaker.record_failure()
+        logger.warning(f"Failed to get AI coach comment: {e!r}")
+        return None
+
+    _breaker.record_success()
+    if not comment:
+        return None
+
     try:
-        client = AsyncOpenAI(api_key=config.openai.api_key)
+        async with async_session() as session:
+            await crud.save_coach_comment(
+                session,
+                fingerprint,
+                config.openai.model,
+                comment,
+                expires_on=stats.end_date + timedelta(days=CACHE_TTL_DAYS),
+            )
+    except Exception as e:
+        logger.warning(f"Failed to cache AI coach comment: {e!r}")
 
-        prompt = _build_prompt(stats)
+    return comment
 
-        response = await client.chat.completions.create(
+
+async def _request_comment(stats: WeeklyStats, is_trial: bool) -> Optional[str]:
+    # The deadline covers waiting for a slot too, so a backlog cannot stall callers
+    async with _get_semaphore():
+        if _breaker.is_open and not is_trial:
+            raise CircuitOpenError()
+        response = await _get_client().chat.completions.create(
             model=config.openai.model,
             messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "Ты — фитнес-коуч бот. Твоя задача — дать короткий, "
-                        "мотивирующий комментарий к недельному отчёту пользователя. "
-                        "Пиши на русском языке, дружелюбно но без лишних эмоций. "
-                        "Будь конкретен — давай actionable советы. "
-                        "Ответ должен быть 2-4 предложения, не больше."
-                    ),
-                },
-                {"role": "user", "content": prompt},
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": _build_prompt(stats)},
             ],
-            max_tokens=200,
-            temperature=0.7,
+            max_tokens=MAX_TOKENS,
+            temperature=TEMPERATURE,
         )
+    return response.choices[0].message.content
 
-        return response.choices[0].message.content
 
-    except Exception as e:
-        logger.warning(f"Failed to get AI coach comment: {e}")
-        return None
+def _fingerprint(stats: WeeklyStats) -> str:
+    """Stable hash of everything that determines the completion."""
+    payload = json.dumps(
+        {
+            "model": config.openai.model,
+            "system": SYSTEM_PROMPT,
+            "prompt": _build_prompt(stats),
+            "max_tokens": MAX_TOKENS,
+            "temperature": TEMPERATURE,
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _template_comment(stats: WeeklyStats) -> str:
+    """Rule-based comment used when the AI coach is unavailable."""
+    parts = []
+
+    if stats.weight_change is not None:
+        if stats.weight_change < 0:
+            parts.append(f"Минус {abs(stats.weight_change):.1f} кг за неделю — хороший темп.")
+        elif stats.weight_change > 0:
+            parts.append(f"Вес +{stats.weight_change:.1f} кг — сверь это со своей целью.")
+        else:
+            parts.append("Вес стабилен.")
+
+    if stats.planned_workouts and stats.workout_count >= stats.planned_workouts:
+        parts.append("Все запланированные тренировки выполнены, так держать!")
+    elif stats.planned_workouts:
+        missing = stats.planned_workouts - stats.workout_count
+        parts.append(f"Не хватило {missing} тренировок до плана — запланируй их заранее.")
+
+    if stats.avg_calories and stats.target_calories:
+        if stats.avg_calories > stats.target_calories * 1.1:
+            parts.append("Калории выше плана: начни с контроля перекусов.")
+        elif stats.avg_calories < stats.target_calories * 0.8:
+            parts.append("Ешь заметно меньше плана — не перегибай, это бьёт по энергии.")
+
+    if stats.avg_sleep_hours and stats.avg_sleep_hours < 7:
+        parts.append("Сна меньше 7 часов — попробуй ложиться на полчаса раньше.")
+
+    if not parts:
+        parts.append("Записывай вес, еду и тренировки — так отчёт станет точнее.")
+
+    return " ".join(parts[:3])
 
 
 def _build_prompt(stats: WeeklyStats) -> str:
@@ -0,0 +1,71 @@
+import asyncio
+import gzip
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, TextIO
+
+from bot.db.database import async_session
+from bot.db import crud
+from bot.db.models import DailyLog, CalorieEntry, Workout, StrengthLog
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 1000
+
+EXPORT_MODELS = (DailyLog, CalorieEntry, Workout, StrengthLog)
+
+
+@dataclass
+class ExportResult:
+    counts: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+
+async def export_user_data(user_id: int, path: str) -> ExportResult:
+    """
+    Write the user's full history to a gzip JSONL file, one row per line.
+
+    Rows are read with keyset pagination on id and appended page by page, so memory
+    use does not depend on how much history the user has.
+    """
+    result = ExportResult()
+    handle = await asyncio.to_thread(gzip.open, path, "wt", encoding="utf-8")
+    try:
+        for model in EXPORT_MODELS:
+            table_name = model.__tablename__
+            result.counts[table_name] = 0
+            after_id = 0
+
+            while True:
+                async with async_session() as session:
+                    rows = await crud.get_user_rows_page(
+                        session, model, user_id, after_id, PAGE_SIZE
+                    )
+                if not rows:
+                    break
+
+                await asyncio.to_thread(_write_rows, handle, table_name, rows)
+                result.counts[table_name] += len(rows)
+                after_id = rows[-1].id
+
+                if len(rows) < PAGE_SIZE:
+                    break
+    finally:
+        await asyncio.to_thread(handle.close)
+
+    logger.info(f"Exported {result.total} rows for user {user_id}")
+    return result
+
+
+def _write_rows(handle: TextIO, table_name: str, rows: List[Any]) -> None:
+    lines = []
+    for row in rows:
+        record: Dict[str, Any] = {"table": table_name}
+        record.update(row._mapping)
+        record.pop("user_id", None)
+        lines.append(json.dumps(record, ensure_ascii=False, default=str))
+    handle.write("\n".join(lines) + "\n")
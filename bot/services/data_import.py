@@ -0,0 +1,305 @@
+import asyncio
+import csv
+import itertools
+import logging
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from bot.db.database import async_session
+from bot.db import crud
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+# calorie_entries.source of imported rows
+IMPORT_SOURCE = "csv"
+
+COLUMN_ALIASES = {
+    "date": ("date", "дата", "day", "день"),
+    "calories": ("calories", "калории", "ккал", "kcal", "energy", "энергия"),
+    "description": (
+        "meal", "description", "food", "name",
+        "приём пищи", "прием пищи", "описание", "блюдо", "продукт",
+    ),
+    "weight": ("weight", "body weight", "вес", "масса тела"),
+    "water": ("water", "вода"),
+    "sleep": ("sleep", "сон"),
+    "workout_type": ("exercise", "workout", "activity", "тренировка", "упражнение"),
+    "duration": ("duration", "minutes", "exercise minutes", "длительность", "минуты"),
+    "calories_burned": (
+        "calories burned", "exercise calories", "burned", "сожжено", "сожжённые калории",
+    ),
+}
+
+DATE_FORMATS = ("%Y-%m-%d", "%d.%m.%Y", "%m/%d/%Y", "%d/%m/%Y", "%Y/%m/%d", "%d.%m.%y")
+
+LB_TO_KG = Decimal("0.45359237")
+
+ProgressCallback = Callable[["ImportResult"], Awaitable[None]]
+
+
+@dataclass
+class ImportResult:
+    rows_read: int = 0
+    rows_skipped: int = 0
+    calorie_entries: int = 0
+    daily_logs: int = 0
+    workouts: int = 0
+
+
+@dataclass
+class _ParsedBatch:
+    rows_read: int = 0
+    rows_skipped: int = 0
+    calorie_rows: List[Dict[str, Any]] = field(default_factory=list)
+    daily_rows: Dict[date, Dict[str, Any]] = field(default_factory=dict)
+    workout_rows: List[Dict[str, Any]] = field(default_factory=list)
+
+
+class ImportFormatError(ValueError):
+    """Raised when a file cannot be mapped to any known columns."""
+
+
+async def import_csv(
+    path: str,
+    user_id: int,
+    progress: Optional[ProgressCallback] = None,
+) -> ImportResult:
+    """
+    Stream a CSV export (MyFitnessPal, FatSecret, generic) into the user's history.
+
+    The file is read and parsed batch by batch in a worker thread, so memory stays
+    bounded and the event loop keeps serving other users while the import runs.
+    """
+    handle = await asyncio.to_thread(_open_csv, path)
+    try:
+        reader, mapping = await asyncio.to_thread(_prepare_reader, handle)
+
+        result = ImportResult()
+        # Rows stored before the import, per date, shared by all batches
+        stored_calories: Dict[date, Counter] = {}
+        stored_workouts: Dict[date, Counter] = {}
+        while True:
+            batch = await asyncio.to_thread(_parse_batch, reader, mapping, BATCH_SIZE)
+            if batch.rows_read == 0:
+                break
+
+            result.rows_read += batch.rows_read
+            result.rows_skipped += batch.rows_skipped
+
+            async with async_session() as session:
+                result.calorie_entries += await crud.bulk_insert_calorie_entries(
+                    session, user_id, batch.calorie_rows, stored=stored_calories
+                )
+                result.daily_logs += await crud.bulk_upsert_daily_logs(
+                    session, user_id, list(batch.daily_rows.values())
+                )
+                result.workouts += await crud.bulk_insert_workouts(
+                    session, user_id, batch.workout_rows, stored=stored_workouts
+                )
+
+            if progress:
+                await progress(result)
+    finally:
+        await asyncio.to_thread(handle.close)
+
+    logger.info(f"CSV import for user {user_id} finished: {result}")
+    return result
+
+
+def _open_csv(path: str) -> TextIO:
+    """Open a CSV file, falling back to cp1251 for old Russian exports."""
+    with open(path, "rb") as raw:
+        sample = raw.read(64 * 1024)
+
+    try:
+        sample.decode("utf-8-sig")
+        encoding = "utf-8-sig"
+    except UnicodeDecodeError:
+        encoding = "cp1251"
+
+    return open(path, encoding=encoding, errors="replace", newline="")
+
+
+def _prepare_reader(handle: TextIO) -> Tuple[Iterator[List[str]], Dict[str, int]]:
+    sample = handle.read(16 * 1024)
+    handle.seek(0)
+
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+
+    reader = csv.reader(handle, dialect)
+    header = next(reader, None)
+    if not header:
+        raise ImportFormatError("empty file")
+
+    mapping = _map_columns(header)
+    if "date" not in mapping or len(mapping) < 2:
+        raise ImportFormatError("no date or value columns")
+
+    return reader, mapping
+
+
+def _normalize_header(name: str) -> str:
+    name = re.sub(r"\(.*?\)|\[.*?\]", "", name.lower())
+    return " ".join(re.sub(r"[^\w\s]", " ", name).split())
+
+
+def _map_columns(header: List[str]) -> Dict[str, int]:
+    """Map known fields to column indexes; "weight_lb" marks a pound-based column."""
+    mapping: Dict[str, int] = {}
+    for index, raw_name in enumerate(header):
+        name = _normalize_header(raw_name)
+        for field_name, aliases in COLUMN_ALIASES.items():
+            if name in aliases and field_name not in mapping:
+                mapping[field_name] = index
+                if field_name == "weight" and "lb" in raw_name.lower():
+                    mapping["weight_lb"] = index
+                break
+    return mapping
+
+
+def _parse_batch(
+    reader: Iterator[List[str]], mapping: Dict[str, int], size: int
+) -> _ParsedBatch:
+    batch = _ParsedBatch()
+
+    for row in itertools.islice(reader, size):
+        batch.rows_read += 1
+        if not _parse_row(row, mapping, batch):
+            batch.rows_skipped += 1
+
+    return batch
+
+
+def _parse_row(row: List[str], mapping: Dict[str, int], batch: _ParsedBatch) -> bool:
+    """Add the row's values to the batch. Returns False if nothing usable was found."""
+
+    def cell(field_name: str) -> Optional[str]:
+        index = mapping.get(field_name)
+        if index is None or index >= len(row):
+            return None
+        value = row[index].strip()
+        return value or None
+
+    entry_date = parse_date(cell("date"))
+    if entry_date is None:
+        return False
+
+    used = False
+
+    calories = _parse_number(cell("calories"))
+    if calories is not None and 0 < calories <= 10000:
+        description = cell("description")
+        batch.calorie_rows.append(
+            {
+                "entry_date": entry_date,
+                "calories": int(calories),
+                "description": description[:255] if description else None,
+                "source": IMPORT_SOURCE,
+            }
+        )
+        used = True
+
+    weight = _parse_number(cell("weight"))
+    if weight is not None and "weight_lb" in mapping:
+        weight = (weight * LB_TO_KG).quantize(Decimal("0.01"))
+    if weight is not None and not 30 <= weight <= 300:
+        weight = None
+
+    water = _parse_number(cell("water"))
+    if water is not None:
+        water = water * 1000 if water <= 10 else water
+        water = int(water) if 0 < water <= 10000 else None
+
+    sleep = _parse_number(cell("sleep"))
+    if sleep is not None and not 0 < sleep <= 24:
+        sleep = None
+
+    if weight is not None or water is not None or sleep is not None:
+        daily = batch.daily_rows.setdefault(
+            entry_date,
+            {"log_date": entry_date, "weight_kg": None, "water_ml": None, "sleep_hours": None},
+        )
+        daily["weight_kg"] = weight if weight is not None else daily["weight_kg"]
+        daily["water_ml"] = water if water is not None else daily["water_ml"]
+        daily["sleep_hours"] = sleep if sleep is not None else daily["sleep_hours"]
+        used = True
+
+    workout_name = cell("workout_type")
+    duration = _parse_number(cell("duration"))
+    burned = _parse_number(cell("calories_burned"))
+    if workout_name or (duration is not None and duration > 0):
+        batch.workout_rows.append(
+            {
+                "workout_date": entry_date,
+                "workout_type": guess_workout_type(workout_name),
+                "duration_min": int(duration) if duration and 0 < duration <= 480 else None,
+                "calories_burned": int(burned) if burned and 0 < burned <= 5000 else None,
+                "notes": workout_name[:255] if workout_name else None,
+            }
+        )
+        used = True
+
+    return used
+
+
+def parse_date(value: Optional[str]) -> Optional[date]:
+    """Parse a date in one of the formats used by popular trackers."""
+    if not value:
+        return None
+
+    value = value.split("T")[0].split(" ")[0]
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _parse_number(value: Optional[str]) -> Optional[Decimal]:
+    if not value:
+        return None
+
+    cleaned = re.sub(r"[^\d.,\-]", "", value)
+    if "," in cleaned and "." in cleaned:
+        # The later separator is the decimal one: "1,234.5" or "1.234,5"
+        thousands = "," if cleaned.rfind(",") < cleaned.rfind(".") else "."
+        cleaned = cleaned.replace(thousands, "").replace(",", ".")
+    elif re.fullmatch(r"-?\d{1,3}(,\d{3})+", cleaned):
+        # Digits grouped in threes: "1,234" kcal, not 1.234
+        cleaned = cleaned.replace(",", "")
+    else:
+        cleaned = cleaned.replace(",", ".")
+    try:
+        return Decimal(cleaned)
+    except InvalidOperation:
+        return None
+
+
+def guess_workout_type(name: Optional[str]) -> str:
+    """Map a free-form activity name onto the bot's workout types."""
+    if not name:
+        return "other"
+
+    name = name.lower()
+    if any(word in name for word in ("walk", "hik", "ходьб", "прогулк")):
+        return "walking"
+    if any(
+        word in name
+        for word in ("run", "cycl", "bike", "swim", "row", "cardio", "бег", "вело", "плав", "кардио")
+    ):
+        return "cardio"
+    if any(
+        word in name
+        for word in ("strength", "weight", "gym", "lift", "зал", "силов", "штанг")
+    ):
+        return "gym"
+    return "other"
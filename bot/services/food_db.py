@@ -0,0 +1,267 @@
+import asyncio
+import csv
+import gzip
+import logging
+import os
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, TextIO, Tuple
+
+from bot.config import config
+
+logger = logging.getLogger(__name__)
+
+SEED_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "data",
+    "foods_seed.csv",
+)
+
+BATCH_SIZE = 5000
+# Matches considered for ranking; rows are stored most popular first
+CANDIDATE_LIMIT = 200
+
+# Open Food Facts column names, in order of preference
+NAME_COLUMNS = ("product_name_ru", "product_name", "generic_name", "name")
+KCAL_COLUMNS = ("energy-kcal_100g", "kcal_100g", "kcal")
+KJ_COLUMNS = ("energy_100g", "energy-kj_100g")
+PROTEIN_COLUMNS = ("proteins_100g", "protein_100g")
+FAT_COLUMNS = ("fat_100g",)
+CARBS_COLUMNS = ("carbohydrates_100g", "carbs_100g")
+POPULARITY_COLUMNS = ("unique_scans_n", "popularity_key")
+
+SCHEMA = """
+CREATE TABLE raw_foods (
+    name TEXT NOT NULL,
+    search_name TEXT NOT NULL,
+    kcal_100g REAL NOT NULL,
+    protein_100g REAL,
+    fat_100g REAL,
+    carbs_100g REAL,
+    popularity INTEGER NOT NULL
+);
+CREATE TABLE foods (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    search_name TEXT NOT NULL,
+    kcal_100g REAL NOT NULL,
+    protein_100g REAL,
+    fat_100g REAL,
+    carbs_100g REAL,
+    popularity INTEGER NOT NULL DEFAULT 0
+);
+CREATE VIRTUAL TABLE foods_fts USING fts5(
+    search_name,
+    content='foods',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3 4'
+);
+"""
+
+# One row per distinct name, most scanned first, so rowid order is popularity order
+DEDUPLICATE_SQL = """
+INSERT INTO foods (name, search_name, kcal_100g, protein_100g, fat_100g, carbs_100g, popularity)
+SELECT name, search_name, kcal_100g, protein_100g, fat_100g, carbs_100g, MAX(popularity)
+FROM raw_foods
+GROUP BY search_name
+ORDER BY MAX(popularity) DESC, length(search_name)
+"""
+
+# Scoring every match with bm25 is linear in the number of hits, which is tens of
+# thousands for "сыр" on a full dump; rank a bounded set of the most popular instead
+SEARCH_SQL = f"""
+SELECT name, kcal_100g, protein_100g, fat_100g, carbs_100g
+FROM foods
+WHERE id IN (
+    SELECT rowid FROM foods_fts WHERE foods_fts MATCH ? ORDER BY rowid LIMIT {CANDIDATE_LIMIT}
+)
+ORDER BY popularity DESC, length(search_name), id
+LIMIT ?
+"""
+
+_RUSSIAN_ENDING_RE = re.compile(r"(?<=\w{3})[аеёиоуыэюяйь]{1,2}$")
+
+_connection: Optional[sqlite3.Connection] = None
+_lock = threading.Lock()
+
+
+@dataclass
+class FoodItem:
+    name: str
+    kcal_100g: float
+    protein_100g: Optional[float] = None
+    fat_100g: Optional[float] = None
+    carbs_100g: Optional[float] = None
+
+    def calories_for(self, grams: float) -> int:
+        return int(round(self.kcal_100g * grams / 100))
+
+
+async def find_food(query: str) -> Optional[FoodItem]:
+    """Best local match for a food name, or None."""
+    foods = await asyncio.to_thread(search_foods, query, 1)
+    return foods[0] if foods else None
+
+
+def search_foods(query: str, limit: int = 5) -> List[FoodItem]:
+    """
+    Ranked full-text search over the local food database.
+
+    Popular and shorter (more generic) names rank first. Tries exact words first, then stem prefixes ("гречку" finds "Гречка варёная"),
+    then any single stem, and returns the first tier that matches.
+    """
+    words = re.findall(r"[^\W\d_]{2,}", _normalize(query))
+    if not words:
+        return []
+
+    stems = [f'"{_RUSSIAN_ENDING_RE.sub("", word)}"*' for word in words]
+    tiers = [" AND ".join(f'"{word}"' for word in words), " AND ".join(stems)]
+    if len(stems) > 1:
+        tiers.append(" OR ".join(stems))
+
+    rows = []
+    with _lock:
+        connection = _get_connection()
+        for match in tiers:
+            rows = connection.execute(SEARCH_SQL, (match, limit)).fetchall()
+            if rows:
+                break
+
+    return [FoodItem(*row) for row in rows]
+
+
+def build_food_db(source_path: str, db_path: str) -> int:
+    """
+    Build the FTS5 food database from an Open Food Facts-style CSV/TSV dump.
+
+    The dump is streamed in batches into a temporary file which then atomically
+    replaces the old database. Returns the number of distinct foods loaded.
+    """
+    tmp_path = f"{db_path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+    connection = sqlite3.connect(tmp_path)
+    loaded = 0
+    try:
+        connection.execute("PRAGMA journal_mode = OFF")
+        connection.execute("PRAGMA synchronous = OFF")
+        connection.executescript(SCHEMA)
+
+        with _open_dump(source_path) as handle:
+            batch: List[Tuple] = []
+            for row in _iter_foods(handle):
+                batch.append(row)
+                if len(batch) >= BATCH_SIZE:
+                    loaded += _insert_batch(connection, batch)
+                    batch = []
+            loaded += _insert_batch(connection, batch)
+
+        connection.execute(DEDUPLICATE_SQL)
+        connection.execute("DROP TABLE raw_foods")
+        connection.execute("INSERT INTO foods_fts(foods_fts) VALUES ('rebuild')")
+        connection.execute("INSERT INTO foods_fts(foods_fts) VALUES ('optimize')")
+        connection.commit()
+        loaded = connection.execute("SELECT count(*) FROM foods").fetchone()[0]
+        connection.execute("VACUUM")
+    finally:
+        connection.close()
+
+    os.replace(tmp_path, db_path)
+    logger.info(f"Food database {db_path} built with {loaded} foods")
+    return loaded
+
+
+def _get_connection() -> sqlite3.Connection:
+    global _connection
+    if _connection is None:
+        path = config.food_db.path
+        if not os.path.exists(path):
+            logger.info(f"Food database {path} not found, building from seed")
+            build_food_db(SEED_PATH, path)
+        _connection = sqlite3.connect(
+            f"file:{os.path.abspath(path)}?mode=ro", uri=True, check_same_thread=False
+        )
+    return _connection
+
+
+def _normalize(text: str) -> str:
+    # unicode61 does not fold ё, so both the index and queries use е
+    return text.lower().replace("ё", "е")
+
+
+def _open_dump(path: str) -> TextIO:
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace", newline="")
+    return open(path, encoding="utf-8-sig", errors="replace", newline="")
+
+
+def _iter_foods(handle: TextIO) -> Iterator[Tuple]:
+    # Open Food Facts rows carry huge ingredient/tag fields
+    csv.field_size_limit(2**31 - 1)
+
+    first_line = handle.readline()
+    delimiter = "\t" if "\t" in first_line else ","
+    header = next(csv.reader([first_line], delimiter=delimiter))
+    columns = {name.strip(): index for index, name in enumerate(header)}
+
+    def pick(row: List[str], names: Tuple[str, ...]) -> Optional[str]:
+        for name in names:
+            index = columns.get(name)
+            if index is not None and index < len(row) and row[index].strip():
+                return row[index].strip()
+        return None
+
+    reader = csv.reader(handle, delimiter=delimiter, quoting=_quoting(delimiter))
+    for row in reader:
+        name = pick(row, NAME_COLUMNS)
+        if not name or len(name) > 200:
+            continue
+
+        kcal = _to_float(pick(row, KCAL_COLUMNS))
+        if kcal is None:
+            kj = _to_float(pick(row, KJ_COLUMNS))
+            kcal = kj / 4.184 if kj is not None else None
+        if kcal is None or not 0 <= kcal <= 900:
+            continue
+
+        name = " ".join(name.split())
+        yield (
+            name,
+            _normalize(name),
+            round(kcal, 1),
+            _to_float(pick(row, PROTEIN_COLUMNS)),
+            _to_float(pick(row, FAT_COLUMNS)),
+            _to_float(pick(row, CARBS_COLUMNS)),
+            int(_to_float(pick(row, POPULARITY_COLUMNS)) or 0),
+        )
+
+
+def _quoting(delimiter: str) -> int:
+    # The official TSV dump is unquoted and contains stray quote characters
+    return csv.QUOTE_NONE if delimiter == "\t" else csv.QUOTE_MINIMAL
+
+
+def _insert_batch(connection: sqlite3.Connection, batch: List[Tuple]) -> int:
+    if not batch:
+        return 0
+    connection.executemany(
+        "INSERT INTO raw_foods "
+        "(name, search_name, kcal_100g, protein_100g, fat_100g, carbs_100g, popularity) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        batch,
+    )
+    return len(batch)
+
+
+def _to_float(value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return float(value.replace(",", "."))
+    except ValueError:
+        return None
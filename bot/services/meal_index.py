@@ -0,0 +1,147 @@
+import heapq
+import logging
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Set
+
+from bot.db.database import async_session
+from bot.db import crud
+from bot.db.models import CalorieEntry
+
+logger = logging.getLogger(__name__)
+
+HISTORY_DAYS = 365
+HALF_LIFE_DAYS = 30
+MAX_PREFIX_LEN = 8
+MAX_CACHED_USERS = 500
+
+# Scores are stored relative to a fixed day so they never need re-decaying
+_SCORE_EPOCH = date(2024, 1, 1)
+
+_WORD_RE = re.compile(r"\w+")
+
+
+@dataclass
+class MealSuggestion:
+    entry_id: int
+    description: str
+    calories: int
+    count: int
+    last_date: date
+    score: float
+
+
+class MealIndex:
+    """
+    Prefix index over one user's past meal descriptions.
+
+    Every logged occurrence adds 2 ** (days since epoch / half-life) to the meal's
+    score, which ranks meals by frequency with exponential recency decay without
+    ever recomputing old scores. Re-logging uses the calories of the latest entry.
+    """
+
+    def __init__(self):
+        self._meals: Dict[str, MealSuggestion] = {}
+        self._prefixes: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._meals)
+
+    def add(self, entry_id: int, description: str, calories: int, entry_date: date) -> None:
+        key = _normalize(description)
+        if not key:
+            return
+
+        weight = 2 ** ((entry_date - _SCORE_EPOCH).days / HALF_LIFE_DAYS)
+        meal = self._meals.get(key)
+        if meal is None:
+            self._meals[key] = MealSuggestion(
+                entry_id=entry_id,
+                description=description,
+                calories=calories,
+                count=1,
+                last_date=entry_date,
+                score=weight,
+            )
+            for word in key.split():
+                for length in range(1, min(len(word), MAX_PREFIX_LEN) + 1):
+                    self._prefixes.setdefault(word[:length], set()).add(key)
+            return
+
+        meal.count += 1
+        meal.score += weight
+        if entry_id >= meal.entry_id:
+            meal.entry_id = entry_id
+            meal.description = description
+            meal.calories = calories
+            meal.last_date = max(meal.last_date, entry_date)
+
+    def top(self, limit: int = 6) -> List[MealSuggestion]:
+        return heapq.nlargest(limit, self._meals.values(), key=_score)
+
+    def search(self, query: str, limit: int = 6) -> List[MealSuggestion]:
+        """Meals having a word that starts with each word of the query."""
+        words = _normalize(query).split()
+        if not words:
+            return []
+
+        candidates: Optional[Set[str]] = None
+        for word in sorted(words, key=len, reverse=True):
+            keys = self._prefixes.get(word[:MAX_PREFIX_LEN], set())
+            if len(word) > MAX_PREFIX_LEN:
+                keys = {
+                    key for key in keys if any(w.startswith(word) for w in key.split())
+                }
+            candidates = keys if candidates is None else candidates & keys
+            if not candidates:
+                return []
+
+        return heapq.nlargest(limit, (self._meals[key] for key in candidates), key=_score)
+
+
+_indexes: "OrderedDict[int, MealIndex]" = OrderedDict()
+
+
+async def get_meal_index(user_id: int) -> MealIndex:
+    """Return the user's index, loading it on first use and evicting the least recent."""
+    index = _indexes.get(user_id)
+    if index is not None:
+        _indexes.move_to_end(user_id)
+        return index
+
+    since = date.today() - timedelta(days=HISTORY_DAYS)
+    async with async_session() as session:
+        history = await crud.get_meal_history(session, user_id, since)
+
+    index = MealIndex()
+    for entry_id, description, calories, entry_date in history:
+        index.add(entry_id, description, calories, entry_date)
+
+    _indexes[user_id] = index
+    while len(_indexes) > MAX_CACHED_USERS:
+        _indexes.popitem(last=False)
+
+    logger.debug(f"Loaded meal index for user {user_id}: {len(index)} meals")
+    return index
+
+
+def remember_meal(entry: CalorieEntry) -> None:
+    """Add a freshly logged entry to the user's index if it is loaded."""
+    index = _indexes.get(entry.user_id)
+    if index is not None and entry.description:
+        index.add(entry.id, entry.description, entry.calories, entry.entry_date)
+
+
+def forget_meals(user_id: int) -> None:
+    """Drop the user's index, e.g. after a bulk import."""
+    _indexes.pop(user_id, None)
+
+
+def _score(meal: MealSuggestion) -> float:
+    return meal.score
+
+
+def _normalize(text: str) -> str:
+    return " ".join(_WORD_RE.findall(text.lower().replace("ё", "е")))
@@ -0,0 +1,189 @@
+import re
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from typing import Optional
+
+_NUM = r"(?P<num>\d+(?:[.,]\d+)?)"
+
+_CALORIES_RE = re.compile(
+    r"^(?:(?P<before>.+?)\s+)?(?P<num>\d+)\s*(?:ккал|кал|kcal|cal)\.?(?:\s+(?P<after>.+))?$",
+    re.IGNORECASE,
+)
+_CALORIES_PREFIX_RE = re.compile(
+    r"^(?:ккал|калории|kcal)\s*:?\s*(?P<num>\d+)(?:\s+(?P<after>.+))?$",
+    re.IGNORECASE,
+)
+_WEIGHT_RE = re.compile(rf"^(?:вес|weight)\s*:?\s*{_NUM}\s*(?:кг|kg)?$", re.IGNORECASE)
+_WEIGHT_SUFFIX_RE = re.compile(rf"^{_NUM}\s*(?:кг|kg)$", re.IGNORECASE)
+_WATER_RE = re.compile(
+    rf"^(?:вода|water)\s*:?\s*{_NUM}\s*(?P<unit>мл|ml|л|l)?$", re.IGNORECASE
+)
+_SLEEP_RE = re.compile(
+    rf"^(?:сон|sleep)\s*:?\s*{_NUM}\s*(?:ч|час|часа|часов|h)?$", re.IGNORECASE
+)
+_STRENGTH_RE = re.compile(
+    rf"^(?P<name>\D.*?)\s+{_NUM}\s*(?:кг|kg)?\s*[xх×*]\s*(?P<reps>\d+)"
+    r"(?:\s*[xх×*]\s*(?P<sets>\d+))?$",
+    re.IGNORECASE,
+)
+_FOOD_RE = re.compile(
+    rf"^(?P<name>\D.*?)\s*{_NUM}\s*(?:г|гр|грамм|граммов|g)\.?$", re.IGNORECASE
+)
+_FOOD_PREFIX_RE = re.compile(
+    rf"^{_NUM}\s*(?:г|гр|грамм|граммов|g)\.?\s+(?P<name>\D.*)$", re.IGNORECASE
+)
+
+
+@dataclass
+class QuickEntry:
+    kind: str
+    value: Decimal
+    description: Optional[str] = None
+    reps: Optional[int] = None
+    sets: Optional[int] = None
+
+
+def parse_quick_entry(text: Optional[str]) -> Optional[QuickEntry]:
+    """
+    Parse a free-form single-message log entry.
+
+    Supported: "2000 ккал обед", "вес 81.4", "вода 2л", "сон 7.5", "жим 100x5x3",
+    "гречка 200г" (food looked up in the local food database).
+    Returns None if the text is not a recognised entry or the value is out of range.
+    """
+    if not text:
+        return None
+
+    normalized = " ".join(text.split())
+    if not normalized or len(normalized) > 200:
+        return None
+
+    for parser in (
+        _parse_weight,
+        _parse_water,
+        _parse_sleep,
+        _parse_calories,
+        _parse_strength,
+        _parse_food,
+    ):
+        entry = parser(normalized)
+        if entry is not None:
+            return entry
+
+    return None
+
+
+def _to_decimal(raw: str) -> Optional[Decimal]:
+    try:
+        return Decimal(raw.replace(",", "."))
+    except InvalidOperation:
+        return None
+
+
+def _parse_weight(text: str) -> Optional[QuickEntry]:
+    match = _WEIGHT_RE.match(text) or _WEIGHT_SUFFIX_RE.match(text)
+    if not match:
+        return None
+
+    weight = _to_decimal(match.group("num"))
+    if weight is None or not 30 <= weight <= 300:
+        return None
+
+    return QuickEntry(kind="weight", value=weight)
+
+
+def _parse_water(text: str) -> Optional[QuickEntry]:
+    match = _WATER_RE.match(text)
+    if not match:
+        return None
+
+    amount = _to_decimal(match.group("num"))
+    if amount is None:
+        return None
+
+    unit = (match.group("unit") or "").lower() or None
+    # Without a unit, small or fractional amounts are litres ("вода 2", "вода 1.5"),
+    # whole amounts from 20 up are ml ("вода 500"); more than 10 l is then rejected
+    if unit in ("л", "l") or (
+        unit is None and (amount < 20 or amount != amount.to_integral_value())
+    ):
+        amount *= 1000
+
+    water_ml = int(amount)
+    if not 0 <= water_ml <= 10000:
+        return None
+
+    return QuickEntry(kind="water", value=Decimal(water_ml))
+
+
+def _parse_sleep(text: str) -> Optional[QuickEntry]:
+    match = _SLEEP_RE.match(text)
+    if not match:
+        return None
+
+    hours = _to_decimal(match.group("num"))
+    if hours is None or not 0 <= hours <= 24:
+        return None
+
+    return QuickEntry(kind="sleep", value=hours)
+
+
+def _parse_calories(text: str) -> Optional[QuickEntry]:
+    match = _CALORIES_RE.match(text) or _CALORIES_PREFIX_RE.match(text)
+    if not match:
+        return None
+
+    calories = int(match.group("num"))
+    if not 0 <= calories <= 10000:
+        return None
+
+    parts = [
+        part
+        for part in (match.groupdict().get("before"), match.groupdict().get("after"))
+        if part
+    ]
+    description = " ".join(parts)[:255] or None
+
+    return QuickEntry(kind="calories", value=Decimal(calories), description=description)
+
+
+def _parse_strength(text: str) -> Optional[QuickEntry]:
+    match = _STRENGTH_RE.match(text)
+    if not match:
+        return None
+
+    weight = _to_decimal(match.group("num"))
+    reps = int(match.group("reps"))
+    sets = int(match.group("sets")) if match.group("sets") else 1
+    name = match.group("name").strip()
+
+    if weight is None or not 0 <= weight <= 500:
+        return None
+    if not 1 <= reps <= 100 or not 1 <= sets <= 50:
+        return None
+    if len(name) > 100:
+        return None
+
+    return QuickEntry(
+        kind="strength",
+        value=weight,
+        description=name,
+        reps=reps,
+        sets=sets,
+    )
+
+
+def _parse_food(text: str) -> Optional[QuickEntry]:
+    match = _FOOD_RE.match(text) or _FOOD_PREFIX_RE.match(text)
+    if not match:
+        return None
+
+    grams = _to_decimal(match.group("num"))
+    name = match.group("name").strip()
+
+    if grams is None or not 1 <= grams <= 3000:
+        return None
+    if len(name) < 2 or len(name) > 100:
+        return None
+
+    return QuickEntry(kind="food", value=grams, description=name)
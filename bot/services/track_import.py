@@ -0,0 +1,364 @@
+import asyncio
+import logging
+import xml.etree.ElementTree as ET
+from array import array
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from bot.config import config
+from bot.db.database import async_session
+from bot.db import crud
+from bot.db.models import Workout
+from bot.services.calculator import estimate_calories_burned
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_M = 6371008.8
+# Slower than this between two points counts as standing still
+MOVING_SPEED_MPS = 0.5
+# Longer gaps between points are pauses even if the position changed
+MAX_MOVING_GAP_SEC = 120
+SUMMARY_POINTS = 100
+
+SPORT_TYPES = {
+    "running": "cardio",
+    "run": "cardio",
+    "biking": "cardio",
+    "cycling": "cardio",
+    "ride": "cardio",
+    "swimming": "cardio",
+    "walking": "walking",
+    "walk": "walking",
+    "hiking": "walking",
+}
+
+# Rough MET values used when the file has no calorie data
+WALKING_MET = Decimal("3.5")
+CYCLING_MET = Decimal("8.0")
+
+
+class TrackFormatError(ValueError):
+    """Raised when a file has no usable timed track points."""
+
+
+class DuplicateTrackError(ValueError):
+    """Raised when the track's workout is already stored."""
+
+
+@dataclass
+class TrackData:
+    lats: np.ndarray
+    lons: np.ndarray
+    times: np.ndarray
+    elevations: Optional[np.ndarray]
+    heart_rates: Optional[np.ndarray]
+    sport: Optional[str]
+    calories: Optional[int]
+
+
+@dataclass
+class TrackMetrics:
+    start_time: datetime
+    duration_sec: int
+    moving_time_sec: int
+    distance_m: int
+    avg_pace_sec_per_km: Optional[int]
+    avg_speed_kmh: float
+    elevation_gain_m: Optional[int]
+    avg_heart_rate: Optional[int]
+    points_count: int
+    polyline: str
+    workout_type: str
+    calories: Optional[int]
+
+
+async def import_track(path: str, user_id: int) -> Tuple[Workout, TrackMetrics]:
+    """Parse a GPX/TCX file in a worker thread and store it as a workout with a track."""
+    metrics = await asyncio.to_thread(_load_metrics, path)
+    duration_min = round(metrics.duration_sec / 60)
+    if not 1 <= duration_min <= 480:
+        duration_min = None
+
+    async with async_session() as session:
+        existing = await crud.find_workout(
+            session, user_id, metrics.start_time.date(), metrics.workout_type, duration_min
+        )
+        if existing:
+            raise DuplicateTrackError(f"workout {existing.id} already stored")
+
+        calories = metrics.calories
+        if calories is None:
+            profile = await crud.get_profile(session, user_id)
+            if profile and profile.current_weight_kg:
+                calories = estimate_calories_burned(
+                    _estimate_met(metrics),
+                    profile.current_weight_kg,
+                    round(metrics.duration_sec / 60),
+                )
+
+        workout = await crud.create_workout(
+            session,
+            user_id,
+            metrics.start_time.date(),
+            workout_type=metrics.workout_type,
+            duration_min=duration_min,
+            calories_burned=calories if calories and 0 < calories <= 5000 else None,
+            notes=f"Трек {metrics.distance_m / 1000:.2f} км",
+        )
+        await crud.create_workout_track(
+            session,
+            workout.id,
+            distance_m=metrics.distance_m,
+            moving_time_sec=metrics.moving_time_sec,
+            points_count=metrics.points_count,
+            avg_pace_sec_per_km=metrics.avg_pace_sec_per_km,
+            elevation_gain_m=metrics.elevation_gain_m,
+            avg_heart_rate=metrics.avg_heart_rate,
+            polyline=metrics.polyline,
+        )
+
+    metrics.calories = workout.calories_burned
+    return workout, metrics
+
+
+def _load_metrics(path: str) -> TrackMetrics:
+    return compute_track_metrics(parse_track(path))
+
+
+def parse_track(path: str) -> TrackData:
+    """Stream track points out of a GPX or TCX file without building the whole tree."""
+    lats = array("d")
+    lons = array("d")
+    times = array("d")
+    elevations = array("d")
+    heart_rates = array("d")
+    sport = None
+    calories = 0
+    has_calories = False
+
+    stack: List[ET.Element] = []
+    for event, elem in ET.iterparse(path, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            continue
+        stack.pop()
+
+        tag = _local_name(elem.tag)
+        if tag in ("trkpt", "Trackpoint"):
+            point = _parse_gpx_point(elem) if tag == "trkpt" else _parse_tcx_point(elem)
+            if point is not None:
+                lat, lon, timestamp, elevation, heart_rate = point
+                lats.append(lat)
+                lons.append(lon)
+                times.append(timestamp)
+                elevations.append(elevation)
+                heart_rates.append(heart_rate)
+        elif tag == "Calories" and stack and _local_name(stack[-1].tag) == "Lap":
+            try:
+                calories += int(float(elem.text or 0))
+                has_calories = True
+            except ValueError:
+                pass
+            continue
+        elif tag == "Activity" and elem.get("Sport"):
+            sport = elem.get("Sport")
+        elif tag == "type" and stack and _local_name(stack[-1].tag) == "trk":
+            sport = (elem.text or "").strip() or sport
+            continue
+        else:
+            continue
+
+        # Points are consumed, drop them from the tree to keep memory flat
+        elem.clear()
+        if stack:
+            stack[-1].remove(elem)
+
+    if len(times) < 2:
+        raise TrackFormatError("not enough timed track points")
+
+    elevation_array = np.frombuffer(elevations, dtype=np.float64)
+    heart_rate_array = np.frombuffer(heart_rates, dtype=np.float64)
+
+    return TrackData(
+        lats=np.frombuffer(lats, dtype=np.float64),
+        lons=np.frombuffer(lons, dtype=np.float64),
+        times=np.frombuffer(times, dtype=np.float64),
+        elevations=elevation_array if not np.isnan(elevation_array).all() else None,
+        heart_rates=heart_rate_array if not np.isnan(heart_rate_array).all() else None,
+        sport=sport,
+        calories=calories if has_calories and calories > 0 else None,
+    )
+
+
+def compute_track_metrics(track: TrackData) -> TrackMetrics:
+    """Compute distance, moving time, pace and a downsampled polyline with NumPy."""
+    order = np.argsort(track.times, kind="stable")
+    lat = np.radians(track.lats[order])
+    lon = np.radians(track.lons[order])
+    times = track.times[order]
+
+    dlat = np.diff(lat)
+    dlon = np.diff(lon)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(dlon / 2) ** 2
+    segments = 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+    dt = np.diff(times)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        speeds = np.where(dt > 0, segments / dt, 0)
+    moving = (speeds > MOVING_SPEED_MPS) & (dt <= MAX_MOVING_GAP_SEC)
+
+    distance = float(segments.sum())
+    moving_time = float(dt[moving].sum())
+    duration = float(times[-1] - times[0])
+
+    avg_pace = int(moving_time / (distance / 1000)) if distance >= 100 and moving_time > 0 else None
+    avg_speed_kmh = distance / moving_time * 3.6 if moving_time > 0 else 0.0
+
+    elevation_gain = None
+    if track.elevations is not None:
+        elevations = track.elevations[order]
+        elevations = elevations[~np.isnan(elevations)]
+        if len(elevations) >= 2:
+            window = min(5, len(elevations))
+            smoothed = np.convolve(elevations, np.ones(window) / window, mode="valid")
+            rises = np.diff(smoothed)
+            elevation_gain = int(rises[rises > 0].sum())
+
+    avg_heart_rate = None
+    if track.heart_rates is not None:
+        heart_rates = track.heart_rates[~np.isnan(track.heart_rates)]
+        if len(heart_rates):
+            avg_heart_rate = int(heart_rates.mean())
+
+    return TrackMetrics(
+        start_time=datetime.fromtimestamp(times[0], ZoneInfo(config.timezone)),
+        duration_sec=int(duration),
+        moving_time_sec=int(moving_time),
+        distance_m=int(distance),
+        avg_pace_sec_per_km=avg_pace,
+        avg_speed_kmh=avg_speed_kmh,
+        elevation_gain_m=elevation_gain,
+        avg_heart_rate=avg_heart_rate,
+        points_count=len(times),
+        polyline=encode_polyline(*_downsample(track.lats[order], track.lons[order], segments)),
+        workout_type=_workout_type(track.sport, avg_speed_kmh),
+        calories=track.calories,
+    )
+
+
+def _downsample(
+    lats: np.ndarray, lons: np.ndarray, segments: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Pick points evenly spaced by distance along the track."""
+    if len(lats) <= SUMMARY_POINTS:
+        return lats, lons
+
+    cumulative = np.concatenate(([0.0], np.cumsum(segments)))
+    targets = np.linspace(0, cumulative[-1], SUMMARY_POINTS)
+    indexes = np.unique(np.searchsorted(cumulative, targets).clip(0, len(lats) - 1))
+    return lats[indexes], lons[indexes]
+
+
+def encode_polyline(lats: np.ndarray, lons: np.ndarray) -> str:
+    """Encode coordinates in Google's encoded polyline format (1e-5 precision)."""
+    points = np.round(np.column_stack((lats, lons)) * 1e5).astype(np.int64)
+    deltas = np.diff(points, axis=0, prepend=[[0, 0]])
+
+    chunks = []
+    for value in deltas.ravel().tolist():
+        value = ~(value << 1) if value < 0 else value << 1
+        while value >= 0x20:
+            chunks.append(chr((0x20 | (value & 0x1F)) + 63))
+            value >>= 5
+        chunks.append(chr(value + 63))
+    return "".join(chunks)
+
+
+def _workout_type(sport: Optional[str], avg_speed_kmh: float) -> str:
+    if sport:
+        mapped = SPORT_TYPES.get(sport.strip().lower())
+        if mapped:
+            return mapped
+    return "walking" if avg_speed_kmh < 7 else "cardio"
+
+
+def _estimate_met(metrics: TrackMetrics) -> Decimal:
+    if metrics.workout_type == "walking":
+        return WALKING_MET
+    if metrics.avg_speed_kmh > 16:
+        return CYCLING_MET
+    # Running costs roughly 1 MET per km/h
+    return Decimal(str(round(max(metrics.avg_speed_kmh, 6.0), 1)))
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _parse_time(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.strip().replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def _parse_gpx_point(
+    elem: ET.Element,
+) -> Optional[Tuple[float, float, float, float, float]]:
+    try:
+        lat = float(elem.get("lat"))
+        lon = float(elem.get("lon"))
+    except (TypeError, ValueError):
+        return None
+
+    timestamp = None
+    elevation = heart_rate = float("nan")
+    for child in elem.iter():
+        name = _local_name(child.tag)
+        if name == "time":
+            timestamp = _parse_time(child.text)
+        elif name == "ele":
+            elevation = _to_float(child.text)
+        elif name == "hr":
+            heart_rate = _to_float(child.text)
+
+    if timestamp is None:
+        return None
+    return lat, lon, timestamp, elevation, heart_rate
+
+
+def _parse_tcx_point(
+    elem: ET.Element,
+) -> Optional[Tuple[float, float, float, float, float]]:
+    timestamp = None
+    lat = lon = elevation = heart_rate = float("nan")
+    for child in elem.iter():
+        name = _local_name(child.tag)
+        if name == "Time":
+            timestamp = _parse_time(child.text)
+        elif name == "LatitudeDegrees":
+            lat = _to_float(child.text)
+        elif name == "LongitudeDegrees":
+            lon = _to_float(child.text)
+        elif name == "AltitudeMeters":
+            elevation = _to_float(child.text)
+        elif name == "Value":
+            heart_rate = _to_float(child.text)
+
+    if timestamp is None or np.isnan(lat) or np.isnan(lon):
+        return None
+    return lat, lon, timestamp, elevation, heart_rate
+
+
+def _to_float(value: Optional[str]) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import zlib
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
+
+from bot.db.database import async_session
+from bot.db import crud
+from bot.db.models import Settings, User
+from bot.services.analytics import get_dashboard_data, get_weekly_stats
+from bot.services.coach import get_coach_comment
+from bot.utils.formatters import format_weekly_report
+from bot.utils.plotting import create_dashboard_chart
+
+logger = logging.getLogger(__name__)
+
+# Reports are built during this window before the send time, spread evenly
+PREGENERATE_LEAD = timedelta(hours=3)
+# Leave a margin so a report is ready before the send job looks for it
+PREGENERATE_MARGIN = timedelta(minutes=15)
+KEEP_REPORTS_DAYS = 28
+
+
+@dataclass
+class WeeklyReportArtifacts:
+    text: str
+    chart_png: Optional[bytes]
+
+
+async def build_weekly_report(
+    user_id: int, use_ai: bool, end_date: Optional[date] = None
+) -> WeeklyReportArtifacts:
+    """Compute stats, coach comment and dashboard image for a weekly report."""
+    async with async_session() as session:
+        stats = await get_weekly_stats(session, user_id, end_date)
+        dashboard = await get_dashboard_data(session, user_id, days=7, end_date=end_date)
+
+    coach_comment = await get_coach_comment(stats, use_ai=use_ai)
+    chart = None
+    if dashboard.has_data:
+        chart = await asyncio.to_thread(create_dashboard_chart, dashboard)
+
+    return WeeklyReportArtifacts(
+        text=format_weekly_report(stats, coach_comment),
+        chart_png=chart,
+    )
+
+
+def next_report_time(settings: Settings, now: datetime) -> Optional[datetime]:
+    """The user's next weekly report send time within the pre-generation lead, if any."""
+    for days_ahead in (0, 1):
+        day = now.date() + timedelta(days=days_ahead)
+        if day.strftime("%A").lower() != settings.weigh_day:
+            continue
+        send_at = datetime.combine(day, settings.weekly_report_time)
+        if now <= send_at <= now + PREGENERATE_LEAD:
+            return send_at
+    return None
+
+
+def pregenerate_slot(user_id: int, send_at: datetime) -> datetime:
+    """
+    When to build the user's report.
+
+    Users are hashed evenly over [send_at - lead, send_at - margin], so reports for a
+    popular send time are built a few at a time instead of all at once.
+    """
+    window = PREGENERATE_LEAD - PREGENERATE_MARGIN
+    offset = zlib.crc32(str(user_id).encode()) % int(window.total_seconds())
+    return send_at - PREGENERATE_LEAD + timedelta(seconds=offset)
+
+
+async def pregenerate_due_reports(
+    users_with_settings: List[Tuple[User, Settings]], now: datetime
+) -> int:
+    """Build and store reports whose slot has come. Returns how many were built."""
+    due = []
+    for user, settings in users_with_settings:
+        send_at = next_report_time(settings, now)
+        if send_at is not None and pregenerate_slot(user.id, send_at) <= now:
+            due.append((user, settings, send_at.date()))
+
+    if not due:
+        return 0
+
+    report_dates = {report_date for _, _, report_date in due}
+    async with async_session() as session:
+        ready = {
+            (user_id, report_date)
+            for report_date in report_dates
+            for user_id in await crud.get_weekly_report_user_ids(session, report_date)
+        }
+
+    built = 0
+    for user, settings, report_date in due:
+        if (user.id, report_date) in ready:
+            continue
+        try:
+            artifacts = await build_weekly_report(
+                user.id, settings.use_ai_coach, end_date=report_date
+            )
+            async with async_session() as session:
+                await crud.save_weekly_report(
+                    session, user.id, report_date, artifacts.text, artifacts.chart_png
+                )
+            built += 1
+        except Exception as e:
+            logger.error(f"Failed to pre-generate weekly report for user {user.id}: {e}")
+
+    async with async_session() as session:
+        await crud.delete_weekly_reports_before(
+            session, now.date() - timedelta(days=KEEP_REPORTS_DAYS)
+        )
+
+    return built
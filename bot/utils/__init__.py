@@ -1,6 +1,8 @@
 from bot.utils.plotting import (
     create_weight_chart,
     create_exercise_progress_chart,
+    create_dashboard_chart,
+    create_activity_heatmap,
 )
 from bot.utils.formatters import (
     format_weekly_report,
@@ -12,6 +14,8 @@ from bot.utils.formatters import (
 __all__ = [
     "create_weight_chart",
     "create_exercise_progress_chart",
+    "create_dashboard_chart",
+    "create_activity_heatmap",
     "format_weekly_report",
     "format_monthly_report",
     "format_targets",
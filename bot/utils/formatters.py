@@ -1,8 +1,16 @@
-from typing import Optional
+import html
+from decimal import Decimal
+from typing import Optional, Tuple
 from bot.services.calculator import NutritionTargets
-from bot.services.analytics import WeeklyStats, MonthlyStats
+from bot.services.analytics import ActivityHeatmap, WeeklyStats, MonthlyStats
 from bot.services.alerts import Alert
 from bot.services.daily_summary import DailySummary, get_daily_recommendation, get_tomorrow_tip
+from bot.services.data_import import ImportResult
+from bot.services.track_import import TrackMetrics
+from bot.services.food_db import FoodItem
+
+# Telegram limit for photo captions, in UTF-16 code units
+CAPTION_LIMIT = 1024
 
 
 def format_targets(targets: NutritionTargets, weight_kg: float) -> str:
@@ -71,6 +79,32 @@ def format_weekly_report(stats: WeeklyStats, coach_comment: Optional[str] = None
     return "\n".join(parts)
 
 
+def split_caption(text: str, limit: int = CAPTION_LIMIT) -> Tuple[str, Optional[str]]:
+    """
+    Split a report into a photo caption and the remainder for a follow-up message.
+
+    The cut is made at the last paragraph break that fits (the coach comment is its
+    own paragraph), falling back to a line break, then a hard cut.
+    """
+    if _utf16_len(text) <= limit:
+        return text, None
+
+    head = text
+    while _utf16_len(head) > limit:
+        # A character is one or two UTF-16 units, so this never cuts past the limit
+        head = head[: -max(1, (_utf16_len(head) - limit) // 2)]
+    cut = head.rfind("\n\n")
+    if cut <= 0:
+        cut = head.rfind("\n")
+    if cut <= 0:
+        cut = len(head)
+    return text[:cut].rstrip(), text[cut:].strip() or None
+
+
+def _utf16_len(text: str) -> int:
+    return len(text.encode("utf-16-le")) // 2
+
+
 def format_monthly_report(stats: MonthlyStats) -> str:
     """Format monthly report for display."""
     parts = [
@@ -97,6 +131,21 @@ def format_monthly_report(stats: MonthlyStats) -> str:
     return "\n".join(parts)
 
 
+def format_activity_heatmap(heatmap: ActivityHeatmap) -> str:
+    """Caption for the yearly activity heatmap."""
+    total_days = (heatmap.end_date - heatmap.start_date).days + 1
+    return (
+        f"🗓 Активность за год ({heatmap.start_date.strftime('%d.%m.%Y')} - "
+        f"{heatmap.end_date.strftime('%d.%m.%Y')})\n"
+        "━━━━━━━━━━━━━━━━━━━\n"
+        f"📝 Дней с записями: {heatmap.days_logged} из {total_days}\n"
+        f"🔥 Текущая серия: {heatmap.current_streak} дн.\n"
+        f"🏆 Лучшая серия: {heatmap.longest_streak} дн.\n"
+        "━━━━━━━━━━━━━━━━━━━\n"
+        "Чем темнее клетка, тем больше записано за день: калории, тренировка, вес."
+    )
+
+
 def format_alert(alert: Alert) -> str:
     """Format alert for display."""
     icons = {
@@ -166,6 +215,14 @@ def format_daily_summary(summary: DailySummary, include_recommendation: bool = T
     return "\n".join(parts)
 
 
+def format_food_match(food: FoodItem, grams: Decimal, calories: int) -> str:
+    """Format the food database match used for a calorie entry."""
+    return (
+        f"🔎 {html.escape(food.name)}: {food.kcal_100g:g} ккал/100 г "
+        f"× {grams:g} г = {calories} ккал"
+    )
+
+
 def format_calorie_entry_response(
     calories: int,
     total_today: int,
@@ -199,6 +256,78 @@ def format_calorie_entry_response(
     return response
 
 
+def format_weight_response(weight_kg: Decimal, week_ago_weight: Optional[Decimal]) -> str:
+    """Format response after logging weight."""
+    response = f"Записал! {weight_kg:.1f} кг"
+
+    if week_ago_weight:
+        diff = weight_kg - week_ago_weight
+        response += f" ({diff:+.1f} кг за неделю)."
+
+        if Decimal("-1") <= diff <= Decimal("-0.3"):
+            response += "\nХороший темп, не торопись — мышцы скажут спасибо 💪"
+        elif diff < Decimal("-1"):
+            response += "\n⚠️ Быстро уходит. Не переусердствуй с дефицитом."
+        elif diff > Decimal("0"):
+            response += "\nНе страшно, это может быть вода. Смотрим тренд."
+    else:
+        response += "."
+
+    return response
+
+
+def format_water_response(water_ml: int) -> str:
+    """Format response after logging water."""
+    response = f"Записал! {water_ml / 1000:.1f}л воды"
+
+    if water_ml >= 2000:
+        response += " — отлично! 💧"
+    elif water_ml >= 1500:
+        response += " — неплохо, но можно больше."
+    else:
+        response += " — маловато, старайся пить больше."
+
+    return response
+
+
+def format_sleep_response(hours: float) -> str:
+    """Format response after logging sleep."""
+    response = f"Записал! {hours:.1f}ч сна"
+
+    if hours >= 7:
+        response += " — хорошо! 😴"
+    elif hours >= 6:
+        response += " — сойдёт, но лучше 7-8 часов."
+    else:
+        response += " — маловато. Сон важен для восстановления!"
+
+    return response
+
+
+def format_strength_response(
+    exercise_name: str,
+    weight_kg: Decimal,
+    reps: int,
+    sets: int,
+    e1rm: Decimal,
+    last_e1rm: Optional[Decimal] = None,
+) -> str:
+    """Format response after logging a strength set."""
+    response = (
+        f"Записал! {exercise_name}: {weight_kg}кг × {reps} × {sets}\n"
+        f"e1RM: ~{e1rm:.0f} кг"
+    )
+
+    if last_e1rm:
+        diff = e1rm - last_e1rm
+        if diff > 0:
+            response += f" (+{diff:.0f} кг к прошлому разу) 📈"
+        elif diff < 0:
+            response += f" ({diff:.0f} кг)"
+
+    return response
+
+
 def format_workout_balance_response(
     workout_name: str,
     duration: int,
@@ -282,3 +411,66 @@ def format_plan_with_formulas(
         f"• Углеводы: остаток = {targets.carbs_g}г\n"
         "  (целевые_ккал - белок×4 - жиры×9) / 4"
     )
+
+
+def format_import_progress(result: ImportResult) -> str:
+    """Format import progress status."""
+    return f"📥 Импортирую… обработано строк: {result.rows_read}"
+
+
+def format_import_result(result: ImportResult) -> str:
+    """Format import summary for display."""
+    parts = [
+        "✅ Импорт завершён!",
+        "━━━━━━━━━━━━━━━━━━━",
+        f"📄 Строк обработано: {result.rows_read}",
+        f"🍽 Записей калорий: {result.calorie_entries}",
+        f"⚖️ Дней с весом/водой/сном: {result.daily_logs}",
+        f"🏋️ Тренировок: {result.workouts}",
+    ]
+
+    if result.rows_skipped:
+        parts.append(f"⏭ Пропущено строк: {result.rows_skipped}")
+
+    parts.append("━━━━━━━━━━━━━━━━━━━")
+    parts.append("Повторный импорт того же файла не создаст дублей.")
+
+    return "\n".join(parts)
+
+
+def format_track_workout_response(metrics: TrackMetrics) -> str:
+    """Format response after importing a GPX/TCX track."""
+    workout_names = {
+        "cardio": "Кардио",
+        "walking": "Ходьба",
+    }
+    moving_min, moving_sec = divmod(metrics.moving_time_sec, 60)
+    moving_h, moving_min = divmod(moving_min, 60)
+
+    parts = [
+        f"Записал трек! {workout_names.get(metrics.workout_type, 'Тренировка')} "
+        f"{metrics.start_time.strftime('%d.%m.%Y')} 🗺",
+        "━━━━━━━━━━━━━━━━━━━",
+        f"📏 Дистанция: {metrics.distance_m / 1000:.2f} км",
+        f"⏱ В движении: {moving_h}:{moving_min:02d}:{moving_sec:02d} "
+        f"(всего {metrics.duration_sec // 60} мин)",
+    ]
+
+    if metrics.avg_pace_sec_per_km:
+        pace_min, pace_sec = divmod(metrics.avg_pace_sec_per_km, 60)
+        parts.append(
+            f"🏃 Темп: {pace_min}:{pace_sec:02d} /км ({metrics.avg_speed_kmh:.1f} км/ч)"
+        )
+
+    if metrics.elevation_gain_m:
+        parts.append(f"⛰ Набор высоты: {metrics.elevation_gain_m} м")
+
+    if metrics.avg_heart_rate:
+        parts.append(f"❤️ Средний пульс: {metrics.avg_heart_rate}")
+
+    if metrics.calories:
+        parts.append(f"🔥 ~{metrics.calories} ккал")
+
+    parts.append("━━━━━━━━━━━━━━━━━━━")
+
+    return "\n".join(parts)
@@ -0,0 +1,92 @@
+import io
+import logging
+from typing import TYPE_CHECKING, Iterator, Optional, Tuple
+
+from bot.config import config
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {"png": ".png", "webp": ".webp", "jpeg": ".jpg"}
+# Lossy quality steps tried in order until the image fits the byte budget
+QUALITY_STEPS = (85, 70, 55, 40)
+# Palette sizes tried for quantized PNG
+PALETTE_STEPS = (64, 32, 16)
+# Each further attempt shrinks the image by this factor
+DOWNSCALE = 0.75
+MIN_WIDTH = 480
+
+
+def chart_format() -> str:
+    """Configured upload format, png if it is not one of FORMATS."""
+    fmt = config.charts.format
+    if fmt not in FORMATS:
+        logger.warning(f"Unsupported chart format {fmt!r}, using png")
+        return "png"
+    return fmt
+
+
+def chart_filename(name: str) -> str:
+    """File name with the extension of the configured chart format."""
+    return f"{name}{FORMATS[chart_format()]}"
+
+
+def target_size(aspect: Tuple[float, float]) -> Tuple[int, int]:
+    """Pixel size for a chart with the given width/height aspect."""
+    width = config.charts.width_px
+    return width, int(round(width * aspect[1] / aspect[0]))
+
+
+def encode_chart(pixels) -> bytes:
+    """
+    Encode a rendered chart (height x width x 3|4 uint8) for upload.
+
+    PNG output is palette-quantized, WebP/JPEG go through descending quality steps,
+    and the image is downscaled until it fits config.charts.max_bytes. If nothing
+    fits, the smallest attempt is returned.
+    """
+    import numpy as np
+    from PIL import Image
+
+    image = Image.fromarray(np.ascontiguousarray(np.asarray(pixels)[..., :3]), "RGB")
+    fmt = chart_format()
+    budget = config.charts.max_bytes
+    smallest: Optional[bytes] = None
+
+    while True:
+        for data in _encodings(image, fmt):
+            if smallest is None or len(data) < len(smallest):
+                smallest = data
+            if len(data) <= budget:
+                return data
+
+        width, height = image.size
+        if width * DOWNSCALE < MIN_WIDTH:
+            logger.warning(f"Chart is {len(smallest)} bytes, over the {budget} byte budget")
+            return smallest
+        image = image.resize(
+            (int(width * DOWNSCALE), int(height * DOWNSCALE)), Image.Resampling.LANCZOS
+        )
+
+
+def _encodings(image: "Image.Image", fmt: str) -> Iterator[bytes]:
+    from PIL import Image
+
+    if fmt == "png":
+        for colors in PALETTE_STEPS:
+            quantized = image.quantize(
+                colors=colors, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE
+            )
+            yield _save(quantized, "PNG")
+    else:
+        pil_format = "WEBP" if fmt == "webp" else "JPEG"
+        for quality in QUALITY_STEPS:
+            yield _save(image, pil_format, quality=quality)
+
+
+def _save(image: "Image.Image", pil_format: str, **params) -> bytes:
+    buf = io.BytesIO()
+    image.save(buf, format=pil_format, **params)
+    return buf.getvalue()
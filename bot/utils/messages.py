@@ -0,0 +1,36 @@
+from typing import Optional, Union
+
+from aiogram import Bot
+from aiogram.types import BufferedInputFile, Message, ReplyKeyboardMarkup, InlineKeyboardMarkup
+
+from bot.utils.formatters import split_caption
+
+
+async def send_report(
+    bot: Bot,
+    chat_id: int,
+    text: str,
+    image: Optional[bytes],
+    filename: str,
+    reply_markup: Optional[Union[ReplyKeyboardMarkup, InlineKeyboardMarkup]] = None,
+) -> Message:
+    """
+    Send a report as one photo with the text as its caption.
+
+    Text over the caption limit continues in a follow-up message, which then carries
+    the keyboard. Without an image the text is sent as a plain message.
+    Returns the photo (or text) message.
+    """
+    if image is None:
+        return await bot.send_message(chat_id, text, reply_markup=reply_markup)
+
+    caption, rest = split_caption(text)
+    sent = await bot.send_photo(
+        chat_id,
+        BufferedInputFile(image, filename=filename),
+        caption=caption,
+        reply_markup=reply_markup if rest is None else None,
+    )
+    if rest is not None:
+        await bot.send_message(chat_id, rest, reply_markup=reply_markup)
+    return sent
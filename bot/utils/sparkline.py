@@ -0,0 +1,233 @@
+import struct
+import zlib
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+WIDTH = 800
+HEIGHT = 400
+MARGIN_LEFT = 64
+MARGIN_RIGHT = 20
+MARGIN_TOP = 20
+MARGIN_BOTTOM = 36
+
+BACKGROUND = "#FFFFFF"
+GRID_COLOR = "#E6E6E6"
+TEXT_COLOR = "#5A5A5A"
+GRID_LINES = 4
+FONT_SCALE = 2
+
+# 5x7 bitmap glyphs for axis labels
+_GLYPHS = {
+    "0": ("01110", "10001", "10011", "10101", "11001", "10001", "01110"),
+    "1": ("00100", "01100", "00100", "00100", "00100", "00100", "01110"),
+    "2": ("01110", "10001", "00001", "00010", "00100", "01000", "11111"),
+    "3": ("11110", "00001", "00001", "01110", "00001", "00001", "11110"),
+    "4": ("00010", "00110", "01010", "10010", "11111", "00010", "00010"),
+    "5": ("11111", "10000", "11110", "00001", "00001", "10001", "01110"),
+    "6": ("00110", "01000", "10000", "11110", "10001", "10001", "01110"),
+    "7": ("11111", "00001", "00010", "00100", "01000", "01000", "01000"),
+    "8": ("01110", "10001", "10001", "01110", "10001", "10001", "01110"),
+    "9": ("01110", "10001", "10001", "01111", "00001", "00010", "01100"),
+    ".": ("00000", "00000", "00000", "00000", "00000", "01100", "01100"),
+    "-": ("00000", "00000", "00000", "11111", "00000", "00000", "00000"),
+    " ": ("00000",) * 7,
+}
+_GLYPH_MASKS = {
+    char: np.array([[bit == "1" for bit in row] for row in rows], dtype=bool)
+    for char, rows in _GLYPHS.items()
+}
+
+
+@dataclass
+class LineSeries:
+    values: Sequence[float]
+    color: str
+    width: float = 2.0
+    markers: bool = False
+    opacity: float = 1.0
+
+
+def render_line_chart(
+    x: Sequence[float],
+    series: List[LineSeries],
+    x_labels: Tuple[str, str] = ("", ""),
+    y_padding: float = 0.0,
+    width: int = WIDTH,
+    height: int = HEIGHT,
+) -> bytes:
+    """Rasterize a simple multi-line chart straight into PNG bytes."""
+    return encode_png(rasterize_line_chart(x, series, x_labels, y_padding, width, height))
+
+
+def rasterize_line_chart(
+    x: Sequence[float],
+    series: List[LineSeries],
+    x_labels: Tuple[str, str] = ("", ""),
+    y_padding: float = 0.0,
+    width: int = WIDTH,
+    height: int = HEIGHT,
+) -> np.ndarray:
+    """
+    Rasterize a simple multi-line chart into an RGB uint8 array.
+
+    Lines and markers are anti-aliased with a distance field per segment, the grid
+    gets numeric labels from a tiny bitmap font. Meant for small series (tens of
+    points) where a full matplotlib figure is overkill.
+    """
+    canvas = np.empty((height, width, 3), dtype=np.float32)
+    canvas[:] = _rgb(BACKGROUND)
+
+    xs = np.asarray(x, dtype=np.float64)
+    all_values = np.concatenate([np.asarray(s.values, dtype=np.float64) for s in series])
+    y_min = float(all_values.min()) - y_padding
+    y_max = float(all_values.max()) + y_padding
+    if y_max - y_min < 1e-9:
+        y_min, y_max = y_min - 1, y_max + 1
+    x_min, x_max = float(xs.min()), float(xs.max())
+    if x_max - x_min < 1e-9:
+        x_min, x_max = x_min - 1, x_max + 1
+
+    plot_left, plot_right = MARGIN_LEFT, width - MARGIN_RIGHT
+    plot_top, plot_bottom = MARGIN_TOP, height - MARGIN_BOTTOM
+
+    def to_px(values: np.ndarray) -> np.ndarray:
+        return plot_bottom - (values - y_min) / (y_max - y_min) * (plot_bottom - plot_top)
+
+    px = plot_left + (xs - x_min) / (x_max - x_min) * (plot_right - plot_left)
+
+    text = _rgb(TEXT_COLOR)
+    for i in range(GRID_LINES + 1):
+        value = y_min + (y_max - y_min) * i / GRID_LINES
+        row = int(round(float(to_px(np.array([value]))[0])))
+        canvas[row, plot_left:plot_right] = _rgb(GRID_COLOR)
+        label = f"{value:.1f}"
+        _draw_text(canvas, label, MARGIN_LEFT - 8 - _text_width(label), row - 7, text)
+
+    for s in series:
+        py = to_px(np.asarray(s.values, dtype=np.float64))
+        color = _rgb(s.color)
+        for i in range(len(px) - 1):
+            _draw_segment(canvas, px[i], py[i], px[i + 1], py[i + 1], color, s.width, s.opacity)
+        if s.markers or len(px) == 1:
+            for cx, cy in zip(px, py):
+                _draw_disc(canvas, cx, cy, s.width + 2.5, color, s.opacity)
+
+    left_label, right_label = x_labels
+    _draw_text(canvas, left_label, plot_left, plot_bottom + 12, text)
+    _draw_text(canvas, right_label, plot_right - _text_width(right_label), plot_bottom + 12, text)
+
+    return np.clip(canvas + 0.5, 0, 255).astype(np.uint8)
+
+
+def encode_png(pixels: np.ndarray) -> bytes:
+    """Encode an (height, width, 3|4) uint8 array as PNG using the Sub filter."""
+    height, width, channels = pixels.shape
+    color_type = 2 if channels == 3 else 6
+
+    rows = pixels.reshape(height, width * channels)
+    # Sub filter: each byte minus the same channel of the pixel to the left, mod 256
+    filtered = np.empty((height, width * channels + 1), dtype=np.uint8)
+    filtered[:, 0] = 1
+    filtered[:, 1 : channels + 1] = rows[:, :channels]
+    filtered[:, channels + 1 :] = rows[:, channels:] - rows[:, :-channels]
+
+    header = struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0)
+    return b"".join(
+        (
+            b"\x89PNG\r\n\x1a\n",
+            _png_chunk(b"IHDR", header),
+            _png_chunk(b"IDAT", zlib.compress(filtered.tobytes(), 9)),
+            _png_chunk(b"IEND", b""),
+        )
+    )
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    crc = zlib.crc32(kind + data) & 0xFFFFFFFF
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", crc)
+
+
+def _rgb(color: str) -> np.ndarray:
+    color = color.lstrip("#")
+    return np.array([int(color[i : i + 2], 16) for i in (0, 2, 4)], dtype=np.float32)
+
+
+def _blend(
+    canvas: np.ndarray,
+    top: int,
+    left: int,
+    coverage: np.ndarray,
+    color: np.ndarray,
+) -> None:
+    region = canvas[top : top + coverage.shape[0], left : left + coverage.shape[1]]
+    alpha = coverage[..., None]
+    region *= 1 - alpha
+    region += alpha * color
+
+
+def _bounds(canvas: np.ndarray, x0: float, x1: float, y0: float, y1: float, pad: float):
+    height, width = canvas.shape[:2]
+    left = max(int(np.floor(min(x0, x1) - pad)), 0)
+    right = min(int(np.ceil(max(x0, x1) + pad)) + 1, width)
+    top = max(int(np.floor(min(y0, y1) - pad)), 0)
+    bottom = min(int(np.ceil(max(y0, y1) + pad)) + 1, height)
+    return left, right, top, bottom
+
+
+def _draw_segment(
+    canvas: np.ndarray,
+    x0: float,
+    y0: float,
+    x1: float,
+    y1: float,
+    color: np.ndarray,
+    width: float,
+    opacity: float,
+) -> None:
+    half = width / 2
+    left, right, top, bottom = _bounds(canvas, x0, x1, y0, y1, half + 1)
+    if left >= right or top >= bottom:
+        return
+
+    yy, xx = np.mgrid[top:bottom, left:right].astype(np.float32)
+    dx, dy = x1 - x0, y1 - y0
+    length_sq = dx * dx + dy * dy
+    if length_sq > 0:
+        t = np.clip(((xx - x0) * dx + (yy - y0) * dy) / length_sq, 0, 1)
+    else:
+        t = np.zeros_like(xx)
+    distance = np.hypot(xx - (x0 + t * dx), yy - (y0 + t * dy))
+    coverage = np.clip(half + 0.5 - distance, 0, 1) * opacity
+    _blend(canvas, top, left, coverage, color)
+
+
+def _draw_disc(
+    canvas: np.ndarray, cx: float, cy: float, radius: float, color: np.ndarray, opacity: float
+) -> None:
+    left, right, top, bottom = _bounds(canvas, cx, cx, cy, cy, radius + 1)
+    if left >= right or top >= bottom:
+        return
+
+    yy, xx = np.mgrid[top:bottom, left:right].astype(np.float32)
+    distance = np.hypot(xx - cx, yy - cy)
+    coverage = np.clip(radius + 0.5 - distance, 0, 1) * opacity
+    _blend(canvas, top, left, coverage, color)
+
+
+def _text_width(text: str) -> int:
+    return len(text) * 6 * FONT_SCALE - FONT_SCALE if text else 0
+
+
+def _draw_text(canvas: np.ndarray, text: str, left: int, top: int, color: np.ndarray) -> None:
+    height, width = canvas.shape[:2]
+    for index, char in enumerate(text):
+        mask = _GLYPH_MASKS.get(char)
+        if mask is None:
+            continue
+        mask = np.kron(mask, np.ones((FONT_SCALE, FONT_SCALE), dtype=bool))
+        x = left + index * 6 * FONT_SCALE
+        if x < 0 or top < 0 or x + mask.shape[1] > width or top + mask.shape[0] > height:
+            continue
+        canvas[top : top + mask.shape[0], x : x + mask.shape[1]][mask] = color
@@ -0,0 +1,33 @@
+"""
+Build the offline food database used for calorie lookup.
+
+Usage:
+    python scripts/build_food_db.py [dump.csv|dump.csv.gz] [--db data/food.db]
+
+Without arguments the bundled data/foods_seed.csv is used. The Open Food Facts
+export (en.openfoodfacts.org.products.csv.gz) can be passed as is.
+"""
+import argparse
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot.config import config  # noqa: E402
+from bot.services.food_db import SEED_PATH, build_food_db  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the offline food database")
+    parser.add_argument("source", nargs="?", default=SEED_PATH, help="CSV/TSV dump")
+    parser.add_argument("--db", default=config.food_db.path, help="output SQLite file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    loaded = build_food_db(args.source, args.db)
+    print(f"Loaded {loaded} foods into {args.db}")
+
+
+if __name__ == "__main__":
+    main()